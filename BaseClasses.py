@@ -5,10 +5,12 @@ import functools
 import logging
 import random
 import secrets
+import threading
 import warnings
 from argparse import Namespace
+from array import array
 from collections import Counter, deque, defaultdict
-from collections.abc import Callable, Collection, Iterable, Iterator, Mapping, MutableSequence, Set
+from collections.abc import Callable, Collection, Iterable, Iterator, Mapping, MutableMapping, MutableSequence, Set
 from enum import IntEnum, IntFlag
 from typing import (AbstractSet, Any, ClassVar, Dict, List, Literal, NamedTuple,
                     Optional, Protocol, Tuple, Union, TYPE_CHECKING, overload)
@@ -102,6 +104,8 @@ class MultiWorld():
     random: random.Random
     per_slot_randoms: Utils.DeprecateDict[int, random.Random]
     """Deprecated. Please use `self.random` instead."""
+    prog_item_ids: Dict[int, Dict[str, int]]
+    """Interned progression item names per player, see `intern_prog_items`. Empty unless that was called."""
 
     class AttributeProxy():
         def __init__(self, rule):
@@ -180,6 +184,10 @@ class MultiWorld():
         self.per_slot_randoms = Utils.DeprecateDict("Using per_slot_randoms is now deprecated. Please use the "
                                                     "world's random object instead (usually self.random)", True)
         self.plando_options = PlandoOptions.none
+        self.prog_item_ids = {}
+        self._sphere_log = None
+        self._sphere_log_checkpoints = None
+        self._sphere_log_lock = threading.Lock()
 
     def get_all_ids(self) -> Tuple[int, ...]:
         return self.player_ids + tuple(self.groups)
@@ -582,6 +590,50 @@ class MultiWorld():
 
         return False
 
+    def intern_prog_items(self) -> None:
+        """
+        Intern the names of all progression items currently in the multiworld to small ints per player, so every
+        CollectionState created afterward counts them in an array instead of a Counter, which makes copying states
+        a buffer copy. Progression items created later and custom counters of worlds still work, but are counted in
+        a dict next to the array.
+        """
+        prog_item_ids: Dict[int, Dict[str, int]] = {player: {} for player in self.get_all_ids()}
+        items = self.get_items()
+        for precollected in self.precollected_items.values():
+            items += precollected
+        for item in items:
+            if item.advancement and item.player in prog_item_ids:
+                ids = prog_item_ids[item.player]
+                ids.setdefault(item.name, len(ids))
+        self.prog_item_ids = prog_item_ids
+        for player, counter in self.state.prog_items.items():
+            self.state.prog_items[player] = ProgItemCounts(prog_item_ids.get(player, {}), counter)
+
+    def enable_sphere_log(self, checkpoints: bool = False) -> None:
+        """
+        Declare the placements of the multiworld final, so spheres are only computed once from here on.
+
+        The first call of `get_sphere_log` afterward sweeps the multiworld and keeps the result, which `get_spheres`,
+        `get_sendable_spheres`, `fulfills_accessibility` and `Spoiler.create_playthrough` then read from.
+
+        :param checkpoints: Whether to keep a copy of the state after each sphere, as needed for the playthrough.
+        """
+        with self._sphere_log_lock:
+            self._sphere_log = None
+            self._sphere_log_checkpoints = checkpoints
+
+    def get_sphere_log(self) -> SphereLog:
+        """
+        Returns the spheres of the multiworld. If `enable_sphere_log` was called, they are computed once and shared,
+        otherwise they are computed anew for every call.
+        """
+        if self._sphere_log_checkpoints is None:
+            return SphereLog(self)
+        with self._sphere_log_lock:
+            if self._sphere_log is None:
+                self._sphere_log = SphereLog(self, self._sphere_log_checkpoints)
+            return self._sphere_log
+
     def get_spheres(self) -> Iterator[Set[Location]]:
         """
         yields a set of locations for each logical sphere
@@ -590,24 +642,12 @@ class MultiWorld():
         locations is followed by an empty set, and then a set of all of the
         unreachable locations.
         """
-        state = CollectionState(self)
-        locations = set(self.get_filled_locations())
-
-        while locations:
-            sphere: Set[Location] = set()
-
-            for location in locations:
-                if location.can_reach(state):
-                    sphere.add(location)
-            yield sphere
-            if not sphere:
-                if locations:
-                    yield locations  # unreachable locations
-                break
-
-            for location in sphere:
-                state.collect(location.item, True, location)
-            locations -= sphere
+        sphere_log = self.get_sphere_log()
+        for sphere in sphere_log.spheres:
+            yield set(sphere.locations)
+        if sphere_log.unreachable:
+            yield set()
+            yield set(sphere_log.unreachable)  # unreachable locations
 
     def get_sendable_spheres(self) -> Iterator[Set[Location]]:
         """
@@ -616,45 +656,18 @@ class MultiWorld():
         If there are unreachable locations, the last sphere of reachable locations is followed by an empty set,
         and then a set of all of the unreachable locations.
         """
-        state = CollectionState(self)
-        locations: Set[Location] = set()
-        events: Set[Location] = set()
-        for location in self.get_filled_locations():
-            if type(location.item.code) is int and type(location.address) is int:
-                locations.add(location)
-            else:
-                events.add(location)
-
-        while locations:
-            sphere: Set[Location] = set()
-
-            # cull events out
-            done_events: Set[Union[Location, None]] = {None}
-            while done_events:
-                done_events = set()
-                for event in events:
-                    if event.can_reach(state):
-                        state.collect(event.item, True, event)
-                        done_events.add(event)
-                events -= done_events
-
-            for location in locations:
-                if location.can_reach(state):
-                    sphere.add(location)
-
-            yield sphere
-            if not sphere:
-                if locations:
-                    yield locations  # unreachable locations
-                break
-
-            for location in sphere:
-                state.collect(location.item, True, location)
-            locations -= sphere
+        sendable_spheres, unreachable = self.get_sphere_log().sendable_spheres
+        for sphere in sendable_spheres:
+            yield set(sphere)
+        if unreachable:
+            yield set()
+            yield set(unreachable)  # unreachable locations
 
     def fulfills_accessibility(self, state: Optional[CollectionState] = None):
         """Check if accessibility rules are fulfilled with current or supplied state."""
+        sphere_log: Optional[SphereLog] = None
         if not state:
+            sphere_log = self.get_sphere_log()
             state = CollectionState(self)
         players: Dict[str, Set[int]] = {
             "minimal": set(),
@@ -683,8 +696,41 @@ class MultiWorld():
                 return False  # still locations required to be collected
             return True
 
+        def inaccessible() -> bool:
+            """Report the locations that are left, in debug mode by raising."""
+            if __debug__:
+                from Fill import FillError
+                raise FillError(
+                    f"Could not access required locations for accessibility check. Missing: {locations}",
+                    multiworld=self,
+                )
+            # ran out of places and did not finish yet, quit
+            logging.warning(f"Could not access required locations for accessibility check."
+                            f" Missing: {locations}")
+            return False
+
         locations = [location for location in self.get_locations() if location_relevant(location)]
 
+        if sphere_log:
+            # everything that is reachable at all got collected into the final state of the sphere log
+            final_state: Optional[CollectionState] = None
+            missing: List[Location] = []
+            for location in locations:
+                if location.item:
+                    if location in sphere_log.unreachable:
+                        missing.append(location)
+                else:
+                    if final_state is None:
+                        # empty locations were not swept, check them on a copy to keep the shared state untouched
+                        final_state = sphere_log.state.copy()
+                    if not location.can_reach(final_state):
+                        missing.append(location)
+            locations = missing
+            beatable_fulfilled = all(sphere_log.beaten.values())
+            if all_done():
+                return True
+            return inaccessible() if locations else False
+
         while locations:
             sphere: List[Location] = []
             for n in range(len(locations) - 1, -1, -1):
@@ -692,16 +738,7 @@ class MultiWorld():
                     sphere.append(locations.pop(n))
 
             if not sphere:
-                if __debug__:
-                    from Fill import FillError
-                    raise FillError(
-                        f"Could not access required locations for accessibility check. Missing: {locations}",
-                        multiworld=self,
-                    )
-                # ran out of places and did not finish yet, quit
-                logging.warning(f"Could not access required locations for accessibility check."
-                                f" Missing: {locations}")
-                return False
+                return inaccessible()
 
             for location in sphere:
                 if location.item:
@@ -716,11 +753,259 @@ class MultiWorld():
         return False
 
 
+class LoggedSphere(NamedTuple):
+    locations: Set[Location]
+    """All filled locations that first became reachable in this sphere."""
+    events: Set[Location]
+    """The locations of this sphere that can not be sent by the multiserver."""
+    beaten: Dict[int, bool]
+    """Whether each player has beaten their game after collecting this sphere."""
+    state: Optional[CollectionState]
+    """A copy of the state after collecting this sphere, if checkpoints were requested."""
+
+
+class SphereLog:
+    """
+    The logical spheres of a filled multiworld, swept once from an empty CollectionState.
+
+    Each sphere contains every filled location that is reachable with the items of all previous spheres.
+    Get one through `MultiWorld.get_sphere_log`.
+    """
+    multiworld: MultiWorld
+    spheres: List[LoggedSphere]
+    unreachable: Set[Location]
+    """Filled locations that could not be reached at all."""
+    state: CollectionState
+    """The state after collecting every reachable location. Shared, so only to be read from through a copy."""
+    beaten: Dict[int, bool]
+    """Whether each player has beaten their game in the final state."""
+
+    def __init__(self, multiworld: MultiWorld, checkpoints: bool = False) -> None:
+        self.multiworld = multiworld
+        self.spheres = []
+        state = CollectionState(multiworld)
+        locations = set(multiworld.get_filled_locations())
+
+        while locations:
+            sphere = {location for location in locations if location.can_reach(state)}
+            if not sphere:
+                break
+
+            for location in sphere:
+                state.collect(location.item, True, location)
+            locations -= sphere
+
+            self.spheres.append(LoggedSphere(
+                sphere,
+                {location for location in sphere if not self.is_sendable(location)},
+                self._get_beaten(state),
+                state.copy_on_write() if checkpoints else None,
+            ))
+
+        self.unreachable = locations
+        self.state = state
+        self.beaten = self.spheres[-1].beaten if self.spheres else self._get_beaten(state)
+
+    @functools.cached_property
+    def sendable_spheres(self) -> Tuple[List[Set[Location]], Set[Location]]:
+        """
+        The spheres of the locations the multiserver can send and the sendable locations that could not be reached.
+        Events are collected as soon as they are reachable, so the locations they unlock are in the same sphere.
+
+        Derived from the logged spheres on first use: the state before a sendable sphere holds at least the items of
+        the logged spheres before it, so their locations are known to be reachable, and it holds no items of the
+        logged spheres after the one of the latest collected location, so only the spheres in between are checked.
+        """
+        state = CollectionState(self.multiworld)
+        pending = [set(sphere.locations) for sphere in self.spheres]
+        remaining = sum(self.is_sendable(location) for sphere in pending for location in sphere)
+        reached = 0  # the logged sphere after the one of the latest collected location
+
+        def collect(step: int, sendable: bool) -> Set[Location]:
+            nonlocal reached
+            found: Set[Location] = set()
+            for index in range(min(max(step, reached) + 1, len(pending))):
+                candidates = {location for location in pending[index] if self.is_sendable(location) is sendable}
+                if index > step:
+                    candidates = {location for location in candidates if location.can_reach(state)}
+                if candidates:
+                    pending[index] -= candidates
+                    found |= candidates
+                    reached = max(reached, index + 1)
+            for location in found:
+                state.collect(location.item, True, location)
+            return found
+
+        spheres: List[Set[Location]] = []
+        while remaining:
+            # cull events out
+            while collect(len(spheres), False):
+                pass
+            sphere = collect(len(spheres), True)
+            if not sphere:
+                break
+            spheres.append(sphere)
+            remaining -= len(sphere)
+
+        unreachable = {location for sphere in pending for location in sphere if self.is_sendable(location)}
+        unreachable |= {location for location in self.unreachable if self.is_sendable(location)}
+        return spheres, unreachable
+
+    def _get_beaten(self, state: CollectionState) -> Dict[int, bool]:
+        return {player: self.multiworld.has_beaten_game(state, player) for player in self.multiworld.player_ids}
+
+    @staticmethod
+    def is_sendable(location: Location) -> bool:
+        """Whether the multiserver can send the item of this location, as opposed to an event."""
+        return type(location.item.code) is int and type(location.address) is int
+
+
 PathValue = Tuple[str, Optional["PathValue"]]
 
 
+class ProgItemCounts(MutableMapping[str, int]):
+    """
+    Counter of the progression items of one player in a CollectionState, with the item names interned by
+    `MultiWorld.intern_prog_items`. The counts of interned names are kept in an array, the counts of any other names
+    in a dict. Behaves like a `Counter`: missing names count as 0, names set to 0 are still contained until deleted,
+    deleting a missing name does nothing and `update`/`subtract` add up counts.
+    """
+    __slots__ = ("ids", "counts", "extra", "zeros")
+
+    ids: Dict[str, int]
+    """Index into counts per interned item name, shared between all copies."""
+    counts: array
+    extra: Dict[str, Any]
+    """Counts of names that are not interned."""
+    zeros: Optional[Set[str]]
+    """Interned names that were set to 0, as a count of 0 in the array can't tell them apart from missing names."""
+
+    def __init__(self, ids: Dict[str, int], items: Union[Mapping[str, Any], Iterable[str], None] = None):
+        self.ids = ids
+        self.counts = array("H", bytes(2 * len(ids)))
+        self.extra = {}
+        self.zeros = None
+        if items is not None:
+            self.update(items)
+
+    def __getitem__(self, key: str) -> Any:
+        index = self.ids.get(key)
+        if index is None:
+            return self.extra.get(key, 0)
+        return self.counts[index]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        index = self.ids.get(key)
+        if index is None:
+            self.extra[key] = value
+            return
+        try:
+            self.counts[index] = value
+        except (OverflowError, TypeError):
+            # the value does not fit the array, so un-intern the name for this counter and its copies
+            self.counts[index] = 0
+            self.ids = {name: name_index for name, name_index in self.ids.items() if name != key}
+            self.extra[key] = value
+            if self.zeros:
+                self.zeros.discard(key)
+            return
+        if not value:
+            if self.zeros is None:
+                self.zeros = set()
+            self.zeros.add(key)
+
+    def __delitem__(self, key: str) -> None:
+        index = self.ids.get(key)
+        if index is None:
+            self.extra.pop(key, None)
+        else:
+            self.counts[index] = 0
+            if self.zeros:
+                self.zeros.discard(key)
+
+    def __contains__(self, key: object) -> bool:
+        index = self.ids.get(key)  # type: ignore[arg-type]
+        if index is None:
+            return key in self.extra
+        return self.counts[index] != 0 or bool(self.zeros and key in self.zeros)
+
+    def _zeros(self) -> Iterator[str]:
+        """The names set to 0 that still are 0."""
+        if self.zeros:
+            counts, ids = self.counts, self.ids
+            for name in self.zeros:
+                if not counts[ids[name]]:
+                    yield name
+
+    def __iter__(self) -> Iterator[str]:
+        counts = self.counts
+        for name, index in self.ids.items():
+            if counts[index]:
+                yield name
+        yield from self._zeros()
+        yield from self.extra
+
+    def __len__(self) -> int:
+        return len(self.counts) - self.counts.count(0) + sum(1 for _ in self._zeros()) + len(self.extra)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({dict(self.items())!r})"
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self[key] if key in self else default
+
+    def setdefault(self, key: str, default: Any = None) -> Any:
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def pop(self, key: str, *default: Any) -> Any:
+        if key not in self:
+            if default:
+                return default[0]
+            raise KeyError(key)
+        value = self[key]
+        del self[key]
+        return value
+
+    def copy(self) -> ProgItemCounts:
+        ret = ProgItemCounts.__new__(ProgItemCounts)
+        ret.ids = self.ids
+        ret.counts = self.counts[:]
+        ret.extra = self.extra.copy()
+        ret.zeros = self.zeros.copy() if self.zeros else None
+        return ret
+
+    __copy__ = copy
+
+    def update(self, items: Union[Mapping[str, Any], Iterable[str], None] = None, /, **kwargs: Any) -> None:
+        """Adds the counts of items, like `Counter.update`."""
+        if isinstance(items, Mapping):
+            for name, count in items.items():
+                self[name] += count
+        elif items is not None:
+            for name in items:
+                self[name] += 1
+        for name, count in kwargs.items():
+            self[name] += count
+
+    def subtract(self, items: Union[Mapping[str, Any], Iterable[str], None] = None, /, **kwargs: Any) -> None:
+        """Subtracts the counts of items, like `Counter.subtract`."""
+        if isinstance(items, Mapping):
+            for name, count in items.items():
+                self[name] -= count
+        elif items is not None:
+            for name in items:
+                self[name] -= 1
+        for name, count in kwargs.items():
+            self[name] -= count
+
+    def total(self) -> Any:
+        return sum(self.counts) + sum(self.extra.values())
+
+
 class CollectionState():
-    prog_items: Dict[int, Counter[str]]
+    prog_items: Dict[int, Union[Counter[str], ProgItemCounts]]
     multiworld: MultiWorld
     reachable_regions: Dict[int, Set[Region]]
     blocked_connections: Dict[int, Set[Entrance]]
@@ -729,13 +1014,25 @@ class CollectionState():
     locations_checked: Set[Location]
     """Internal cache for Advancement Locations already checked by this CollectionState. Not for use in logic."""
     stale: Dict[int, bool]
+    changed_items: Dict[int, Set[str]]
+    """
+    Names of the items collected per player since its reachable regions were last updated, so worlds that know the
+    item dependencies of their entrances only have to retest the blocked entrances that depend on them.
+    """
     allow_partial_entrances: bool
+    shared_players: Set[int]
+    """
+    Players whose prog_items, reachable_regions and blocked_connections may be shared with another state through
+    `copy_on_write`, so they have to be copied before they are changed.
+    """
     additional_init_functions: List[Callable[[CollectionState, MultiWorld], None]] = []
     additional_copy_functions: List[Callable[[CollectionState, CollectionState], CollectionState]] = []
 
     def __init__(self, parent: MultiWorld, allow_partial_entrances: bool = False):
         assert parent.worlds, "CollectionState created without worlds initialized in parent"
-        self.prog_items = {player: Counter() for player in parent.get_all_ids()}
+        prog_item_ids = parent.prog_item_ids
+        self.prog_items = {player: ProgItemCounts(prog_item_ids[player]) if player in prog_item_ids else Counter()
+                           for player in parent.get_all_ids()}
         self.multiworld = parent
         self.reachable_regions = {player: set() for player in parent.get_all_ids()}
         self.blocked_connections = {player: set() for player in parent.get_all_ids()}
@@ -743,7 +1040,9 @@ class CollectionState():
         self.path = {}
         self.locations_checked = set()
         self.stale = {player: True for player in parent.get_all_ids()}
+        self.changed_items = {player: set() for player in parent.get_all_ids()}
         self.allow_partial_entrances = allow_partial_entrances
+        self.shared_players = set()
         for function in self.additional_init_functions:
             function(self, parent)
         for items in parent.precollected_items.values():
@@ -751,10 +1050,22 @@ class CollectionState():
                 self.collect(item, True)
 
     def update_reachable_regions(self, player: int):
+        if player in self.shared_players:
+            self.unshare(player)
         self.stale[player] = False
         world: AutoWorld.World = self.multiworld.worlds[player]
         reachable_regions = self.reachable_regions[player]
-        queue = deque(self.blocked_connections[player])
+        changed_items = self.changed_items[player]
+        # entrances of partial states can get connected between updates, so they have to be retested regardless
+        if world.known_entrance_item_dependencies and not self.allow_partial_entrances:
+            get_item_dependencies = world.get_entrance_item_dependencies
+            # the other blocked connections have the same result as in the last update
+            queue = deque(connection for connection in self.blocked_connections[player]
+                          if (item_dependencies := get_item_dependencies(connection)) is None
+                          or not item_dependencies.isdisjoint(changed_items))
+        else:
+            queue = deque(self.blocked_connections[player])
+        changed_items.clear()
         start: Region = world.get_region(world.origin_region_name)
 
         # init on first call - this can't be done on construction since the regions don't exist yet
@@ -796,6 +1107,7 @@ class CollectionState():
                     queue.extend(relevant_entrances)
 
     def _update_reachable_regions_auto_indirect_conditions(self, player: int, queue: deque[Entrance]):
+        world: AutoWorld.World = self.multiworld.worlds[player]
         reachable_regions = self.reachable_regions[player]
         blocked_connections = self.blocked_connections[player]
         new_connection: bool = True
@@ -817,9 +1129,14 @@ class CollectionState():
                     queue.extend(new_region.exits)
                     self.path[new_region] = (new_region.name, self.path.get(connection, None))
                     new_connection = True
-                    self.multiworld.worlds[player].reached_region(self, new_region)
+                    world.reached_region(self, new_region)
             # sweep for indirect connections, mostly Entrance.can_reach(unrelated_Region)
-            queue.extend(blocked_connections)
+            if world.known_entrance_item_dependencies and not self.allow_partial_entrances:
+                # no items get collected while updating, so only connections that depend on more than items can change
+                queue.extend(connection for connection in blocked_connections
+                             if world.get_entrance_item_dependencies(connection) is None)
+            else:
+                queue.extend(blocked_connections)
 
     def copy(self) -> CollectionState:
         ret = CollectionState(self.multiworld)
@@ -828,14 +1145,46 @@ class CollectionState():
                                  self.reachable_regions.items()}
         ret.blocked_connections = {player: entrance_set.copy() for player, entrance_set in
                                    self.blocked_connections.items()}
+        ret.changed_items = {player: item_names.copy() for player, item_names in self.changed_items.items()}
+        ret.advancements = self.advancements.copy()
+        ret.path = self.path.copy()
+        ret.locations_checked = self.locations_checked.copy()
+        ret.allow_partial_entrances = self.allow_partial_entrances
+        for function in self.additional_copy_functions:
+            ret = function(self, ret)
+        return ret
+
+    def copy_on_write(self) -> CollectionState:
+        """
+        Like `copy`, but the per-player prog_items, reachable_regions and blocked_connections stay shared between both
+        states until one of them changes the data of that player, so only the players that change get copied.
+        Meant for states that are kept around, like sphere checkpoints and swap states. Code that changes
+        `prog_items` of a state outside of `collect`, `remove` and the item helpers has to call `unshare` first.
+        """
+        ret = CollectionState(self.multiworld)
+        ret.prog_items = self.prog_items.copy()
+        ret.reachable_regions = self.reachable_regions.copy()
+        ret.blocked_connections = self.blocked_connections.copy()
+        ret.changed_items = {player: item_names.copy() for player, item_names in self.changed_items.items()}
         ret.advancements = self.advancements.copy()
         ret.path = self.path.copy()
         ret.locations_checked = self.locations_checked.copy()
         ret.allow_partial_entrances = self.allow_partial_entrances
+        # players whose reachable regions are up to date don't have to be updated, which would unshare them
+        ret.stale = self.stale.copy()
+        self.shared_players = set(self.prog_items)
+        ret.shared_players = set(self.prog_items)
         for function in self.additional_copy_functions:
             ret = function(self, ret)
         return ret
 
+    def unshare(self, player: int) -> None:
+        """Copies the per-player data of player that is shared with another state, so it can be changed."""
+        self.shared_players.discard(player)
+        self.prog_items[player] = self.prog_items[player].copy()
+        self.reachable_regions[player] = self.reachable_regions[player].copy()
+        self.blocked_connections[player] = self.blocked_connections[player].copy()
+
     def can_reach(self,
                   spot: Union[Location, Entrance, Region, str],
                   resolution_hint: Optional[str] = None,
@@ -1119,9 +1468,13 @@ class CollectionState():
         if location:
             self.locations_checked.add(location)
 
+        if item.player in self.shared_players:
+            self.unshare(item.player)
         changed = self.multiworld.worlds[item.player].collect(self, item)
 
         self.stale[item.player] = True
+        if changed:
+            self.changed_items[item.player].add(item.name)
 
         if changed and not prevent_sweep:
             self.sweep_for_advancements()
@@ -1137,15 +1490,21 @@ class CollectionState():
         :param count: How many of the item to add.
         """
         assert count > 0
+        if player in self.shared_players:
+            self.unshare(player)
         self.prog_items[player][item] += count
+        self.changed_items[player].add(item)
 
-    def remove(self, item: Item):
+    def remove(self, item: Item) -> bool:
+        if item.player in self.shared_players:
+            self.unshare(item.player)
         changed = self.multiworld.worlds[item.player].remove(self, item)
         if changed:
             # invalidate caches, nothing can be trusted anymore now
             self.reachable_regions[item.player] = set()
             self.blocked_connections[item.player] = set()
             self.stale[item.player] = True
+        return changed
 
     def remove_item(self, item: str, player: int, count: int = 1) -> None:
         """
@@ -1156,6 +1515,8 @@ class CollectionState():
         :param count: How many of the item to remove.
         """
         assert count > 0
+        if player in self.shared_players:
+            self.unshare(player)
         self.prog_items[player][item] -= count
         if self.prog_items[player][item] < 1:
             del (self.prog_items[player][item])
@@ -1169,10 +1530,13 @@ class CollectionState():
         :param count: How many of the item to now have.
         """
         assert count >= 0
+        if player in self.shared_players:
+            self.unshare(player)
         if count == 0:
             del (self.prog_items[player][item])
         else:
             self.prog_items[player][item] = count
+        self.changed_items[player].add(item)
 
 
 CollectionRule = Callable[[CollectionState], bool]
@@ -1705,39 +2069,37 @@ class Spoiler:
         # get locations containing progress items
         multiworld = self.multiworld
         prog_locations = {location for location in multiworld.get_filled_locations() if location.item.advancement}
-        state_cache: List[Optional[CollectionState]] = [None]
+        state_cache: List[Optional[CollectionState]] = []
         collection_spheres: List[Set[Location]] = []
-        state = CollectionState(multiworld)
-        sphere_candidates = set(prog_locations)
         logging.debug('Building up collection spheres.')
-        while sphere_candidates:
-
-            # build up spheres of collection radius.
-            # Everything in each sphere is independent from each other in dependencies and only depends on lower spheres
-
-            sphere = {location for location in sphere_candidates if state.can_reach(location)}
-
-            for location in sphere:
-                state.collect(location.item, True, location)
-
-            sphere_candidates -= sphere
-            collection_spheres.append(sphere)
-            state_cache.append(state.copy())
 
-            logging.debug('Calculated sphere %i, containing %i of %i progress items.', len(collection_spheres),
-                          len(sphere),
-                          len(prog_locations))
-            if not sphere:
-                logging.debug('The following items could not be reached: %s', ['%s (Player %d) at %s (Player %d)' % (
-                    location.item.name, location.item.player, location.name, location.player) for location in
-                                                                               sphere_candidates])
-                if not multiworld.has_beaten_game(state):
-                    raise RuntimeError("During playthrough generation, the game was determined to be unbeatable. "
-                                       "Something went terribly wrong here. "
-                                       f"Unreachable progression items: {sphere_candidates}")
-                else:
-                    self.unreachables = sphere_candidates
-                    break
+        # build up spheres of collection radius.
+        # Everything in each sphere is independent from each other in dependencies and only depends on lower spheres
+        sphere_log = multiworld.get_sphere_log()
+        if sphere_log.spheres and sphere_log.spheres[0].state is None:
+            # the shared sphere log was created without checkpoints, which are required to cull the spheres
+            sphere_log = SphereLog(multiworld, checkpoints=True)
+        previous_state: Optional[CollectionState] = None
+        for logged_sphere in sphere_log.spheres:
+            sphere = {location for location in logged_sphere.locations if location.item.advancement}
+            if sphere:
+                collection_spheres.append(sphere)
+                state_cache.append(previous_state)
+                logging.debug('Calculated sphere %i, containing %i of %i progress items.', len(collection_spheres),
+                              len(sphere), len(prog_locations))
+            previous_state = logged_sphere.state
+
+        sphere_candidates = {location for location in sphere_log.unreachable if location.item.advancement}
+        if sphere_candidates:
+            logging.debug('The following items could not be reached: %s', ['%s (Player %d) at %s (Player %d)' % (
+                location.item.name, location.item.player, location.name, location.player) for location in
+                                                                           sphere_candidates])
+            if not all(sphere_log.beaten.values()):
+                raise RuntimeError("During playthrough generation, the game was determined to be unbeatable. "
+                                   "Something went terribly wrong here. "
+                                   f"Unreachable progression items: {sphere_candidates}")
+            else:
+                self.unreachables = sphere_candidates
 
         # in the second phase, we cull each sphere such that the game is still beatable,
         # reducing each range of influence to the bare minimum required inside it
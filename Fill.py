@@ -7,7 +7,7 @@ from collections import Counter, deque
 from BaseClasses import CollectionState, Item, Location, LocationProgressType, MultiWorld, PlandoItemBlock
 from Options import Accessibility
 
-from worlds.AutoWorld import call_all
+from worlds.AutoWorld import call_all, report_progress
 from worlds.generic.Rules import add_item_rule
 
 
@@ -22,22 +22,121 @@ class FillError(RuntimeError):
 
 def _log_fill_progress(name: str, placed: int, total_items: int) -> None:
     logging.info(f"Current fill step ({name}) at {placed}/{total_items} items placed.")
+    report_progress("fill", (name, placed, total_items))
 
 
 def sweep_from_pool(base_state: CollectionState, itempool: typing.Sequence[Item] = tuple(),
-                    locations: typing.Optional[typing.List[Location]] = None) -> CollectionState:
-    new_state = base_state.copy()
+                    locations: typing.Optional[typing.List[Location]] = None,
+                    copy_on_write: bool = False) -> CollectionState:
+    new_state = base_state.copy_on_write() if copy_on_write else base_state.copy()
     for item in itempool:
         new_state.collect(item, True)
     new_state.sweep_for_advancements(locations=locations)
     return new_state
 
 
+class IncrementalSweepState:
+    """
+    Maximum exploration state for `fill_restrictive` that is kept up to date between placements, instead of being
+    re-swept from the base state with the whole remaining item pool for every placement.
+
+    The remaining item pool is collected into `pool_state`, which is never swept. Items leaving the pool are taken out
+    again through `CollectionState.remove`, so the per-player region caches of `pool_state` stay valid for every player
+    whose items did not change.
+    The swept state is rebuilt from a copy of `pool_state` by replaying the locations collected by the previous sweep,
+    one sweep iteration at a time, rechecking their access along the way. Only replayed locations that became
+    unreachable and newly filled locations go through a regular sweep afterward.
+    While the pool only grows, the swept state is extended in place. `invalidate` drops the replay log when filled
+    locations changed their item, falling back to a full sweep.
+    """
+    pool_state: CollectionState
+    state: typing.Optional[CollectionState]
+    _log: typing.List[typing.List[Location]]
+    """Locations collected by the last sweep, per sweep iteration, in the order they were collected."""
+    _to_collect: typing.List[Item]
+    _dirty: bool
+
+    def __init__(self, base_state: CollectionState, item_pool: typing.Iterable[Item] = tuple()) -> None:
+        self.pool_state = base_state.copy()
+        for item in item_pool:
+            self.pool_state.collect(item, True)
+        self.state = None
+        self._log = []
+        self._to_collect = []
+        self._dirty = True
+
+    def collect(self, items: typing.Iterable[Item]) -> None:
+        """Add items to the pool. The swept state picks them up on the next `get`."""
+        for item in items:
+            self.pool_state.collect(item, True)
+            self._to_collect.append(item)
+
+    def remove(self, items: typing.Iterable[Item]) -> None:
+        """Take items out of the pool, i.e. because they are about to be placed."""
+        for item in items:
+            if self.pool_state.remove(item):
+                self._dirty = True
+
+    def invalidate(self) -> None:
+        """Forget the previous sweep, the next `get` sweeps from the pool state from scratch."""
+        self._log = []
+        self._dirty = True
+
+    def get(self, locations: typing.Optional[typing.Iterable[Location]] = None) -> CollectionState:
+        """
+        Returns the maximum exploration state for the current pool and placements.
+
+        :param locations: The locations to sweep through, defaulting to all filled locations in the multiworld.
+        """
+        if self._dirty or self.state is None:
+            self.state = self._replay()
+            self._dirty = False
+        else:
+            for item in self._to_collect:
+                self.state.collect(item, True)
+        self._to_collect.clear()
+        self._sweep(self.state, locations)
+        return self.state
+
+    def _replay(self) -> CollectionState:
+        pool_state = self.pool_state
+        # refresh the caches on the pool state once, so that every copy made from it gets to reuse them
+        for player in {location.player for batch in self._log for location in batch}:
+            if pool_state.stale[player]:
+                pool_state.update_reachable_regions(player)
+        state = pool_state.copy()
+
+        log, self._log = self._log, []
+        for batch in log:
+            # same as a sweep iteration, check access of the whole batch before collecting any of it
+            reachable = [location for location in batch
+                         if location.advancement and location not in state.advancements and location.can_reach(state)]
+            for location in reachable:
+                state.advancements.add(location)
+                state.collect(location.item, True, location)
+            if reachable:
+                self._log.append(reachable)
+        return state
+
+    def _sweep(self, state: CollectionState, locations: typing.Optional[typing.Iterable[Location]]) -> None:
+        if locations is None:
+            locations = state.multiworld.get_filled_locations()
+        pending = [location for location in locations
+                   if location.advancement and location not in state.advancements]
+        if not pending:
+            return
+        for _ in state.sweep_for_advancements(pending, yield_each_sweep=True):
+            collected = [location for location in pending if location in state.advancements]
+            if collected:
+                self._log.append(collected)
+                pending = [location for location in pending if location not in state.advancements]
+
+
 def fill_restrictive(multiworld: MultiWorld, base_state: CollectionState, locations: typing.List[Location],
                      item_pool: typing.List[Item], single_player_placement: bool = False, lock: bool = False,
                      swap: bool = True, on_place: typing.Optional[typing.Callable[[Location], None]] = None,
                      allow_partial: bool = False, allow_excluded: bool = False, one_item_per_player: bool = True,
-                     name: str = "Unknown") -> None:
+                     name: str = "Unknown", incremental_sweep: bool = False) -> None:
     """
     :param multiworld: Multiworld to be filled.
     :param base_state: State assumed before fill.
@@ -50,6 +149,8 @@ def fill_restrictive(multiworld: MultiWorld, base_state: CollectionState, locati
     :param allow_partial: only place what is possible. Remaining items will be in the item_pool list.
     :param allow_excluded: if true and placement fails, it is re-attempted while ignoring excluded on Locations
     :param name: name of this fill step for progress logging purposes
+    :param incremental_sweep: if true, keeps the maximum exploration state between placements instead of sweeping it
+    from base_state for each placement
     """
     unplaced_items: typing.List[Item] = []
     placements: typing.List[Location] = []
@@ -58,6 +159,7 @@ def fill_restrictive(multiworld: MultiWorld, base_state: CollectionState, locati
     reachable_items: typing.Dict[int, typing.Deque[Item]] = {}
     for item in item_pool:
         reachable_items.setdefault(item.player, deque()).append(item)
+    sweep_state = IncrementalSweepState(base_state, item_pool) if incremental_sweep else None
 
     # for progress logging
     total = min(len(item_pool), len(locations))
@@ -82,11 +184,17 @@ def fill_restrictive(multiworld: MultiWorld, base_state: CollectionState, locati
                     del item_pool[-p]
                     break
 
-        maximum_exploration_state = sweep_from_pool(
-            base_state, item_pool + unplaced_items, multiworld.get_filled_locations(item.player)
-            if single_player_placement else None)
+        if sweep_state:
+            sweep_state.remove(items_to_place)
+            maximum_exploration_state = sweep_state.get(multiworld.get_filled_locations(item.player)
+                                                        if single_player_placement else None)
+        else:
+            maximum_exploration_state = sweep_from_pool(
+                base_state, item_pool + unplaced_items, multiworld.get_filled_locations(item.player)
+                if single_player_placement else None)
 
         has_beaten_game = multiworld.has_beaten_game(maximum_exploration_state)
+        previously_unplaced = len(unplaced_items)
 
         while items_to_place:
             # if we have run out of locations to fill,break out of this loop
@@ -151,13 +259,15 @@ def fill_restrictive(multiworld: MultiWorld, base_state: CollectionState, locati
                                 # faster.
                                 swap_state = sweep_from_pool(previous_safe_swap_state, (placed_item,) if unsafe else (),
                                                              multiworld.get_filled_locations(item.player)
-                                                             if single_player_placement else None)
+                                                             if single_player_placement else None,
+                                                             copy_on_write=True)
                                 break
                         else:
                             # No previous swap_state was usable as a base state to sweep from, so create a new one.
                             swap_state = sweep_from_pool(base_state, [placed_item, *item_pool] if unsafe else item_pool,
                                                          multiworld.get_filled_locations(item.player)
-                                                         if single_player_placement else None)
+                                                         if single_player_placement else None,
+                                                         copy_on_write=True)
                             # Unsafe states should not be added to the cache because they have collected `placed_item`.
                             if not unsafe:
                                 if len(previous_safe_swap_state_cache) >= max_swap_base_state_cache_length:
@@ -180,6 +290,10 @@ def fill_restrictive(multiworld: MultiWorld, base_state: CollectionState, locati
                             reachable_items[placed_item.player].appendleft(
                                 placed_item)
                             item_pool.append(placed_item)
+                            if sweep_state:
+                                # the swapped location now holds a different item than the one that was swept
+                                sweep_state.collect((placed_item,))
+                                sweep_state.invalidate()
 
                             # cleanup at the end to hopefully get better errors
                             cleanup_required = True
@@ -206,6 +320,10 @@ def fill_restrictive(multiworld: MultiWorld, base_state: CollectionState, locati
             if on_place:
                 on_place(spot_to_fill)
 
+        if sweep_state:
+            # items that could not be placed go back into the state for the next placements
+            sweep_state.collect(unplaced_items[previously_unplaced:])
+
     if total > 1000:
         _log_fill_progress(name, placed, total)
 
@@ -231,7 +349,7 @@ def fill_restrictive(multiworld: MultiWorld, base_state: CollectionState, locati
             for location in excluded_locations:
                 location.progress_type = location.progress_type.DEFAULT
             fill_restrictive(multiworld, base_state, excluded_locations, unplaced_items, single_player_placement, lock,
-                             swap, on_place, allow_partial, False)
+                             swap, on_place, allow_partial, False, incremental_sweep=incremental_sweep)
             for location in excluded_locations:
                 if not location.item:
                     location.progress_type = location.progress_type.EXCLUDED
@@ -487,7 +605,8 @@ def distribute_early_items(multiworld: MultiWorld,
 
 
 def distribute_items_restrictive(multiworld: MultiWorld,
-                                 panic_method: typing.Literal["swap", "raise", "start_inventory"] = "swap") -> None:
+                                 panic_method: typing.Literal["swap", "raise", "start_inventory"] = "swap",
+                                 incremental_sweep: bool = False) -> None:
     assert all(item.location is None for item in multiworld.itempool), (
         "At the start of distribute_items_restrictive, "
         "there are items in the multiworld itempool that are already placed on locations:\n"
@@ -588,13 +707,16 @@ def distribute_items_restrictive(multiworld: MultiWorld,
         maximum_exploration_state = sweep_from_pool(multiworld.state)
         if panic_method == "swap":
             fill_restrictive(multiworld, maximum_exploration_state, defaultlocations, progitempool, swap=True,
-                             name="Progression", single_player_placement=single_player)
+                             name="Progression", single_player_placement=single_player,
+                             incremental_sweep=incremental_sweep)
         elif panic_method == "raise":
             fill_restrictive(multiworld, maximum_exploration_state, defaultlocations, progitempool, swap=False,
-                             name="Progression", single_player_placement=single_player)
+                             name="Progression", single_player_placement=single_player,
+                             incremental_sweep=incremental_sweep)
         elif panic_method == "start_inventory":
             fill_restrictive(multiworld, maximum_exploration_state, defaultlocations, progitempool, swap=False,
-                             allow_partial=True, name="Progression", single_player_placement=single_player)
+                             allow_partial=True, name="Progression", single_player_placement=single_player,
+                             incremental_sweep=incremental_sweep)
             if progitempool:
                 for item in progitempool:
                     logging.debug(f"Moved {item} to start_inventory to prevent fill failure.")
@@ -2,10 +2,12 @@ import collections
 from collections.abc import Mapping
 import concurrent.futures
 import logging
+import multiprocessing
 import os
 import tempfile
+import threading
 import time
-from typing import Any
+from typing import Any, Callable
 import zipfile
 import zlib
 
@@ -22,8 +24,62 @@ from worlds.generic.Rules import exclusion_rules, locality_rules
 
 __all__ = ["main"]
 
-
-def main(args, seed=None, baked_server_options: dict[str, object] | None = None):
+_output_multiworld: MultiWorld | None = None
+"""The multiworld that forked output processes inherit from the generator process."""
+_OutputResult = tuple[str, list[str], Any]
+"""The directory an output process wrote the files of a player to, their names and its get_output_results."""
+
+
+def _generate_output_in_process(player: int, output_directory: str) -> _OutputResult:
+    assert _output_multiworld is not None, "output process was not forked from the generator process"
+    AutoWorld.call_single(_output_multiworld, "generate_output", player, output_directory)
+    return output_directory, os.listdir(output_directory), _output_multiworld.worlds[player].get_output_results()
+
+
+def _start_output_processes(multiworld: MultiWorld, players: list[int], output_directory: str, workers: int) \
+        -> tuple[concurrent.futures.ProcessPoolExecutor, dict[int, concurrent.futures.Future[_OutputResult]]]:
+    """
+    Start generate_output of players in forked worker processes. The processes inherit the filled multiworld,
+    including each world's random state, and write the files of each player into a directory of its own in
+    output_directory, to be moved into it by _collect_output along with the results of get_output_results.
+    Has to be called before any output thread is started, as forking a process with running threads is unsafe.
+    """
+    global _output_multiworld
+    _output_multiworld = multiworld
+    pool = concurrent.futures.ProcessPoolExecutor(min(workers, len(players)),
+                                                  mp_context=multiprocessing.get_context("fork"))
+    # with the fork start method, all workers get forked on the first submit
+    futures = {player: pool.submit(_generate_output_in_process, player,
+                                   tempfile.mkdtemp(prefix=f"output_{player}_", dir=output_directory))
+               for player in players}
+    return pool, futures
+
+
+def _collect_output(multiworld: MultiWorld, player: int, output_directory: str,
+                    future: concurrent.futures.Future[_OutputResult]) -> None:
+    """Wait for the output of player from its output process, then hand its files and results to the generator."""
+    results = None
+    try:
+        player_directory, files, results = future.result()
+        for file in files:
+            os.replace(os.path.join(player_directory, file), os.path.join(output_directory, file))
+        os.rmdir(player_directory)
+    finally:
+        multiworld.worlds[player].receive_output_results(results)
+
+
+def _stop_output_processes(pool: concurrent.futures.ProcessPoolExecutor) -> None:
+    global _output_multiworld
+    pool.shutdown(cancel_futures=True)
+    _output_multiworld = None
+
+
+def main(args, seed=None, baked_server_options: dict[str, object] | None = None,
+         output_handler: Callable[[str, dict[str, Any]], None] | None = None):
+    """
+    :param output_handler: Called with the directory of the output files and the multidata, while the directory still
+        exists, in place of writing the .archipelago file and the final zip.
+    """
     if not baked_server_options:
         baked_server_options = get_settings().server_options.as_dict()
     assert isinstance(baked_server_options, dict)
@@ -52,15 +108,19 @@ def main(args, seed=None, baked_server_options: dict[str, object] | None = None)
     logger.info('Archipelago Version %s  -  Seed: %s\n', __version__, multiworld.seed)
 
     logger.info(f"Found {len(AutoWorld.AutoWorldRegister.world_types)} World Types:")
-    longest_name = max(len(text) for text in AutoWorld.AutoWorldRegister.world_types)
+    world_types = AutoWorld.AutoWorldRegister.world_types
+    if isinstance(world_types, AutoWorld.LazyWorldTypes):
+        # only list the imported worlds, instead of importing every world for this
+        world_types = {name: world_types[name] for name in world_types if world_types.is_loaded(name)}
+    longest_name = max(len(text) for text in world_types)
 
-    world_classes = AutoWorld.AutoWorldRegister.world_types.values()
+    world_classes = world_types.values()
 
     version_count = max(len(cls.world_version.as_simple_string()) for cls in world_classes)
     item_count = len(str(max(len(cls.item_names) for cls in world_classes)))
     location_count = len(str(max(len(cls.location_names) for cls in world_classes)))
 
-    for name, cls in AutoWorld.AutoWorldRegister.world_types.items():
+    for name, cls in world_types.items():
         if not cls.hidden and len(cls.item_names) > 0:
             logger.info(f" {name:{longest_name}}: "
                         f"v{cls.world_version.as_simple_string():{version_count}} | "
@@ -117,6 +177,9 @@ def main(args, seed=None, baked_server_options: dict[str, object] | None = None)
     logger.info('Calculating Access Rules.')
     AutoWorld.call_all(multiworld, "set_rules")
 
+    if get_settings().generator.compact_prog_items:
+        multiworld.intern_prog_items()
+
     for player in multiworld.player_ids:
         exclusion_rules(multiworld, player, multiworld.worlds[player].options.exclude_locations.value)
         multiworld.worlds[player].options.priority_locations.value -= multiworld.worlds[player].options.exclude_locations.value
@@ -198,7 +261,8 @@ def main(args, seed=None, baked_server_options: dict[str, object] | None = None)
     if multiworld.algorithm == 'flood':
         flood_items(multiworld)  # different algo, biased towards early game progress items
     elif multiworld.algorithm == 'balanced':
-        distribute_items_restrictive(multiworld, get_settings().generator.panic_method)
+        distribute_items_restrictive(multiworld, get_settings().generator.panic_method,
+                                     bool(get_settings().generator.incremental_sweep))
 
     AutoWorld.call_all(multiworld, 'post_fill')
 
@@ -212,6 +276,8 @@ def main(args, seed=None, baked_server_options: dict[str, object] | None = None)
 
     # we're about to output using multithreading, so we're removing the global random state to prevent accidental use
     multiworld.random.passthrough = False
+    # placements are final now, so spheres only need to be swept once for all of spoiler, multidata and accessibility
+    multiworld.enable_sphere_log(checkpoints=args.spoiler > 1)
 
     if args.skip_output:
         logger.info('Done. Skipped output/spoiler generation. Total Time: %s', time.perf_counter() - start)
@@ -233,10 +299,34 @@ def main(args, seed=None, baked_server_options: dict[str, object] | None = None)
     with output as temp_dir:
         output_players = [player for player in multiworld.player_ids if AutoWorld.World.generate_output.__code__
                           is not multiworld.worlds[player].generate_output.__code__]
-        with concurrent.futures.ThreadPoolExecutor(len(output_players) + 2) as pool:
+        output_processes = get_settings().generator.output_processes
+        process_players: list[int] = []
+        if output_processes > 0:
+            if "fork" not in multiprocessing.get_all_start_methods():
+                logger.warning("Output processes require the fork start method, generating output in threads.")
+            elif threading.current_thread() is not threading.main_thread():
+                # only the forking thread lives on in the workers, so locks held by other threads would stay taken
+                logger.warning("Output processes need to be started from the main thread, "
+                               "generating output in threads.")
+            else:
+                process_players = [player for player in output_players if multiworld.worlds[player].portable_output]
+                output_players = [player for player in output_players if player not in process_players]
+        process_pool: concurrent.futures.ProcessPoolExecutor | None = None
+        process_futures: dict[int, concurrent.futures.Future[_OutputResult]] = {}
+        if process_players:
+            # the output processes only get what is done before they are forked,
+            # which has to include the output of whole games that the output of their players waits for
+            AutoWorld.call_stage(multiworld, "generate_output", temp_dir)
+            logger.info(f"Generating output of {len(process_players)} players in up to {output_processes} processes.")
+            process_pool, process_futures = _start_output_processes(multiworld, process_players, temp_dir,
+                                                                    output_processes)
+        with concurrent.futures.ThreadPoolExecutor(len(output_players) + len(process_futures) + 2) as pool:
             check_accessibility_task = pool.submit(multiworld.fulfills_accessibility)
 
-            output_file_futures = [pool.submit(AutoWorld.call_stage, multiworld, "generate_output", temp_dir)]
+            output_file_futures = [pool.submit(_collect_output, multiworld, player, temp_dir, future)
+                                   for player, future in process_futures.items()]
+            if not process_players:
+                output_file_futures.append(pool.submit(AutoWorld.call_stage, multiworld, "generate_output", temp_dir))
             for player in output_players:
                 # skip starting a thread for methods that say "pass".
                 output_file_futures.append(
@@ -353,12 +443,17 @@ def main(args, seed=None, baked_server_options: dict[str, object] | None = None)
                 for key in ("slot_data", "er_hint_data"):
                     multidata[key] = convert_to_base_types(multidata[key])
 
+                if output_handler:
+                    output_multidata.append(multidata)
+                    return
+
                 serialized_multidata = zlib.compress(restricted_dumps(multidata), 9)
 
                 with open(os.path.join(temp_dir, f'{outfilebase}.archipelago'), 'wb') as f:
                     f.write(bytes([3]))  # version of format
                     f.write(serialized_multidata)
 
+            output_multidata: list[dict[str, Any]] = []
             output_file_futures.append(pool.submit(write_multidata))
             if not check_accessibility_task.result():
                 if not multiworld.can_beat_game():
@@ -366,11 +461,15 @@ def main(args, seed=None, baked_server_options: dict[str, object] | None = None)
                 else:
                     logger.warning("Location Accessibility requirements not fulfilled.")
 
-            # retrieve exceptions via .result() if they occurred.
-            for i, future in enumerate(concurrent.futures.as_completed(output_file_futures), start=1):
-                if i % 10 == 0 or i == len(output_file_futures):
-                    logger.info(f'Generating output files ({i}/{len(output_file_futures)}).')
-                future.result()
+            try:
+                # retrieve exceptions via .result() if they occurred.
+                for i, future in enumerate(concurrent.futures.as_completed(output_file_futures), start=1):
+                    if i % 10 == 0 or i == len(output_file_futures):
+                        logger.info(f'Generating output files ({i}/{len(output_file_futures)}).')
+                    future.result()
+            finally:
+                if process_pool:
+                    _stop_output_processes(process_pool)
 
         if args.spoiler > 1:
             logger.info('Calculating playthrough.')
@@ -379,12 +478,15 @@ def main(args, seed=None, baked_server_options: dict[str, object] | None = None)
         if args.spoiler:
             multiworld.spoiler.to_file(os.path.join(temp_dir, '%s_Spoiler.txt' % outfilebase))
 
-        zipfilename = output_path(f"AP_{multiworld.seed_name}.zip")
-        logger.info(f"Creating final archive at {zipfilename}")
-        with zipfile.ZipFile(zipfilename, mode="w", compression=zipfile.ZIP_DEFLATED,
-                             compresslevel=9) as zf:
-            for file in os.scandir(temp_dir):
-                zf.write(file.path, arcname=file.name)
+        if output_handler:
+            output_handler(temp_dir, output_multidata[0])
+        else:
+            zipfilename = output_path(f"AP_{multiworld.seed_name}.zip")
+            logger.info(f"Creating final archive at {zipfilename}")
+            with zipfile.ZipFile(zipfilename, mode="w", compression=zipfile.ZIP_DEFLATED,
+                                 compresslevel=9) as zf:
+                for file in os.scandir(temp_dir):
+                    zf.write(file.path, arcname=file.name)
 
     logger.info('Done. Enjoy. Total Time: %s', time.perf_counter() - start)
     return multiworld
@@ -11,9 +11,12 @@ import hashlib
 import inspect
 import itertools
 import logging
+import logging.handlers
 import math
 import operator
+import os
 import pickle
+import queue
 import random
 import shlex
 import threading
@@ -44,7 +47,7 @@ import NetUtils
 import Utils
 from Utils import version_tuple, restricted_loads, Version, async_start, get_intended_text
 from NetUtils import Endpoint, ClientStatus, NetworkItem, decode, encode, NetworkPlayer, Permission, NetworkSlot, \
-    SlotType, LocationStore, MultiData, Hint, HintStatus
+    SlotType, LocationStore, MultiData, Hint, HintStatus, GamesPackage
 from BaseClasses import ItemClassification
 
 
@@ -61,6 +64,54 @@ server_per_message_deflate_factory = ServerPerMessageDeflateFactory(
 )
 
 
+class _ForwardingQueueHandler(logging.handlers.QueueHandler):
+    def __init__(self, log_queue: queue.SimpleQueue, target: logging.Logger) -> None:
+        super().__init__(log_queue)
+        self.target = target
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # formatting is left to the handlers of the target logger in the background thread
+        record.target_logger = self.target
+        return record
+
+
+class _ForwardHandler(logging.Handler):
+    def emit(self, record: logging.LogRecord) -> None:
+        target: logging.Logger = record.__dict__.pop("target_logger")
+        if target.isEnabledFor(record.levelno):
+            target.handle(record)
+
+
+_background_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+_background_log_listener: typing.Optional[logging.handlers.QueueListener] = None
+_background_log_listener_lock = threading.Lock()
+
+
+def get_background_logger(logger: logging.Logger) -> logging.Logger:
+    """
+    Logger that hands its records to the handlers of logger in a background thread, so that logging a lot of records,
+    such as for the items sent by a release, does not block the event loop on formatting and writing them.
+    """
+    global _background_log_listener
+    with _background_log_listener_lock:
+        if not _background_log_listener:
+            _background_log_listener = logging.handlers.QueueListener(_background_log_queue, _ForwardHandler())
+            _background_log_listener.start()
+            import atexit
+            atexit.register(_background_log_listener.stop)  # log what is still queued on exit
+    background_logger = logging.Logger(f"{logger.name}.background")
+    background_logger.addHandler(_ForwardingQueueHandler(_background_log_queue, logger))
+    return background_logger
+
+
+def flush_background_log() -> None:
+    """Hand the records queued by the background loggers to their handlers, before returning."""
+    with _background_log_listener_lock:
+        if _background_log_listener:
+            _background_log_listener.stop()  # handles every record queued so far
+            _background_log_listener.start()
+
+
 def remove_from_list(container, value):
     try:
         container.remove(value)
@@ -140,6 +191,190 @@ def get_saving_second(seed_name: str, interval: int = 60) -> int:
     return int(hashlib.sha256(seed_name.encode()).hexdigest(), 16) % interval
 
 
+data_package_cache_size = 64 * 1024 * 1024
+"""number of characters of encoded data packages to keep in _encoded_game_packages"""
+_encoded_game_packages: "collections.OrderedDict[typing.Tuple[str, str], str]" = collections.OrderedDict()
+"""(game, checksum) -> encoded data package of game, shared by all rooms of a process"""
+_encoded_game_packages_lock = threading.Lock()
+
+
+def encode_game_package(game: str, game_package: typing.Mapping[str, typing.Any]) -> str:
+    """JSON encoded data package of a game, cached by its checksum."""
+    checksum = game_package.get("checksum", None)
+    if not checksum:
+        return encode(game_package)
+    key = game, checksum
+    with _encoded_game_packages_lock:
+        encoded = _encoded_game_packages.get(key, None)
+        if encoded is not None:
+            _encoded_game_packages.move_to_end(key)
+            return encoded
+    encoded = encode(game_package)
+    with _encoded_game_packages_lock:
+        _encoded_game_packages[key] = encoded
+        cache_size = sum(len(cached) for cached in _encoded_game_packages.values())
+        while cache_size > data_package_cache_size and len(_encoded_game_packages) > 1:
+            cache_size -= len(_encoded_game_packages.popitem(last=False)[1])
+    return encoded
+
+
+def encode_data_package_msg(games: typing.Mapping[str, typing.Mapping[str, typing.Any]]) -> str:
+    """Encoded DataPackage message for games, put together from the cached encoded data package of each game."""
+    parts = ['[{"cmd":"DataPackage","data":{"games":{']
+    for game, game_package in games.items():
+        if len(parts) > 1:
+            parts.append(",")
+        parts += encode(game), ":", encode_game_package(game, game_package)
+    parts.append("}}}]")
+    return "".join(parts)
+
+
+_fuzzy_indexes: "weakref.WeakValueDictionary[typing.Tuple[str, str, str], Utils.FuzzyIndex]" = \
+    weakref.WeakValueDictionary()
+"""(game, checksum, names) -> fuzzy index of those names of game, shared by the rooms of a process that use it"""
+
+
+def get_shared_fuzzy_index(game: str, checksum: str, names: str) -> typing.Optional[Utils.FuzzyIndex]:
+    """Get the fuzzy index of names of game with checksum, if a room of this process still uses it."""
+    return _fuzzy_indexes.get((game, checksum, names), None)
+
+
+class SaveJournal:
+    """
+    Changes to the save data since it was last saved, so that a save only has to append them to a journal instead of
+    rewriting all save data. Once the journal has grown larger than the last snapshot of the save data, it is compacted
+    into a new snapshot.
+
+    Journal frames are tagged with the generation of the snapshot they apply to, which is stored in the snapshot as
+    "journal_generation", so that frames of an older snapshot, which were not removed yet, are not applied to a newer
+    one. All changes can be applied more than once, as saving can happen concurrently to the changes.
+    """
+    generation: int
+    snapshot_size: int
+    """size of the last snapshot, 0 if the save data has to be snapshot before anything can be appended"""
+    journal_size: int
+    """size of the frames appended since the last snapshot"""
+    fields: typing.Dict[str, typing.Any]
+    """whole fields as last written to the snapshot or journal, so they are only journaled again once they change"""
+
+    def __init__(self, generation: int = 0, snapshot_size: int = 0, journal_size: int = 0) -> None:
+        self.generation = generation
+        self.snapshot_size = snapshot_size
+        self.journal_size = journal_size
+        self.fields = {}
+        self._lock = threading.Lock()
+        self._entries: typing.List[typing.Tuple[typing.Any, ...]] = []
+        self._changed: typing.Dict[str, typing.Set[typing.Any]] = collections.defaultdict(set)
+        self._changed_fields: typing.Set[str] = set()
+
+    @property
+    def needs_snapshot(self) -> bool:
+        return not self.snapshot_size or self.journal_size > self.snapshot_size
+
+    def extend(self, field: str, key: typing.Any, start: int, items: typing.Sequence[typing.Any]) -> None:
+        """Record that items were appended to the list of key in field, which had start elements before."""
+        with self._lock:
+            self._entries.append(("extend", field, key, start, items))
+            self._changed_fields.add(field)
+
+    def update(self, field: str, key: typing.Any, values: typing.AbstractSet[typing.Any]) -> None:
+        """Record that values were added to the set of key in field."""
+        with self._lock:
+            self._entries.append(("update", field, key, values))
+            self._changed_fields.add(field)
+
+    def changed(self, field: str, key: typing.Any) -> None:
+        """Record that key in field was set or deleted. Its value is read when the frame is made."""
+        with self._lock:
+            self._changed[field].add(key)
+            self._changed_fields.add(field)
+
+    def take(self) -> typing.Tuple[typing.List[typing.Tuple[typing.Any, ...]],
+                                   typing.Dict[str, typing.Set[typing.Any]]]:
+        """Return and clear the recorded changes."""
+        with self._lock:
+            entries, self._entries = self._entries, []
+            changed, self._changed = self._changed, collections.defaultdict(set)
+        return entries, changed
+
+    def take_changed_fields(self) -> typing.Set[str]:
+        """
+        Return and clear the names of the fields changed since this was last called,
+        independent of the changes that are taken for saving.
+        """
+        with self._lock:
+            changed_fields, self._changed_fields = self._changed_fields, set()
+        return changed_fields
+
+    def start_snapshot(self) -> int:
+        """Discard the recorded changes, as a new snapshot will contain them, and return the new generation."""
+        self.take()
+        self.generation += 1
+        return self.generation
+
+    def set_field(self, entries: typing.List[typing.Tuple[typing.Any, ...]], field: str, value: typing.Any) -> None:
+        """Add setting the whole field to value to entries, unless it was last written with that value."""
+        if self.fields.get(field) != value:
+            self.fields[field] = value
+            entries.append(("field", field, value))
+
+    def encode_frame(self, entries: typing.List[typing.Tuple[typing.Any, ...]]) -> bytes:
+        return zlib.compress(pickle.dumps((self.generation, entries)))
+
+    @staticmethod
+    def append_frame(path: str, frame: bytes) -> None:
+        with open(path, "ab") as f:
+            f.write(len(frame).to_bytes(4, "little") + frame)
+
+    @staticmethod
+    def read_frames(path: str) -> typing.List[bytes]:
+        """Read the frames appended to the journal file at path, if it exists."""
+        frames: typing.List[bytes] = []
+        with contextlib.suppress(FileNotFoundError), open(path, "rb") as f:
+            while len(frame_size := f.read(4)) == 4:
+                frame = f.read(int.from_bytes(frame_size, "little"))
+                if len(frame) < int.from_bytes(frame_size, "little"):
+                    break  # incomplete last frame, from a save that was interrupted
+                frames.append(frame)
+        return frames
+
+    @staticmethod
+    def apply(savedata: typing.Dict[str, typing.Any], frames: typing.Iterable[bytes]) -> None:
+        """Apply the journal frames of the snapshot savedata to it."""
+        generation = savedata.get("journal_generation", 0)
+        # some fields are saved as sequences of key, value pairs
+        pair_fields: typing.Dict[str, typing.Dict[typing.Any, typing.Any]] = {}
+
+        def get_field(field: str) -> typing.Dict[typing.Any, typing.Any]:
+            if field in pair_fields:
+                return pair_fields[field]
+            container = savedata.setdefault(field, {})
+            if not isinstance(container, dict):
+                container = pair_fields[field] = dict(container)
+            return container
+
+        for frame in frames:
+            frame_generation, entries = restricted_loads(zlib.decompress(frame))
+            if frame_generation != generation:
+                continue
+            for operation, field, *args in entries:
+                if operation == "extend":
+                    key, start, items = args
+                    get_field(field).setdefault(key, [])[start:start + len(items)] = items
+                elif operation == "update":
+                    key, values = args
+                    get_field(field).setdefault(key, set()).update(values)
+                elif operation == "set":
+                    key, value = args
+                    get_field(field)[key] = value
+                elif operation == "del":
+                    get_field(field).pop(args[0], None)
+                elif operation == "field":
+                    savedata[field] = args[0]
+        for field, container in pair_fields.items():
+            savedata[field] = tuple(container.items())
+
+
 class Client(Endpoint):
     __slots__ = (
         "__weakref__",
@@ -230,9 +465,27 @@ class Context:
     # team -> slot id -> list of clients authenticated to slot.
     clients: typing.Dict[int, typing.Dict[int, typing.List[Client]]]
     endpoints: list[Client]
+    tag_clients: typing.Dict[typing.Tuple[int, str], typing.Set[Client]]
+    """(team, tag) -> connected clients with that tag, for Bounce"""
+    game_clients: typing.Dict[typing.Tuple[int, str], typing.Set[Client]]
+    """(team, game) -> connected clients of slots of that game, for Bounce"""
+    gamespackage: typing.Dict[str, GamesPackage]
     locations: LocationStore  # typing.Dict[int, typing.Dict[int, typing.Tuple[int, int, int]]]
     location_checks: typing.Dict[typing.Tuple[int, int], typing.Set[int]]
     hints_used: typing.Dict[typing.Tuple[int, int], int]
+    changed_received_items: typing.Set[typing.Tuple[int, int, bool]]
+    """(team, slot, remote_items) of the received_items that changed since send_new_items last sent them"""
+    outgoing: typing.List[typing.Tuple[int, str, typing.Union[None, int, Client], bool]]
+    """team, encoded message, its target and if it is text of the messages queued by queue_msgs, in queued order"""
+    received_items_position: typing.Optional[int]
+    """where in outgoing the new received items are sent, after the messages queued before send_new_items was called"""
+    outgoing_scheduled: bool
+    max_msgs_per_frame: typing.ClassVar[int] = 140
+    """
+    how many queued messages to send in one frame at most,
+    so that text frames stay close to the compression window of 64K but not too big on the wire
+    (roughly 1300-2600 bytes after compression depending on repetitiveness)
+    """
     groups: typing.Dict[int, typing.Set[int]]
     save_version = 2
     stored_data: typing.Dict[str, object]
@@ -251,21 +504,27 @@ class Context:
     spheres: typing.List[typing.Dict[int, typing.Set[int]]]
     """ each sphere is { player: { location_id, ... } } """
     logger: logging.Logger
+    background_logger: logging.Logger
+    """logs to logger from a background thread, for logging many records at once"""
 
     def __init__(self, host: str, port: int, server_password: str, password: str, location_check_points: int,
                  hint_cost: int, item_cheat: bool, release_mode: str = "disabled", collect_mode="disabled",
                  countdown_mode: str = "auto", remaining_mode: str = "disabled", auto_shutdown: typing.SupportsFloat = 0, 
                  compatibility: int = 2, log_network: bool = False, logger: logging.Logger = logging.getLogger()):
         self.logger = logger
+        self.background_logger = get_background_logger(logger)
         super(Context, self).__init__()
         self.slot_info = {}
         self.log_network = log_network
         self.endpoints = []
         self.clients = {}
+        self.tag_clients = {}
+        self.game_clients = {}
         self.compatibility: int = compatibility
         self.shutdown_task = None
         self.data_filename = None
         self.save_filename = None
+        self.save_journal: typing.Optional[SaveJournal] = None
         self.saving = False
         self.player_names: typing.Dict[team_slot, str] = {}
         self.player_name_lookup: typing.Dict[str, team_slot] = {}
@@ -278,6 +537,13 @@ class Context:
         self.server = None
         self.countdown_timer = 0
         self.received_items = {}
+        self.changed_received_items = set()
+        self.outgoing = []
+        self.received_items_position = None
+        self.outgoing_scheduled = False
+        # load of this room, read by the WebHost to spread its rooms over the host processes
+        self.handled_msgs = 0
+        self.handling_time = 0.0
         self.start_inventory = {}
         self.name_aliases: typing.Dict[team_slot, str] = {}
         self.location_checks = collections.defaultdict(set)
@@ -285,6 +551,9 @@ class Context:
         self.location_check_points = location_check_points
         self.hints_used = collections.defaultdict(int)
         self.hints: typing.Dict[team_slot, typing.Set[Hint]] = collections.defaultdict(set)
+        # (team, finding_player, location) -> (slot, hint) of each hint for that location held in self.hints
+        self.location_hints: typing.Dict[typing.Tuple[int, int, int], typing.Set[typing.Tuple[int, Hint]]] = \
+            collections.defaultdict(set)
         self.release_mode: str = release_mode
         self.remaining_mode: str = remaining_mode
         self.collect_mode: str = collect_mode
@@ -323,6 +592,7 @@ class Context:
         self.location_name_groups = {}
         self.all_item_and_group_names = {}
         self.all_location_and_group_names = {}
+        self.fuzzy_indexes: typing.Dict[typing.Tuple[str, str], Utils.FuzzyIndex] = {}
         self.item_names = collections.defaultdict(
             lambda: Utils.KeyedDefaultDict(lambda code: f'Unknown item (ID:{code})'))
         self.location_names = collections.defaultdict(
@@ -336,17 +606,27 @@ class Context:
         import worlds
         self.gamespackage = worlds.network_data_package["games"]
 
-        self.item_name_groups = {world_name: world.item_name_groups for world_name, world in
-                                 worlds.AutoWorldRegister.world_types.items()}
-        self.location_name_groups = {world_name: world.location_name_groups for world_name, world in
-                                     worlds.AutoWorldRegister.world_types.items()}
-        for world_name, world in worlds.AutoWorldRegister.world_types.items():
-            self.non_hintable_names[world_name] = world.hint_blacklist
+        for world_name in worlds.AutoWorldRegister.world_types:
+            cached_game = worlds.get_cached_game(world_name)
+            if cached_game:
+                # read from the startup cache, so that lazily imported worlds don't get imported by the server
+                game_package = cached_game["data_package"]
+                self.item_name_groups[world_name] = {group_name: frozenset(group) for group_name, group
+                                                     in game_package["item_name_groups"].items()}
+                self.location_name_groups[world_name] = {group_name: frozenset(group) for group_name, group
+                                                         in game_package["location_name_groups"].items()}
+                self.non_hintable_names[world_name] = frozenset(cached_game["hint_blacklist"])
+            else:
+                world = worlds.AutoWorldRegister.world_types[world_name]
+                self.item_name_groups[world_name] = world.item_name_groups
+                self.location_name_groups[world_name] = world.location_name_groups
+                self.non_hintable_names[world_name] = world.hint_blacklist
 
-        for game_package in self.gamespackage.values():
-            # remove groups from data sent to clients
-            del game_package["item_name_groups"]
-            del game_package["location_name_groups"]
+        # remove groups from data sent to clients, without modifying the data package of worlds
+        self.gamespackage = {world_name: typing.cast(GamesPackage, {
+                                 key: value for key, value in game_package.items()
+                                 if key not in ("item_name_groups", "location_name_groups")})
+                             for world_name, game_package in self.gamespackage.items()}
 
     def _init_game_data(self):
         for game_name, game_package in self.gamespackage.items():
@@ -374,6 +654,33 @@ class Context:
     def location_names_for_game(self, game: str) -> typing.Optional[typing.Dict[str, int]]:
         return self.gamespackage[game]["location_name_to_id"] if game in self.gamespackage else None
 
+    def get_fuzzy_index(self, game: str, names: str) -> Utils.FuzzyIndex:
+        """
+        Index of names of game for fuzzy lookups, built on first use.
+        names is one of "item_names", "location_names", "item_and_group_names" and "location_and_group_names".
+        """
+        index = self.fuzzy_indexes.get((game, names), None)
+        if index is None:
+            checksum = self.checksums.get(game, None)
+            if checksum:
+                index = get_shared_fuzzy_index(game, checksum, names)
+            if index is None:
+                if names == "item_names":
+                    words = self.item_names_for_game(game)
+                elif names == "location_names":
+                    words = self.location_names_for_game(game)
+                elif names == "item_and_group_names":
+                    words = self.all_item_and_group_names[game]
+                elif names == "location_and_group_names":
+                    words = self.all_location_and_group_names[game]
+                else:
+                    raise ValueError(f"Unknown names {names}")
+                index = Utils.FuzzyIndex(words)
+                if checksum:
+                    _fuzzy_indexes[game, checksum, names] = index
+            self.fuzzy_indexes[game, names] = index
+        return index
+
     # General networking
     async def send_msgs(self, endpoint: Endpoint, msgs: typing.Iterable[dict]) -> bool:
         if not endpoint.socket or not endpoint.socket.open:
@@ -419,53 +726,152 @@ class Context:
                 self.logger.info(f"Outgoing broadcast: {msg}")
             return True
 
-    def broadcast_all(self, msgs: typing.List[dict]):
-        msg_is_text = all(msg["cmd"] == "PrintJSON" for msg in msgs)
-        data = self.dumper(msgs)
-        endpoints = (
-            endpoint
-            for endpoint in self.endpoints
-            if endpoint.auth and not (msg_is_text and endpoint.no_text)
-        )
-        async_start(self.broadcast_send_encoded_msgs(endpoints, data))
-
-    def broadcast_text_all(self, text: str, additional_arguments: dict = {}):
+    def broadcast_all(self, msgs: typing.List[typing.Dict[str, typing.Any]]):
+        encoded = self.encode_queued(msgs)
+        for team in self.clients:
+            self.outgoing.extend((team, msg, None, is_text) for msg, is_text in encoded)
+        self.schedule_outgoing()
+
+    def broadcast_text_all(self, text: str, additional_arguments: typing.Dict[str, typing.Any] = {}):
         self.logger.info("Notice (all): %s" % text)
         self.broadcast_all([{**{"cmd": "PrintJSON", "data": [{ "text": text }]}, **additional_arguments}])
 
-    def broadcast_team(self, team: int, msgs: typing.List[dict]):
-        msg_is_text = all(msg["cmd"] == "PrintJSON" for msg in msgs)
-        data = self.dumper(msgs)
-        endpoints = (
-            endpoint
-            for endpoint in itertools.chain.from_iterable(self.clients[team].values())
-            if not (msg_is_text and endpoint.no_text)
-        )
-        async_start(self.broadcast_send_encoded_msgs(endpoints, data))
+    def broadcast_team(self, team: int, msgs: typing.List[typing.Dict[str, typing.Any]]):
+        self.queue_msgs(team, msgs)
 
-    def broadcast(self, endpoints: typing.Iterable[Client], msgs: typing.List[dict]):
-        msgs = self.dumper(msgs)
-        async_start(self.broadcast_send_encoded_msgs(endpoints, msgs))
+    def queue_msgs(self, team: int, msgs: typing.Iterable[typing.Dict[str, typing.Any]],
+                   target: typing.Union[None, int, Client] = None):
+        """
+        Queue messages for the clients of a team, or only those of a slot or a single client of it,
+        to be sent in the next iteration of the event loop, merged into as few frames as possible with the other
+        messages queued in the same iteration. Every client gets its messages in the order they were queued.
+        Text messages are not sent to clients with the NoText tag.
+        """
+        self.outgoing.extend((team, msg, target, is_text) for msg, is_text in self.encode_queued(msgs))
+        self.schedule_outgoing()
+
+    def encode_queued(self, msgs: typing.Iterable[typing.Dict[str, typing.Any]]
+                      ) -> typing.List[typing.Tuple[str, bool]]:
+        """Encode messages for outgoing, each with whether it is text."""
+        return [(self.dumper(msg), msg["cmd"] == "PrintJSON") for msg in msgs]
+
+    def schedule_outgoing(self):
+        """Schedule sending the queued messages and new received items, right away if there is no event loop."""
+        if self.outgoing_scheduled:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.send_outgoing()
+        else:
+            self.outgoing_scheduled = True
+            loop.call_soon(self.send_outgoing)
+
+    def send_outgoing(self):
+        start = time.perf_counter()
+        try:
+            self._send_outgoing()
+        finally:
+            self.handling_time += time.perf_counter() - start
+
+    def _send_outgoing(self):
+        outgoing, self.outgoing = self.outgoing, []
+        position, self.received_items_position = self.received_items_position, None
+        if self.changed_received_items:
+            _send_new_items(self)  # queues ReceivedItems for the clients that have new items
+            # they are sent where send_new_items was called, after the messages queued before that
+            if position is None:
+                position = len(outgoing)
+            outgoing[position:position] = self.outgoing
+            self.outgoing = []
+        self.outgoing_scheduled = False
+
+        def send_frames(endpoints: typing.List[Client], msgs: typing.List[str]):
+            if endpoints:
+                for start in range(0, len(msgs), self.max_msgs_per_frame):
+                    data = f"[{','.join(msgs[start:start + self.max_msgs_per_frame])}]"
+                    async_start(self.broadcast_send_encoded_msgs(endpoints, data))
+
+        teams: typing.Dict[int, typing.List[typing.Tuple[str, typing.Union[None, int, Client], bool]]] = {}
+        for team, msg, target, is_text in outgoing:
+            teams.setdefault(team, []).append((msg, target, is_text))
+        for team, queued in teams.items():
+            clients = list(itertools.chain.from_iterable(self.clients.get(team, {}).values()))
+            if all(target is None for _, target, _ in queued):
+                # messages for the whole team only are sent to everyone at once
+                send_frames([client for client in clients if not client.no_text], [msg for msg, _, _ in queued])
+                send_frames([client for client in clients if client.no_text],
+                            [msg for msg, _, is_text in queued if not is_text])
+                continue
+            # otherwise each group of clients that gets the same messages gets them merged in the order they were queued
+            client_targets = {target for _, target, _ in queued if isinstance(target, Client)}
+            groups: typing.Dict[typing.Any, typing.List[Client]] = collections.defaultdict(list)
+            for client in clients:
+                groups[client if client in client_targets else (client.slot, client.no_text)].append(client)
+            for group in groups.values():
+                client = group[0]
+                send_frames(group, [msg for msg, target, is_text in queued
+                                    if (target is None or target is client or target == client.slot)
+                                    and not (is_text and client.no_text)])
+
+    def broadcast(self, endpoints: typing.Iterable[Client], msgs: typing.List[typing.Dict[str, typing.Any]]):
+        """Queue messages for each of the endpoints, like queue_msgs does for a single client."""
+        encoded = self.encode_queued(msgs)
+        for endpoint in endpoints:
+            self.outgoing.extend((endpoint.team, msg, endpoint, is_text) for msg, is_text in encoded)
+        self.schedule_outgoing()
 
     async def disconnect(self, endpoint: Client):
         if endpoint in self.endpoints:
             self.endpoints.remove(endpoint)
         if endpoint.slot and endpoint in self.clients[endpoint.team][endpoint.slot]:
             self.clients[endpoint.team][endpoint.slot].remove(endpoint)
+            self.remove_bounce_targets(endpoint)
         await on_client_disconnected(self, endpoint)
 
+    def add_bounce_targets(self, client: Client) -> None:
+        """Add a connected client to the tag and game indexes used to find the targets of Bounce."""
+        for tag in set(client.tags):
+            self.tag_clients.setdefault((client.team, tag), set()).add(client)
+        self.game_clients.setdefault((client.team, self.games.get(client.slot)), set()).add(client)
+
+    def remove_bounce_targets(self, client: Client) -> None:
+        """Remove a client from the indexes of add_bounce_targets, before its team, slot or tags change."""
+        def discard(index: typing.Dict[typing.Tuple[int, str], typing.Set[Client]], key: typing.Tuple[int, str]):
+            targets = index.get(key)
+            if targets:
+                targets.discard(client)
+                if not targets:
+                    del index[key]
+
+        for tag in set(client.tags):
+            discard(self.tag_clients, (client.team, tag))
+        discard(self.game_clients, (client.team, self.games.get(client.slot)))
+
+    def get_bounce_targets(self, team: int, games: typing.AbstractSet[str], tags: typing.AbstractSet[str],
+                           slots: typing.AbstractSet[int]) -> typing.Set[Client]:
+        """Connected clients of team that are of one of games, have one of tags or are connected to one of slots."""
+        targets: typing.Set[Client] = set()
+        for game in games:
+            targets.update(self.game_clients.get((team, game), ()))
+        for tag in tags:
+            targets.update(self.tag_clients.get((team, tag), ()))
+        team_clients = self.clients.get(team, {})
+        for slot in slots:
+            targets.update(team_clients.get(slot, ()))
+        return targets
+
     def notify_client(self, client: Client, text: str, additional_arguments: dict = {}):
         if not client.auth or client.no_text:
             return
         self.logger.info("Notice (Player %s in team %d): %s" % (client.name, client.team + 1, text))
-        async_start(self.send_msgs(client, [{"cmd": "PrintJSON", "data": [{ "text": text }], **additional_arguments}]))
+        self.queue_msgs(client.team, [{"cmd": "PrintJSON", "data": [{ "text": text }], **additional_arguments}], client)
 
     def notify_client_multiple(self, client: Client, texts: typing.List[str], additional_arguments: dict = {}):
         if not client.auth or client.no_text:
             return
-        async_start(self.send_msgs(client,
-                                   [{"cmd": "PrintJSON", "data": [{ "text": text }], **additional_arguments}
-                                    for text in texts]))
+        self.queue_msgs(client.team, [{"cmd": "PrintJSON", "data": [{ "text": text }], **additional_arguments}
+                                      for text in texts], client)
 
     # loading
     def load(self, multidatapath: str, use_embedded_server_options: bool = False):
@@ -547,7 +953,8 @@ class Context:
             self.start_inventory[slot] = [NetworkItem(item_code, -2, 0) for item_code in item_codes]
 
         for slot, hints in decoded_obj["precollected_hints"].items():
-            self.hints[0, slot].update(hints)
+            for hint in hints:
+                self.add_hint(0, slot, hint)
 
         # declare slots that aren't players as done
         for slot, slot_info in self.slot_info.items():
@@ -594,12 +1001,25 @@ class Context:
 
     def _save(self, exit_save: bool = False) -> bool:
         try:
+            if self.save_journal and not exit_save and not self.save_journal.needs_snapshot:
+                frame = self.get_save_frame()
+                SaveJournal.append_frame(self.save_filename + ".journal", frame)
+                self.save_journal.journal_size += len(frame)
+                return True
+
             # Does not use Utils.restricted_dumps because we'd rather make a save than not make one
-            encoded_save = pickle.dumps(self.get_save())
+            encoded_save = zlib.compress(pickle.dumps(self.get_save_snapshot()))
             with open(self.save_filename, "wb") as f:
-                f.write(zlib.compress(encoded_save))
+                f.write(encoded_save)
+            if self.save_journal:
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(self.save_filename + ".journal")
+                self.save_journal.snapshot_size = len(encoded_save)
+                self.save_journal.journal_size = 0
         except Exception as e:
             self.logger.exception(e)
+            if self.save_journal:
+                self.save_journal.snapshot_size = 0  # retry with a snapshot, as the journal may not match it
             return False
         else:
             return True
@@ -608,14 +1028,19 @@ class Context:
         self.saving = enabled
         if self.saving:
             if not self.save_filename:
-                import os
                 name, ext = os.path.splitext(self.data_filename)
                 self.save_filename = name + '.apsave' if ext.lower() in ('.archipelago', '.zip') \
                     else self.data_filename + '_' + 'apsave'
+            self.save_journal = SaveJournal()
             try:
                 with open(self.save_filename, 'rb') as f:
-                    save_data = restricted_loads(zlib.decompress(f.read()))
-                    self.set_save(save_data)
+                    encoded_save = f.read()
+                save_data = restricted_loads(zlib.decompress(encoded_save))
+                frames = SaveJournal.read_frames(self.save_filename + ".journal")
+                SaveJournal.apply(save_data, frames)
+                self.set_save(save_data)
+                self.save_journal.snapshot_size = len(encoded_save)
+                self.save_journal.journal_size = sum(len(frame) for frame in frames)
             except FileNotFoundError:
                 self.logger.error('No save data found, starting a new game')
             except Exception as e:
@@ -653,8 +1078,38 @@ class Context:
                 import atexit
                 atexit.register(self._save, True)  # make sure we save on exit too
 
-    def get_save(self) -> dict:
-        self.recheck_hints()
+    def get_save_snapshot(self) -> typing.Dict[str, typing.Any]:
+        """get_save for a new snapshot of the save journal."""
+        if not self.save_journal:
+            return self.get_save()
+        generation = self.save_journal.start_snapshot()
+        d = self.get_save()
+        d["journal_generation"] = generation
+        self.save_journal.fields = {"random_state": d["random_state"], "game_options": d["game_options"]}
+        return d
+
+    def get_save_frame(self) -> bytes:
+        """Encode the changes recorded by the save journal since the last save into a journal frame."""
+        entries, changed = self.save_journal.take()
+        for field, keys in changed.items():
+            container = getattr(self, field)
+            for key in keys:
+                if key not in container:
+                    entries.append(("del", field, key))
+                elif isinstance(container[key], datetime.datetime):
+                    entries.append(("set", field, key, container[key].timestamp()))
+                else:
+                    entries.append(("set", field, key, container[key]))
+        self.save_journal.set_field(entries, "random_state", self.random.getstate())
+        self.save_journal.set_field(entries, "game_options", self.get_game_options())
+        return self.save_journal.encode_frame(entries)
+
+    def journal_change(self, field: str, key: typing.Any) -> None:
+        """Record that key of the save data field was set or deleted, for the next journal frame."""
+        if self.save_journal:
+            self.save_journal.changed(field, key)
+
+    def get_save(self) -> typing.Dict[str, typing.Any]:
         d = {
             "version": self.save_version,
             "connect_names": self.connect_names,
@@ -671,17 +1126,19 @@ class Context:
             "random_state": self.random.getstate(),
             "group_collected": dict(self.group_collected),
             "stored_data": self.stored_data,
-            "game_options": {"hint_cost": self.hint_cost, "location_check_points": self.location_check_points,
-                             "server_password": self.server_password, "password": self.password,
-                             "release_mode": self.release_mode,
-                             "remaining_mode": self.remaining_mode, "collect_mode": self.collect_mode,
-                             "countdown_mode": self.countdown_mode,
-                             "item_cheat": self.item_cheat, "compatibility": self.compatibility}
-
+            "game_options": self.get_game_options(),
         }
 
         return d
 
+    def get_game_options(self) -> dict:
+        return {"hint_cost": self.hint_cost, "location_check_points": self.location_check_points,
+                "server_password": self.server_password, "password": self.password,
+                "release_mode": self.release_mode,
+                "remaining_mode": self.remaining_mode, "collect_mode": self.collect_mode,
+                "countdown_mode": self.countdown_mode,
+                "item_cheat": self.item_cheat, "compatibility": self.compatibility}
+
     def set_save(self, savedata: dict):
         if self.connect_names != savedata["connect_names"]:
             raise Exception("This savegame does not appear to match the loaded multiworld.")
@@ -701,6 +1158,8 @@ class Context:
              in savedata["client_activity_timers"]})
         self.location_checks.update(savedata["location_checks"])
         self.random.setstate(savedata["random_state"])
+        if self.save_journal:
+            self.save_journal.generation = savedata.get("journal_generation", 0)
 
         if "game_options" in savedata:
             self.hint_cost = savedata["game_options"]["hint_cost"]
@@ -719,6 +1178,12 @@ class Context:
 
         if "stored_data" in savedata:
             self.stored_data = savedata["stored_data"]
+
+        self.location_hints.clear()
+        for (team, slot), hints in self.hints.items():
+            for hint in hints:
+                self.location_hints[team, hint.finding_player, hint.location].add((slot, hint))
+        self.recheck_hints()
         # count items and slots from lists for items_handling = remote
         self.logger.info(
             f'Loaded save file with {sum([len(v) for k, v in self.received_items.items() if k[2]])} received items '
@@ -737,23 +1202,37 @@ class Context:
         will refresh all teams or all slots respectively. If a set is passed for 'changed', each (team,slot)
         pair that has at least one hint modified will be added to the set.
         """
-        for hint_team, hint_slot in self.hints:
+        for hint_team, hint_slot in list(self.hints):
             if team != hint_team and team is not None:
                 continue  # Check specified team only, all if team is None
             if slot != hint_slot and slot is not None:
                 continue  # Check specified slot only, all if slot is None
-            new_hints: typing.Set[Hint] = set()
-            for hint in self.hints[hint_team, hint_slot]:
+            for hint in list(self.hints[hint_team, hint_slot]):
                 new_hint = hint.re_check(self, hint_team)
-                new_hints.add(new_hint)
                 if hint == new_hint:
                     continue
+                self.replace_hint(hint_team, hint_slot, hint, new_hint)
                 for player in self.slot_set(hint.receiving_player) | {hint.finding_player}:
                     if changed is not None:
                         changed.add((hint_team,player))
                     if slot is not None and slot != player:
                         self.replace_hint(hint_team, player, hint, new_hint)
-            self.hints[hint_team, hint_slot] = new_hints
+
+    def recheck_location_hints(self, team: int, finding_player: int, locations: typing.Iterable[int],
+                               changed: typing.Optional[typing.Set[team_slot]] = None) -> None:
+        """Refreshes only the hints for the specified locations of finding_player, such as after they were checked.
+        If a set is passed for 'changed', each (team,slot) pair that has at least one hint modified will be added.
+        """
+        for location in locations:
+            location_hints = self.location_hints.get((team, finding_player, location))
+            if not location_hints:
+                continue
+            for hint_slot, hint in list(location_hints):
+                new_hint = hint.re_check(self, team)
+                if hint != new_hint:
+                    self.replace_hint(team, hint_slot, hint, new_hint)
+                    if changed is not None:
+                        changed.add((team, hint_slot))
 
     def get_rechecked_hints(self, team: int, slot: int):
         self.recheck_hints(team, slot)
@@ -824,34 +1303,36 @@ class Context:
                 # since hints are bidirectional, finding player and receiving player,
                 # we can check once if hint already exists
                 if hint not in self.hints[team, hint.finding_player]:
-                    self.hints[team, hint.finding_player].add(hint)
+                    self.add_hint(team, hint.finding_player, hint)
                     new_hint_events.add(hint.finding_player)
                     for player in self.slot_set(hint.receiving_player):
-                        self.hints[team, player].add(hint)
+                        self.add_hint(team, player, hint)
                         new_hint_events.add(player)
 
             self.logger.info("Notice (Team #%d): %s" % (team + 1, format_hint(self, team, hint)))
         for slot in new_hint_events:
             self.on_new_hint(team, slot)
         for slot, hint_data in concerns.items():
-            if recipients is None or slot in recipients:
-                clients = filter(lambda c: not c.no_text, self.clients[team].get(slot, []))
-                if not clients:
-                    continue
+            if (recipients is None or slot in recipients) and self.clients[team].get(slot):
                 client_hints = [datum[1] for datum in sorted(hint_data, key=lambda x: x[0].finding_player != slot)]
-                for client in clients:
-                    async_start(self.send_msgs(client, client_hints))
+                self.queue_msgs(team, client_hints, slot)
 
     def get_hint(self, team: int, finding_player: int, seeked_location: int) -> typing.Optional[Hint]:
-        for hint in self.hints[team, finding_player]:
-            if hint.location == seeked_location and hint.finding_player == finding_player:
+        for hint_slot, hint in self.location_hints.get((team, finding_player, seeked_location), ()):
+            if hint_slot == finding_player:
                 return hint
         return None
-    
+
+    def add_hint(self, team: int, slot: int, hint: Hint) -> None:
+        self.hints[team, slot].add(hint)
+        self.journal_change("hints", (team, slot))
+        self.location_hints[team, hint.finding_player, hint.location].add((slot, hint))
+
     def replace_hint(self, team: int, slot: int, old_hint: Hint, new_hint: Hint) -> None:
         if old_hint in self.hints[team, slot]:
             self.hints[team, slot].remove(old_hint)
-            self.hints[team, slot].add(new_hint)
+            self.location_hints[team, old_hint.finding_player, old_hint.location].discard((slot, old_hint))
+            self.add_hint(team, slot, new_hint)
     
     # "events"
 
@@ -867,10 +1348,10 @@ class Context:
 
     def on_new_hint(self, team: int, slot: int):
         self.on_changed_hints(team, slot)
-        self.broadcast(self.clients[team][slot], [{
+        self.queue_msgs(team, [{
             "cmd": "RoomUpdate",
             "hint_points": get_slot_points(self, team, slot)
-        }])
+        }], slot)
 
     def on_changed_hints(self, team: int, slot: int):
         key: str = f"_read_hints_{team}_{slot}"
@@ -907,8 +1388,11 @@ async def server(websocket: "ServerConnection", path: str = "/", ctx: Context =
         async for data in websocket:
             if ctx.log_network:
                 ctx.logger.info(f"Incoming message: {data}")
+            start = time.perf_counter()
             for msg in decode(data):
                 await process_client_cmd(ctx, client, msg)
+                ctx.handled_msgs += 1
+            ctx.handling_time += time.perf_counter() - start
     except Exception as e:
         if not isinstance(e, websockets.WebSocketException):
             ctx.logger.exception(e)
@@ -984,12 +1468,14 @@ async def on_client_joined(ctx: Context, client: Client):
                                   "It may stop working in the future. If you are a player, please report this to the "
                                   "client's developer.")
     ctx.client_connection_timers[client.team, client.slot] = datetime.datetime.now(datetime.timezone.utc)
+    ctx.journal_change("client_connection_timers", (client.team, client.slot))
 
 
 async def on_client_left(ctx: Context, client: Client):
     if len(ctx.clients[client.team][client.slot]) < 1:
         update_client_status(ctx, client, ClientStatus.CLIENT_UNKNOWN)
         ctx.client_connection_timers[client.team, client.slot] = datetime.datetime.now(datetime.timezone.utc)
+        ctx.journal_change("client_connection_timers", (client.team, client.slot))
 
     version_str = '.'.join(str(x) for x in client.version)
 
@@ -1067,26 +1553,46 @@ def get_start_inventory(ctx: Context, player: int, remote_start_inventory: bool)
     return ctx.start_inventory.setdefault(player, []) if remote_start_inventory else []
 
 
+def add_received_items(ctx: Context, team: int, player: int, remote_items: bool, *items: NetworkItem) -> None:
+    """Add items to the received items of a player, to be sent to its clients by send_new_items."""
+    received_items = get_received_items(ctx, team, player, remote_items)
+    if ctx.save_journal:
+        ctx.save_journal.extend("received_items", (team, player, remote_items), len(received_items), items)
+    received_items.extend(items)
+    ctx.changed_received_items.add((team, player, remote_items))
+
+
 def send_new_items(ctx: Context):
-    for team, clients in ctx.clients.items():
-        for slot, clients in clients.items():
-            for client in clients:
-                if client.no_items:
-                    continue
-                start_inventory = get_start_inventory(ctx, slot, client.remote_start_inventory)
-                items = get_received_items(ctx, team, slot, client.remote_items)
-                if len(start_inventory) + len(items) > client.send_index:
-                    first_new_item = max(0, client.send_index - len(start_inventory))
-                    async_start(ctx.send_msgs(client, [{
-                        "cmd": "ReceivedItems",
-                        "index": client.send_index,
-                        "items": start_inventory[client.send_index:] + items[first_new_item:]}]))
-                    client.send_index = len(start_inventory) + len(items)
+    """
+    Send the received items added since the last call to the clients they were added for.
+    Within the event loop, this is deferred to the next iteration, so that the items of all checks handled in the same
+    iteration are sent as one message per client, after the messages queued before the first call.
+    """
+    if ctx.received_items_position is None:
+        ctx.received_items_position = len(ctx.outgoing)
+    ctx.schedule_outgoing()
+
+
+def _send_new_items(ctx: Context):
+    changed_received_items = ctx.changed_received_items
+    ctx.changed_received_items = set()
+    for team, slot, remote_items in changed_received_items:
+        for client in ctx.clients.get(team, {}).get(slot, ()):
+            if client.no_items or client.remote_items != remote_items:
+                continue
+            start_inventory = get_start_inventory(ctx, slot, client.remote_start_inventory)
+            items = get_received_items(ctx, team, slot, client.remote_items)
+            if len(start_inventory) + len(items) > client.send_index:
+                first_new_item = max(0, client.send_index - len(start_inventory))
+                ctx.queue_msgs(team, [{
+                    "cmd": "ReceivedItems",
+                    "index": client.send_index,
+                    "items": start_inventory[client.send_index:] + items[first_new_item:]}], client)
+                client.send_index = len(start_inventory) + len(items)
 
 
 def update_checked_locations(ctx: Context, team: int, slot: int):
-    ctx.broadcast(ctx.clients[team][slot],
-                  [{"cmd": "RoomUpdate", "checked_locations": get_checked_checks(ctx, team, slot)}])
+    ctx.queue_msgs(team, [{"cmd": "RoomUpdate", "checked_locations": get_checked_checks(ctx, team, slot)}], slot)
 
 
 def release_player(ctx: Context, team: int, slot: int):
@@ -1115,6 +1621,7 @@ def collect_player(ctx: Context, team: int, slot: int, is_group: bool = False):
             if slot in group_players:
                 group_collected_players = ctx.group_collected.setdefault(group, set())
                 group_collected_players.add(slot)
+                ctx.journal_change("group_collected", group)
                 if set(group_players) == group_collected_players:
                     collect_player(ctx, team, group, True)
 
@@ -1125,10 +1632,8 @@ def get_remaining(ctx: Context, team: int, slot: int) -> typing.List[typing.Tupl
 
 def send_items_to(ctx: Context, team: int, target_slot: int, *items: NetworkItem):
     for target in ctx.slot_set(target_slot):
-        for item in items:
-            if item.player != target_slot:
-                get_received_items(ctx, team, target, False).append(item)
-            get_received_items(ctx, team, target, True).append(item)
+        add_received_items(ctx, team, target, False, *(item for item in items if item.player != target_slot))
+        add_received_items(ctx, team, target, True, *items)
 
 
 def register_location_checks(ctx: Context, team: int, slot: int, locations: typing.Iterable[int],
@@ -1139,6 +1644,7 @@ def register_location_checks(ctx: Context, team: int, slot: int, locations: typi
     if new_locations:
         if count_activity:
             ctx.client_activity_timers[team, slot] = datetime.datetime.now(datetime.timezone.utc)
+            ctx.journal_change("client_activity_timers", (team, slot))
 
         sortable: list[tuple[int, int, int, int]] = []
         for location in new_locations:
@@ -1152,28 +1658,26 @@ def register_location_checks(ctx: Context, team: int, slot: int, locations: typi
             new_item = NetworkItem(item_id, location, slot, flags)
             send_items_to(ctx, team, target_player, new_item)
 
-            ctx.logger.info('(Team #%d) %s sent %s to %s (%s)' % (
+            ctx.background_logger.info(
+                '(Team #%d) %s sent %s to %s (%s)',
                 team + 1, ctx.player_names[(team, slot)], ctx.item_names[ctx.slot_info[target_player].game][item_id],
-                ctx.player_names[(team, target_player)], ctx.location_names[ctx.slot_info[slot].game][location]))
-            if len(info_texts) >= 140:
-                # split into chunks that are close to compression window of 64K but not too big on the wire
-                # (roughly 1300-2600 bytes after compression depending on repetitiveness)
-                ctx.broadcast_team(team, info_texts)
-                info_texts.clear()
+                ctx.player_names[(team, target_player)], ctx.location_names[ctx.slot_info[slot].game][location])
             info_texts.append(json_format_send_event(new_item, target_player))
         ctx.broadcast_team(team, info_texts)
         del info_texts
         del sortable
 
         ctx.location_checks[team, slot] |= new_locations
+        if ctx.save_journal:
+            ctx.save_journal.update("location_checks", (team, slot), new_locations)
         send_new_items(ctx)
-        ctx.broadcast(ctx.clients[team][slot], [{
+        ctx.queue_msgs(team, [{
             "cmd": "RoomUpdate",
             "hint_points": get_slot_points(ctx, team, slot),
             "checked_locations": new_locations,  # send back new checks only
-        }])
+        }], slot)
         updated_slots: typing.Set[tuple[int, int]] = set()
-        ctx.recheck_hints(team, slot, updated_slots)
+        ctx.recheck_location_hints(team, slot, new_locations, updated_slots)
         for hint_team, hint_slot in updated_slots:
             ctx.on_changed_hints(hint_team, hint_slot)
         ctx.save()
@@ -1650,12 +2154,14 @@ class ClientMessageProcessor(CommonCommandProcessor):
         if alias_name:
             alias_name = alias_name[:16].strip()
             self.ctx.name_aliases[self.client.team, self.client.slot] = alias_name
+            self.ctx.journal_change("name_aliases", (self.client.team, self.client.slot))
             self.output(f"Hello, {alias_name}")
             update_aliases(self.ctx, self.client.team)
             self.ctx.save()
             return True
         elif (self.client.team, self.client.slot) in self.ctx.name_aliases:
             del (self.ctx.name_aliases[self.client.team, self.client.slot])
+            self.ctx.journal_change("name_aliases", (self.client.team, self.client.slot))
             self.output("Removed Alias")
             update_aliases(self.ctx, self.client.team)
             self.ctx.save()
@@ -1669,12 +2175,12 @@ class ClientMessageProcessor(CommonCommandProcessor):
             names = self.ctx.item_names_for_game(self.ctx.games[self.client.slot])
             item_name, usable, response = get_intended_text(
                 item_name,
-                names
+                self.ctx.get_fuzzy_index(self.ctx.games[self.client.slot], "item_names")
             )
             if usable:
                 new_item = NetworkItem(names[item_name], -1, self.client.slot)
-                get_received_items(self.ctx, self.client.team, self.client.slot, False).append(new_item)
-                get_received_items(self.ctx, self.client.team, self.client.slot, True).append(new_item)
+                add_received_items(self.ctx, self.client.team, self.client.slot, False, new_item)
+                add_received_items(self.ctx, self.client.team, self.client.slot, True, new_item)
                 self.ctx.broadcast_text_all(
                     'Cheat console: sending "' + item_name + '" to ' + self.ctx.get_aliased_name(self.client.team,
                                                                                                  self.client.slot),
@@ -1692,9 +2198,7 @@ class ClientMessageProcessor(CommonCommandProcessor):
         points_available = get_client_points(self.ctx, self.client)
         cost = self.ctx.get_hint_cost(self.client.slot)
         if not input_text:
-            hints = {hint.re_check(self.ctx, self.client.team) for hint in
-                     self.ctx.hints[self.client.team, self.client.slot]}
-            self.ctx.hints[self.client.team, self.client.slot] = hints
+            hints = self.ctx.get_rechecked_hints(self.client.team, self.client.slot)
             self.ctx.notify_hints(self.client.team, list(hints), recipients=(self.client.slot,))
             self.output(f"A hint costs {self.ctx.get_hint_cost(self.client.slot)} points. "
                         f"You have {points_available} points.")
@@ -1725,9 +2229,8 @@ class ClientMessageProcessor(CommonCommandProcessor):
             if game not in self.ctx.all_item_and_group_names:
                 self.output("Can't look up item/location for unknown game. Hint for ID instead.")
                 return False
-            names = self.ctx.all_location_and_group_names[game] \
-                if for_location else \
-                self.ctx.all_item_and_group_names[game]
+            names = self.ctx.get_fuzzy_index(game,
+                                             "location_and_group_names" if for_location else "item_and_group_names")
             hint_name, usable, response = get_intended_text(input_text, names)
 
             if usable:
@@ -1786,6 +2289,7 @@ class ClientMessageProcessor(CommonCommandProcessor):
                     hints.append(hint)
                     can_pay -= 1
                     self.ctx.hints_used[self.client.team, self.client.slot] += 1
+                    self.ctx.journal_change("hints_used", (self.client.team, self.client.slot))
 
                 self.ctx.notify_hints(self.client.team, hints)
                 if not_found_hints:
@@ -1904,6 +2408,7 @@ async def process_client_cmd(ctx: Context, client: Client, args: dict):
         else:
             team, slot = ctx.connect_names[args['name']]
             if client.auth and client.team is not None and client.slot in ctx.clients[client.team]:
+                ctx.remove_bounce_targets(client)
                 ctx.clients[team][slot].remove(client)  # re-auth, remove old entry
                 if client.team != team or client.slot != slot:
                     client.auth = False  # swapping Team/Slot
@@ -1917,6 +2422,7 @@ async def process_client_cmd(ctx: Context, client: Client, args: dict):
             client.no_locations = bool(client.tags & _non_game_messages.keys())
             # set NoText for old PopTracker clients that predate the tag to save traffic
             client.no_text = "NoText" in client.tags or ("PopTracker" in client.tags and client.version < (0, 5, 1))
+            ctx.add_bounce_targets(client)
             connected_packet = {
                 "cmd": "Connected",
                 "team": client.team, "slot": client.slot,
@@ -1942,23 +2448,19 @@ async def process_client_cmd(ctx: Context, client: Client, args: dict):
     elif cmd == "GetDataPackage":
         exclusions = args.get("exclusions", [])
         if "games" in args:
+            requested_games = set(args.get("games", []))
             games = {name: game_data for name, game_data in ctx.gamespackage.items()
-                     if name in set(args.get("games", []))}
-            await ctx.send_msgs(client, [{"cmd": "DataPackage",
-                                          "data": {"games": games}}])
+                     if name in requested_games}
+            await ctx.send_encoded_msgs(client, encode_data_package_msg(games))
         # TODO: remove exclusions behaviour around 0.5.0
         elif exclusions:
             exclusions = set(exclusions)
             games = {name: game_data for name, game_data in ctx.gamespackage.items()
                      if name not in exclusions}
-
-            package = {"games": games}
-            await ctx.send_msgs(client, [{"cmd": "DataPackage",
-                                          "data": package}])
+            await ctx.send_encoded_msgs(client, encode_data_package_msg(games))
 
         else:
-            await ctx.send_msgs(client, [{"cmd": "DataPackage",
-                                          "data": {"games": ctx.gamespackage}}])
+            await ctx.send_encoded_msgs(client, encode_data_package_msg(ctx.gamespackage))
 
     elif client.auth:
         if cmd == "ConnectUpdate":
@@ -1986,7 +2488,9 @@ async def process_client_cmd(ctx: Context, client: Client, args: dict):
 
             if "tags" in args:
                 old_tags = client.tags
+                ctx.remove_bounce_targets(client)
                 client.tags = args["tags"]
+                ctx.add_bounce_targets(client)
                 if set(old_tags) != set(client.tags):
                     client.no_locations = bool(client.tags & _non_game_messages.keys())
                     client.no_text = "NoText" in client.tags or (
@@ -2153,11 +2657,9 @@ async def process_client_cmd(ctx: Context, client: Client, args: dict):
             args["cmd"] = "Bounced"
             msg = ctx.dumper([args])
 
-            for bounceclient in ctx.endpoints:
-                if client.team == bounceclient.team and (ctx.games[bounceclient.slot] in games or
-                                                         set(bounceclient.tags) & tags or
-                                                         bounceclient.slot in slots):
-                    await ctx.send_encoded_msgs(bounceclient, msg)
+            targets = ctx.get_bounce_targets(client.team, games, tags, slots)
+            if targets:
+                await ctx.broadcast_send_encoded_msgs(targets, msg)
 
         elif cmd == "Get":
             if "keys" not in args or type(args["keys"]) != list:
@@ -2187,6 +2689,7 @@ async def process_client_cmd(ctx: Context, client: Client, args: dict):
                 func = modify_functions[operation["operation"]]
                 value = func(value, operation["value"])
             ctx.stored_data[args["key"]] = args["value"] = value
+            ctx.journal_change("stored_data", args["key"])
             targets = set(ctx.stored_data_notification_clients[args["key"]])
             if args.get("want_reply", False):
                 targets.add(client)
@@ -2215,6 +2718,7 @@ def update_client_status(ctx: Context, client: Client, new_status: ClientStatus)
                 ctx.broadcast_text_all(f"Team #{client.team + 1} has completed all of their games! Congratulations!")
 
         ctx.client_game_state[client.team, client.slot] = new_status
+        ctx.journal_change("client_game_state", (client.team, client.slot))
         ctx.on_client_status_change(client.team, client.slot)
         ctx.save()
 
@@ -2274,12 +2778,14 @@ class ServerCommandProcessor(CommonCommandProcessor):
                     if alias_name:
                         alias_name = alias_name.strip()[:15]
                         self.ctx.name_aliases[team, slot] = alias_name
+                        self.ctx.journal_change("name_aliases", (team, slot))
                         self.output(f"Named {player_name} as {alias_name}")
                         update_aliases(self.ctx, team)
                         self.ctx.save()
                         return True
                     else:
                         del (self.ctx.name_aliases[team, slot])
+                        self.ctx.journal_change("name_aliases", (team, slot))
                         self.output(f"Removed Alias for {player_name}")
                         update_aliases(self.ctx, team)
                         self.ctx.save()
@@ -2377,7 +2883,8 @@ class ServerCommandProcessor(CommonCommandProcessor):
             team, slot = self.ctx.player_name_lookup[seeked_player]
             item_name = " ".join(item_name)
             names = self.ctx.item_names_for_game(self.ctx.games[slot])
-            item_name, usable, response = get_intended_text(item_name, names)
+            item_name, usable, response = get_intended_text(
+                item_name, self.ctx.get_fuzzy_index(self.ctx.games[slot], "item_names"))
             if usable:
                 amount: int = int(amount)
                 if amount > 100:
@@ -2412,7 +2919,8 @@ class ServerCommandProcessor(CommonCommandProcessor):
             if full_name.isnumeric():
                 location, usable, response = int(full_name), True, None
             elif self.ctx.location_names_for_game(game) is not None:
-                location, usable, response = get_intended_text(full_name, self.ctx.location_names_for_game(game))
+                location, usable, response = get_intended_text(full_name,
+                                                               self.ctx.get_fuzzy_index(game, "location_names"))
             else:
                 self.output("Can't look up location for unknown game. Send by ID instead.")
                 return False
@@ -2443,7 +2951,8 @@ class ServerCommandProcessor(CommonCommandProcessor):
             if full_name.isnumeric():
                 item, usable, response = int(full_name), True, None
             elif game in self.ctx.all_item_and_group_names:
-                item, usable, response = get_intended_text(full_name, self.ctx.all_item_and_group_names[game])
+                item, usable, response = get_intended_text(full_name,
+                                                           self.ctx.get_fuzzy_index(game, "item_and_group_names"))
             else:
                 self.output("Can't look up item for unknown game. Hint for ID instead.")
                 return False
@@ -2482,7 +2991,8 @@ class ServerCommandProcessor(CommonCommandProcessor):
             if full_name.isnumeric():
                 location, usable, response = int(full_name), True, None
             elif game in self.ctx.all_location_and_group_names:
-                location, usable, response = get_intended_text(full_name, self.ctx.all_location_and_group_names[game])
+                location, usable, response = get_intended_text(
+                    full_name, self.ctx.get_fuzzy_index(game, "location_and_group_names"))
             else:
                 self.output("Can't look up location for unknown game. Hint for ID instead.")
                 return False
@@ -2769,6 +3279,8 @@ async def main(args: argparse.Namespace):
 client_message_processor = ClientMessageProcessor
 
 if __name__ == '__main__':
+    # the server only needs the data packages of the games, which the startup cache provides without importing worlds
+    os.environ.setdefault("LAZY_WORLD_IMPORTS", "1")
     try:
         asyncio.run(main(parse_args()))
     except asyncio.exceptions.CancelledError:
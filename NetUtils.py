@@ -104,6 +104,8 @@ def _scan_for_TypedTuples(obj: typing.Any) -> typing.Any:
         return tuple(_scan_for_TypedTuples(o) for o in obj)
     if isinstance(obj, dict):
         return {key: _scan_for_TypedTuples(value) for key, value in obj.items()}
+    if isinstance(obj, Mapping):  # read-only mappings, such as the shared data package of WebHost room hosts
+        return {key: _scan_for_TypedTuples(value) for key, value in obj.items()}
     return obj
 
 
@@ -415,8 +417,12 @@ class Hint(typing.NamedTuple):
 
 
 class _LocationStore(dict, typing.MutableMapping[int, typing.Dict[int, typing.Tuple[int, int, int]]]):
+    _receiver_index: typing.Optional[typing.Dict[int, typing.Dict[int, typing.List[typing.Tuple[int, int, int]]]]]
+    """receiver -> item -> (sender, location, flags) of each location with that item, built on first use"""
+
     def __init__(self, values: typing.MutableMapping[int, typing.Dict[int, typing.Tuple[int, int, int]]]):
         super().__init__(values)
+        self._receiver_index = None
 
         if not self:
             raise ValueError(f"Rejecting game with 0 players")
@@ -427,20 +433,31 @@ class _LocationStore(dict, typing.MutableMapping[int, typing.Dict[int, typing.Tu
         if len(self.get(0, {})):
             raise ValueError("Invalid player id 0 for location")
 
+    def _get_receiver_index(self) -> typing.Dict[int, typing.Dict[int, typing.List[typing.Tuple[int, int, int]]]]:
+        # locations are not expected to change once loaded, so the index is never invalidated
+        if self._receiver_index is None:
+            import collections
+            receiver_index: typing.Dict[int, typing.Dict[int, typing.List[typing.Tuple[int, int, int]]]] = \
+                collections.defaultdict(lambda: collections.defaultdict(list))
+            for finding_player, check_data in self.items():
+                for location_id, (item_id, receiving_player, item_flags) in check_data.items():
+                    receiver_index[receiving_player][item_id].append((finding_player, location_id, item_flags))
+            self._receiver_index = {receiving_player: dict(items) for receiving_player, items in receiver_index.items()}
+        return self._receiver_index
+
     def find_item(self, slots: typing.Set[int], seeked_item_id: int
                   ) -> typing.Generator[typing.Tuple[int, int, int, int, int], None, None]:
-        for finding_player, check_data in self.items():
-            for location_id, (item_id, receiving_player, item_flags) in check_data.items():
-                if receiving_player in slots and item_id == seeked_item_id:
-                    yield finding_player, location_id, item_id, receiving_player, item_flags
+        receiver_index = self._get_receiver_index()
+        for receiving_player in slots:
+            if receiving_player in receiver_index:
+                for finding_player, location_id, item_flags in receiver_index[receiving_player].get(seeked_item_id, ()):
+                    yield finding_player, location_id, seeked_item_id, receiving_player, item_flags
 
     def get_for_player(self, slot: int) -> typing.Dict[int, typing.Set[int]]:
-        import collections
-        all_locations: typing.Dict[int, typing.Set[int]] = collections.defaultdict(set)
-        for source_slot, location_data in self.items():
-            for location_id, values in location_data.items():
-                if values[1] == slot:
-                    all_locations[source_slot].add(location_id)
+        all_locations: typing.Dict[int, typing.Set[int]] = {}
+        for locations in self._get_receiver_index().get(slot, {}).values():
+            for source_slot, location_id, _ in locations:
+                all_locations.setdefault(source_slot, set()).add(location_id)
         return all_locations
 
     def get_checked(self, state: typing.Dict[typing.Tuple[int, int], typing.Set[int]], team: int, slot: int
@@ -682,30 +682,112 @@ def format_SI_prefix(value, power=1000, power_labels=("", "k", "M", "G", "T", "P
     return f"{value.quantize(decimal.Decimal('1.00'))} {chaining_prefix(n, power_labels)}"
 
 
+def _get_gram_masks(word: str) -> typing.Tuple[int, int]:
+    """
+    Bit sets of the characters, counting up to two of each, and of the character pairs of a word.
+    Each edit adds at most one character and three character pairs to a word, so the bits one word has and another
+    lacks give a lower bound of their edit distance, far cheaper to compute than the distance itself.
+    """
+    chars = 0
+    pairs = 0
+    previous = 0
+    for char in word:
+        code = ord(char)
+        bit = 1 << (code & 63)
+        chars |= bit << 64 if chars & bit else bit
+        pairs |= 1 << ((previous * 31 + code) & 255)
+        previous = code
+    return chars, pairs
+
+
+class FuzzyIndex(typing.Collection[str]):
+    """
+    Words prepared for repeated fuzzy lookups with get_fuzzy_results, meant to be built once per set of names.
+    Candidates are grouped by length, and the groups are scored from closest length to furthest,
+    skipping those that can not beat the results found so far.
+    """
+    __slots__ = ("words", "_word_set", "_lowered", "_masks", "_buckets", "__weakref__")
+
+    words: typing.Sequence[str]
+
+    def __init__(self, words: typing.Iterable[str]) -> None:
+        self.words = tuple(words)
+        self._word_set = frozenset(self.words)
+        self._lowered = [word.lower() for word in self.words]
+        self._masks = [_get_gram_masks(word) for word in self._lowered]
+        buckets: typing.Dict[typing.Tuple[int, int], typing.List[int]] = collections.defaultdict(list)
+        for index, (word, lowered) in enumerate(zip(self.words, self._lowered)):
+            buckets[len(lowered), len(word)].append(index)
+        self._buckets = dict(buckets)
+
+    def __contains__(self, word: object) -> bool:
+        return word in self._word_set
+
+    def __iter__(self) -> typing.Iterator[str]:
+        return iter(self.words)
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def get_results(self, input_word: str, limit: typing.Optional[int] = None) -> typing.List[typing.Tuple[str, int]]:
+        """See get_fuzzy_results."""
+        import heapq
+        import jellyfish
+
+        limit = min(limit, len(self.words)) if limit else len(self.words)
+        if not limit:
+            return []
+        lowered_input = input_word.lower()
+        input_chars, input_pairs = _get_gram_masks(lowered_input)
+
+        def get_bound(lowered_length: int, length: int) -> float:
+            if lowered_length == len(lowered_input) and length == len(input_word):
+                return 1.01  # could be a perfect match
+            return 1 - abs(lowered_length - len(lowered_input)) / max(length, len(input_word))
+
+        # min heap of the best (ratio, -index) so far, with ties going to the earlier word like a stable sort would
+        best: typing.List[typing.Tuple[float, int]] = []
+        for bound, (lowered_length, length) in sorted(((get_bound(*key), key) for key in self._buckets),
+                                                      reverse=True):
+            if len(best) == limit and bound < best[0][0]:
+                break
+            max_length = max(length, len(input_word))
+            length_distance = abs(lowered_length - len(lowered_input))
+            for index in self._buckets[lowered_length, length]:
+                word = self.words[index]
+                if word == input_word:
+                    ratio = 1.01
+                else:
+                    if len(best) == limit:
+                        chars, pairs = self._masks[index]
+                        min_distance = max(length_distance,
+                                           (input_chars & ~chars).bit_count(), (chars & ~input_chars).bit_count(),
+                                           -(-(input_pairs & ~pairs).bit_count() // 3),
+                                           -(-(pairs & ~input_pairs).bit_count() // 3))
+                        if 1 - min_distance / max_length < best[0][0]:
+                            continue
+                    ratio = 1 - jellyfish.damerau_levenshtein_distance(lowered_input, self._lowered[index]) \
+                        / max_length
+                if len(best) < limit:
+                    heapq.heappush(best, (ratio, -index))
+                elif (ratio, -index) > best[0]:
+                    heapq.heapreplace(best, (ratio, -index))
+        return [(self.words[-index], int(ratio * 100)) for ratio, index in sorted(best, reverse=True)]
+
+
 def get_fuzzy_results(input_word: str, word_list: typing.Collection[str], limit: typing.Optional[int] = None) \
         -> typing.List[typing.Tuple[str, int]]:
-    import jellyfish
-
-    def get_fuzzy_ratio(word1: str, word2: str) -> float:
-        if word1 == word2:
-            return 1.01
-        return (1 - jellyfish.damerau_levenshtein_distance(word1.lower(), word2.lower())
-                / max(len(word1), len(word2)))
-
-    limit = limit if limit else len(word_list)
-    return list(
-        map(
-            lambda container: (container[0], int(container[1]*100)),  # convert up to limit to int %
-            sorted(
-                map(lambda candidate: (candidate, get_fuzzy_ratio(input_word, candidate)), word_list),
-                key=lambda element: element[1],
-                reverse=True
-            )[0:limit]
-        )
-    )
+    """
+    Score each word of word_list by its similarity to input_word, in percent, with 101 for a perfect match
+    and 100 for a case-insensitive perfect match. Returns the best limit words, best first.
+    Pass a FuzzyIndex as word_list to reuse the preparation of the words between lookups.
+    """
+    if not isinstance(word_list, FuzzyIndex):
+        word_list = FuzzyIndex(word_list)
+    return word_list.get_results(input_word, limit)
 
 
-def get_intended_text(input_text: str, possible_answers) -> typing.Tuple[str, bool, str]:
+def get_intended_text(input_text: str, possible_answers: typing.Collection[str]) -> typing.Tuple[str, bool, str]:
     picks = get_fuzzy_results(input_text, possible_answers, limit=2)
     if len(picks) > 1:
         dif = picks[0][1] - picks[1][1]
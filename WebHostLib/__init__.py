@@ -50,6 +50,9 @@ app.config["JOB_TIME"] = 600
 app.config["MAX_ROOM_TIMEOUT"] = 259200
 # memory limit for generator processes in bytes
 app.config["GENERATOR_MEMORY_LIMIT"] = 4294967296
+# peak resident memory in bytes from which a generator process gets killed. Can be set to None to disable.
+# has to be below GENERATOR_MEMORY_LIMIT, which limits the address space, so resident memory can never reach it
+app.config["GENERATOR_RSS_LIMIT"] = 3221225472
 
 # waitress uses one thread for I/O, these are for processing of views that then get sent
 # archipelago.gg uses gunicorn + nginx; ignoring this option
@@ -82,4 +82,11 @@ def wait_seed_api(seed: UUID):
         return {"text": "Generation not found"}, 404
     elif generation.state == STATE_ERROR:
         return {"text": "Generation failed"}, 500
+    progress = json.loads(generation.meta).get("progress", {})
+    if "fill" in progress:
+        fill = progress["fill"]
+        return {"text": f"Generation running, placing {fill['name']} items: {fill['placed']}/{fill['total']}",
+                "progress": progress}, 202
+    elif "stage" in progress:
+        return {"text": f"Generation running, at {progress['stage']}", "progress": progress}, 202
     return {"text": "Generation running"}, 202
@@ -2,13 +2,13 @@ from datetime import datetime, timezone
 from typing import Any, TypedDict
 from uuid import UUID
 
-from flask import abort
+from flask import Response, abort, jsonify, make_response, request
 
 from NetUtils import ClientStatus, Hint, NetworkItem, SlotType
 from WebHostLib import cache
 from WebHostLib.api import api_endpoints
 from WebHostLib.models import Room
-from WebHostLib.tracker import TrackerData
+from WebHostLib.tracker import TrackerData, get_tracker_etag
 
 
 class PlayerAlias(TypedDict):
@@ -65,8 +65,7 @@ class PlayerGame(TypedDict):
 
 
 @api_endpoints.route("/tracker/<suuid:tracker>")
-@cache.memoize(timeout=60)
-def tracker_data(tracker: UUID) -> dict[str, Any]:
+def tracker_data(tracker: UUID) -> Response:
     """
     Outputs json data to <root_path>/api/tracker/<id of current session tracker>.
 
@@ -78,6 +77,19 @@ def tracker_data(tracker: UUID) -> dict[str, Any]:
     if not room:
         abort(404)
 
+    etag = get_tracker_etag(room)
+    if etag and request.if_none_match.contains(etag):
+        return make_response("", 304)
+    response = jsonify(_get_tracker_data(tracker, etag))
+    if etag:
+        response.set_etag(etag)
+    return response
+
+
+@cache.memoize(timeout=60)
+def _get_tracker_data(tracker: UUID, etag: str | None) -> dict[str, Any]:
+    # etag is part of the cache key, so that a new save is never served with an old ETag
+    room: Room = Room.get(tracker=tracker)
     tracker_data = TrackerData(room)
 
     all_players: dict[int, list[int]] = tracker_data.get_all_players()
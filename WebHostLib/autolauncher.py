@@ -3,15 +3,20 @@ from __future__ import annotations
 import json
 import logging
 import multiprocessing
+import os
+import queue
+import sys
+import time
+import traceback
 import typing
 from datetime import timedelta
-from threading import Event, Thread
+from threading import Event, Thread, current_thread, main_thread
 from typing import Any
 from uuid import UUID
 
-from pony.orm import db_session, select, commit, PrimaryKey, desc
+from pony.orm import db_session, select, commit, desc, OptimisticCheckError, UnrepeatableReadError
 
-from Utils import restricted_loads, utcnow
+from Utils import format_SI_prefix, restricted_loads, utcnow
 from .locker import Locker, AlreadyRunningException
 
 _stop_event = Event()
@@ -25,10 +30,6 @@ def stop() -> None:
     stop_event.set()
 
 
-def handle_generation_success(seed_id):
-    logging.info(f"Generation finished for seed {seed_id}")
-
-
 def handle_generation_failure(result: BaseException):
     try:  # hacky way to get the full RemoteTraceback
         raise result
@@ -36,51 +37,275 @@ def handle_generation_failure(result: BaseException):
         logging.exception(e)
 
 
-def _mp_gen_game(
-    gen_options: dict,
-    meta: dict[str, Any] | None = None,
-    owner=None,
-    sid=None,
-    timeout: int|None = None,
-) -> PrimaryKey | None:
-    from setproctitle import setproctitle
+GENERATOR_REPORT_INTERVAL = 1
+"""seconds between resource reports of a generator process, and between progress updates of its Generation.meta"""
 
-    setproctitle(f"Generator ({sid})")
+GENERATOR_TIME_ERROR = "Allowed time for Generation exceeded, please consider generating locally instead."
+GENERATOR_MEMORY_ERROR = "Allowed memory for Generation exceeded, please consider generating locally instead."
+
+_spawn_context = multiprocessing.get_context("spawn")  # forking the threads of the WebHost process is unsafe
+
+
+class GeneratorLimitExceeded(Exception):
+    pass
+
+
+def get_process_stats() -> dict[str, float]:
+    """CPU time in seconds and peak RSS in bytes of this process so far. Peak RSS is 0 where it can't be measured."""
+    cpu = time.process_time()
     try:
-        return gen_game(gen_options, meta=meta, owner=owner, sid=sid, timeout=timeout)
-    finally:
-        setproctitle(f"Generator (idle)")
+        import resource
+    except ModuleNotFoundError:
+        return {"cpu": cpu, "peak_rss": 0}  # unix only module
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kibibytes on linux, bytes on macOS
+    return {"cpu": cpu, "peak_rss": peak_rss if sys.platform == "darwin" else peak_rss * 1024}
 
 
-def launch_generator(pool: multiprocessing.pool.Pool, generation: Generation, timeout: int|None) -> None:
+def _run_generator_job(config: dict[str, Any], jobs: multiprocessing.Queue, events: multiprocessing.Queue) -> None:
+    from setproctitle import setproctitle
+
+    init_generator(config)
+    from worlds import AutoWorld
+    from .generate import format_exception, generate_seed, record_generation_error
+
+    # started ahead of its job, so that the job doesn't have to wait for the process to start and import
+    gen_options, meta, owner, sid = jobs.get()
+    setproctitle(f"Generator ({sid})")
+
+    def report_stats() -> None:
+        while True:
+            events.put(("stats", get_process_stats()))
+            time.sleep(GENERATOR_REPORT_INTERVAL)
+
+    Thread(target=report_stats, name="GeneratorStats", daemon=True).start()
+    rss_limit = config["GENERATOR_RSS_LIMIT"]
+    generator_pid = os.getpid()
+    progress: dict[str, Any] = {}
+    limit_exceeded = Event()
+
+    def report_progress(kind: str, value: Any) -> None:
+        nonlocal progress
+        events.put((kind, value))
+        progress = update_progress(progress, kind, value)
+        # the parent only sees the stats reported once per interval, so also stop at the next step past the limit
+        if rss_limit is not None and get_process_stats()["peak_rss"] > rss_limit:
+            limit_exceeded.set()
+        # raised only where it ends the generation, not in a worker thread or a forked output process
+        if limit_exceeded.is_set() and os.getpid() == generator_pid and \
+                current_thread() is main_thread():
+            raise GeneratorLimitExceeded(GENERATOR_MEMORY_ERROR)
+
+    AutoWorld.progress_listeners.append(report_progress)
     try:
-        meta = json.loads(generation.meta)
-        options = restricted_loads(generation.options)
-        logging.info(f"Generating {generation.id} for {len(options)} players")
-        pool.apply_async(
-            _mp_gen_game,
-            (options,),
-            {
-                "meta": meta,
-                "sid": generation.id,
-                "owner": generation.owner,
-                "timeout": timeout,
-            },
-            handle_generation_success,
-            handle_generation_failure,
-        )
-    except Exception as e:
-        generation.state = STATE_ERROR
-        commit()
-        logging.exception(e)
+        seed_id = generate_seed(gen_options, meta=meta, owner=owner, sid=sid)
+    except BaseException as e:
+        stats = get_process_stats()
+        events.put(("stats", stats))
+        error = str(e) if isinstance(e, GeneratorLimitExceeded) else format_exception(e)
+        record_generation_error(sid, error, progress=progress, stats=stats)
+        events.put(("error", traceback.format_exc()))
+        sys.exit(1)
     else:
-        generation.state = STATE_STARTED
+        events.put(("stats", get_process_stats()))
+        events.put(("done", seed_id))
+
+
+def update_progress(progress: dict[str, Any], kind: str, value: Any) -> dict[str, Any]:
+    """Returns progress updated by a report of AutoWorld.report_progress."""
+    if kind == "stage":
+        return {"stage": value}
+    if kind == "fill":
+        name, placed, total = value
+        progress["fill"] = {"name": name, "placed": placed, "total": total}
+    return progress
+
+
+class GeneratorJob:
+    """
+    A process that runs one generation, which is killed once it exceeds the time or memory limit.
+    Its progress and resource use are reported to the parent, which stores them in the meta of the Generation.
+    The process is started ahead of its generation, which is then given to it by run.
+    """
+    generation_id: UUID | None
+    progress: dict[str, Any]
+    """"stage": last AutoWorld.call_all method, "fill": name, placed and total items of the current fill"""
+    stats: dict[str, float]
+    """"cpu": CPU time in seconds, "peak_rss": peak RSS in bytes, as last reported"""
+    seed_id: UUID | None
+    error: str | None
+
+    def __init__(self, config: dict[str, Any]):
+        self.generation_id = None
+        self.time_limit = config["JOB_TIME"]
+        self.rss_limit = config["GENERATOR_RSS_LIMIT"]
+        self.progress = {}
+        self.stats = {"cpu": 0.0, "peak_rss": 0}
+        self.seed_id = None
+        self.error = None
+        self.changed = False
+        self.jobs = _spawn_context.Queue()
+        self.events = _spawn_context.Queue()
+        self.process = _spawn_context.Process(target=_run_generator_job, args=(config, self.jobs, self.events),
+                                              name="Generator")
+        self.process.start()
+        self.start_time = self.last_report = time.monotonic()
+
+    def run(self, generation_id: UUID, gen_options: dict, meta: dict[str, Any], owner: UUID) -> None:
+        self.generation_id = generation_id
+        self.jobs.put((gen_options, meta, owner, generation_id))
+        self.start_time = time.monotonic()
+
+    def update(self) -> bool:
+        """Collect the reports of the process and enforce the limits, returning whether the process still runs."""
+        alive = self.process.is_alive()  # checked first, so that all reports of a finished process get collected
+        self._collect_events()
+        if not alive:
+            self.process.join()
+            self._finish()
+            return False
+        if self.seed_id:
+            return True  # done, only has to exit
+        if self.time_limit is not None and time.monotonic() - self.start_time > self.time_limit:
+            self.kill(GENERATOR_TIME_ERROR)
+            return False
+        if self.rss_limit is not None and self.stats["peak_rss"] > self.rss_limit:
+            self.kill(GENERATOR_MEMORY_ERROR)
+            return False
+        if self.changed and time.monotonic() - self.last_report >= GENERATOR_REPORT_INTERVAL:
+            self._store_progress()
+        return True
+
+    def kill(self, error: str) -> None:
+        """Kill the process, marking the generation as failed with error."""
+        from .generate import record_generation_error
+
+        self.process.kill()
+        self.process.join()
+        self._collect_events()
+        self._close()
+        record_generation_error(self.generation_id, error, progress=self.progress, stats=self.stats)
+        logging.error(f"Generation {self.generation_id} was killed: {error} {self._format_stats()}")
+
+    def stop(self) -> None:
+        """Stop the process, leaving its generation to be resumed."""
+        self.process.terminate()
+        self.process.join()
+        self._close()
+
+    def _close(self) -> None:
+        self.jobs.close()
+        self.events.close()
+
+    def _collect_events(self) -> None:
+        while True:
+            try:
+                kind, value = self.events.get_nowait()
+            except queue.Empty:
+                return
+            if kind in ("stage", "fill"):
+                self.progress = update_progress(self.progress, kind, value)
+            elif kind == "stats":
+                self.stats = value
+            elif kind == "done":
+                self.seed_id = value
+            elif kind == "error":
+                self.error = value
+            self.changed = True
+
+    def _store_progress(self) -> None:
+        self.changed = False
+        self.last_report = time.monotonic()
+        try:
+            with db_session:
+                generation = Generation.get(id=self.generation_id)
+                if generation is not None and generation.state == STATE_STARTED:
+                    meta = json.loads(generation.meta)
+                    meta["progress"] = self.progress
+                    meta["stats"] = self.stats
+                    generation.meta = json.dumps(meta)
+        except (OptimisticCheckError, UnrepeatableReadError):
+            pass  # the generator finished the generation in the meantime
+
+    def _finish(self) -> None:
+        from .generate import record_generation_error
+
+        self._close()
+        if self.seed_id:
+            logging.info(f"Generation finished for seed {self.seed_id} {self._format_stats()}")
+        elif self.error:
+            logging.error(f"Generation {self.generation_id} failed {self._format_stats()}:\n{self.error}")
+        else:
+            error = f"Generator process exited with code {self.process.exitcode}."
+            record_generation_error(self.generation_id, error, progress=self.progress, stats=self.stats)
+            logging.error(f"Generation {self.generation_id} failed: {error} {self._format_stats()}")
+
+    def _format_stats(self) -> str:
+        return (f"after {time.monotonic() - self.start_time:.1f} seconds, {self.stats['cpu']:.1f} seconds of CPU time "
+                f"and {format_SI_prefix(self.stats['peak_rss'], 1024)}iB peak RSS.")
+
+
+class GeneratorJobs:
+    """Runs queued generations, each in a GeneratorJob, keeping a started GeneratorJob ready for the next one."""
+    running: dict[UUID, GeneratorJob]
+    ready: GeneratorJob | None
+
+    def __init__(self, config: dict[str, Any]):
+        self.config = config
+        self.running = {}
+        self.ready = None
+
+    def update(self) -> None:
+        """Collect the reports of running generations, then start queued generations while there are free generators."""
+        for generation_id, job in list(self.running.items()):
+            if not job.update():
+                del self.running[generation_id]
+        if self.ready is None:
+            self.ready = GeneratorJob(self.config)
+        free_generators = self.config["GENERATORS"] - len(self.running)
+        if free_generators > 0:
+            with db_session:
+                # for update locks the database row(s) during transaction, preventing writes from elsewhere
+                to_start = select(
+                    generation for generation in Generation
+                    if generation.state == STATE_QUEUED).for_update()[:free_generators]
+                for generation in to_start:
+                    self.launch(generation)
+
+    def launch(self, generation: Generation) -> None:
+        try:
+            meta = json.loads(generation.meta)
+            options = restricted_loads(generation.options)
+            logging.info(f"Generating {generation.id} for {len(options)} players")
+            if self.ready is not None and self.ready.process.is_alive():
+                job, self.ready = self.ready, None
+            else:
+                job = GeneratorJob(self.config)
+            job.run(generation.id, options, meta, generation.owner)
+        except Exception as e:
+            generation.state = STATE_ERROR
+            commit()
+            logging.exception(e)
+        else:
+            generation.state = STATE_STARTED
+            self.running[generation.id] = job
+
+    def stop(self) -> None:
+        """Stop all generator processes, leaving running generations to be resumed."""
+        for job in self.running.values():
+            job.stop()
+        self.running.clear()
+        if self.ready is not None:
+            self.ready.stop()
+            self.ready = None
 
 
 def init_generator(config: dict[str, Any]) -> None:
     from setproctitle import setproctitle
 
     setproctitle("Generator (idle)")
+    # only import the worlds of the games that get generated, which is why generate is imported by _run_generator_job
+    os.environ.setdefault("LAZY_WORLD_IMPORTS", "1")
 
     try:
         import resource
@@ -115,17 +340,28 @@ def cleanup():
 
 def autohost(config: dict):
     def keep_running():
+        from .stats import update_games_played
+
         stop_event = _stop_event
         try:
             with Locker("autohost"):
                 cleanup()
+                update_games_played()
+                last_stats_update = time.monotonic()
                 hosters = []
                 for x in range(config["HOSTERS"]):
                     hoster = MultiworldInstance(config, x)
                     hosters.append(hoster)
                     hoster.start()
 
+                moving_rooms: dict[UUID, MultiworldInstance] = {}
+                last_rebalance = time.monotonic()
                 while not stop_event.wait(0.1):
+                    for hoster in hosters:
+                        for room_id in hoster.update():
+                            if room_id in moving_rooms:
+                                moving_rooms.pop(room_id).start_room(room_id)
+
                     with db_session:
                         rooms = select(
                             room for room in Room if
@@ -133,8 +369,30 @@ def autohost(config: dict):
                                 seconds=config["MAX_ROOM_TIMEOUT"])).order_by(desc(Room.last_port))
                         for room in rooms:
                             # we have to filter twice, as the per-room timeout can't currently be PonyORM transpiled.
-                            if room.last_activity >= utcnow() - timedelta(seconds=room.timeout + 5):
-                                hosters[room.id.int % len(hosters)].start_room(room.id)
+                            if room.last_activity >= utcnow() - timedelta(seconds=room.timeout + 5) and \
+                                    room.id not in moving_rooms and \
+                                    not any(room.id in hoster.room_ids for hoster in hosters):
+                                get_least_loaded_hoster(hosters).start_room(room.id)
+
+                    # one read for all rooms started during this tick, handed over to the host processes right away
+                    pending_rooms = [room_id for hoster in hosters for room_id in hoster.pending_rooms]
+                    if pending_rooms:
+                        start_data = get_room_start_data(pending_rooms)
+                        for hoster in hosters:
+                            hoster.send_pending_rooms(start_data)
+                        del start_data
+
+                    if time.monotonic() - last_stats_update >= STATS_UPDATE_INTERVAL:
+                        last_stats_update = time.monotonic()
+                        update_games_played()
+
+                    if time.monotonic() - last_rebalance >= ROOM_METRICS_INTERVAL:
+                        last_rebalance = time.monotonic()
+                        for room_id, source, target in get_room_moves(hosters):
+                            if room_id not in moving_rooms:
+                                logging.info(f"Moving idle room {room_id} from {source.name} to {target.name}.")
+                                moving_rooms[room_id] = target
+                                source.stop_room(room_id)
 
         except AlreadyRunningException:
             logging.info("Autohost reports as already running, not starting another.")
@@ -147,49 +405,88 @@ def autogen(config: dict):
         stop_event = _stop_event
         try:
             with Locker("autogen"):
-
-                with multiprocessing.Pool(config["GENERATORS"], initializer=init_generator,
-                                          initargs=(config,), maxtasksperchild=10) as generator_pool:
-                    job_time = config["JOB_TIME"]
-                    with db_session:
-                        to_start = select(generation for generation in Generation if generation.state == STATE_STARTED)
-
-                        if to_start:
-                            logging.info("Resuming generation")
-                            for generation in to_start:
-                                sid = Seed.get(id=generation.id)
-                                if sid:
-                                    generation.delete()
-                                else:
-                                    launch_generator(generator_pool, generation, timeout=job_time)
-
-                            commit()
-                        select(generation for generation in Generation if generation.state == STATE_ERROR).delete()
-
+                with db_session:
+                    to_start = select(generation for generation in Generation if generation.state == STATE_STARTED)
+
+                    if to_start:
+                        logging.info("Resuming generation")
+                        for generation in to_start:
+                            sid = Seed.get(id=generation.id)
+                            if sid:
+                                generation.delete()
+                            else:
+                                generation.state = STATE_QUEUED
+
+                        commit()
+                    select(generation for generation in Generation if generation.state == STATE_ERROR).delete()
+
+                generator_jobs = GeneratorJobs(config)
+                try:
                     while not stop_event.wait(0.1):
-                        with db_session:
-                            # for update locks the database row(s) during transaction, preventing writes from elsewhere
-                            to_start = select(
-                                generation for generation in Generation
-                                if generation.state == STATE_QUEUED).for_update()
-                            for generation in to_start:
-                                launch_generator(generator_pool, generation, timeout=job_time)
+                        generator_jobs.update()
+                finally:
+                    generator_jobs.stop()
         except AlreadyRunningException:
             logging.info("Autogen reports as already running, not starting another.")
 
     Thread(target=keep_running, name="AP_Autogen").start()
 
 
+NEW_ROOM_LOAD = 0.01
+"""load assumed for a room, until its host process reports it"""
+MOVE_ROOMS_LOOP_LAG = 0.25
+"""event loop lag in seconds of a host process, from which its idle rooms are moved to another host process"""
+MAX_ROOM_MOVES = 4
+"""maximum number of rooms moved off a host process per load report"""
+STATS_UPDATE_INTERVAL = 60 * 60
+"""seconds between roll ups of the games played for the stats page"""
+
+
+def get_least_loaded_hoster(hosters: typing.Sequence[MultiworldInstance]) -> MultiworldInstance:
+    """Pick the host process with the least load among those whose event loop doesn't lag, if there are any."""
+    return min(hosters, key=lambda hoster: (hoster.lagging, hoster.load))
+
+
+def get_room_moves(hosters: typing.Sequence[MultiworldInstance]
+                   ) -> list[tuple[UUID, MultiworldInstance, MultiworldInstance]]:
+    """
+    Pick rooms without connected clients on host processes whose event loop lags, to move to the least loaded
+    host process, so a busy room no longer holds up the rooms sharing its event loop once their players return.
+    Returns (room id, current host process, new host process) for each room to move.
+    """
+    moves = []
+    for hoster in hosters:
+        if not hoster.lagging:
+            continue
+        target = get_least_loaded_hoster(hosters)
+        if target is hoster or target.lagging:
+            continue
+        idle_rooms = [room_id for room_id, metrics in hoster.room_load.items()
+                      if room_id in hoster.room_ids and not metrics["clients"]]
+        moves.extend((room_id, hoster, target) for room_id in idle_rooms[:MAX_ROOM_MOVES])
+    return moves
+
+
 class MultiworldInstance():
+    room_load: dict[UUID, dict[str, float]]
+    """room id -> cpu (share of a core spent handling messages), msg_rate and clients, as last reported"""
+    loop_lag: float
+    """largest event loop lag in seconds during the last report interval"""
+
     def __init__(self, config: dict, id: int):
         self.room_ids = set()
+        self.room_load = {}
+        self.loop_lag = 0.0
         self.process: typing.Optional[multiprocessing.Process] = None
         self.ponyconfig = config["PONY"]
         self.cert = config["SELFLAUNCHCERT"]
         self.key = config["SELFLAUNCHKEY"]
         self.host = config["HOST_ADDRESS"]
+        self.pending_rooms: list[UUID] = []
         self.rooms_to_start = multiprocessing.Queue()
         self.rooms_shutting_down = multiprocessing.Queue()
+        self.rooms_to_stop = multiprocessing.Queue()
+        self.room_metrics = multiprocessing.Queue()
         self.name = f"MultiHoster{id}"
 
     def start(self):
@@ -199,19 +496,60 @@ class MultiworldInstance():
         process = multiprocessing.Process(group=None, target=run_server_process,
                                           args=(self.name, self.ponyconfig, get_static_server_data(),
                                                 self.cert, self.key, self.host,
-                                                self.rooms_to_start, self.rooms_shutting_down),
+                                                self.rooms_to_start, self.rooms_shutting_down,
+                                                self.rooms_to_stop, self.room_metrics),
                                           name=self.name)
         process.start()
         self.process = process
 
-    def start_room(self, room_id):
+    @property
+    def load(self) -> float:
+        """Share of a core the rooms of this host process spend handling messages."""
+        return sum(self.room_load[room_id]["cpu"] if room_id in self.room_load else NEW_ROOM_LOAD
+                   for room_id in self.room_ids)
+
+    @property
+    def lagging(self) -> bool:
+        """If the event loop of this host process lagged too much during the last report interval."""
+        return self.loop_lag >= MOVE_ROOMS_LOOP_LAG
+
+    def update(self) -> list[UUID]:
+        """Collect the rooms that shut down and the latest load report, returning the ids of the rooms that shut down."""
+        shut_down = []
         while not self.rooms_shutting_down.empty():
-            self.room_ids.remove(self.rooms_shutting_down.get(block=True, timeout=None))
+            room_id = self.rooms_shutting_down.get(block=True, timeout=None)
+            self.room_ids.remove(room_id)
+            self.room_load.pop(room_id, None)
+            shut_down.append(room_id)
+        while not self.room_metrics.empty():
+            metrics = self.room_metrics.get(block=True, timeout=None)
+            self.loop_lag = metrics["loop_lag"]
+            self.room_load = metrics["rooms"]
+        return shut_down
+
+    def start_room(self, room_id):
         if room_id in self.room_ids:
             pass  # should already be hosted currently.
         else:
             self.room_ids.add(room_id)
-            self.rooms_to_start.put(room_id)
+            self.pending_rooms.append(room_id)
+
+    def send_pending_rooms(self, start_data: dict[UUID, RoomStartData]) -> None:
+        """
+        Hand the rooms started since the last call to the host process, with the data read for them.
+        The data of the rooms handed over is removed from start_data, so that it is not held on to.
+        """
+        for room_id in self.pending_rooms:
+            room_start_data = start_data.pop(room_id, None)
+            if room_start_data:
+                self.rooms_to_start.put(room_start_data)
+            else:
+                self.room_ids.discard(room_id)  # deleted in the meantime
+        self.pending_rooms.clear()
+
+    def stop_room(self, room_id):
+        """Shut the room down, to be started on another host process once it reports shutting down."""
+        self.rooms_to_stop.put(room_id)
 
     def stop(self):
         if self.process:
@@ -227,5 +565,5 @@ class MultiworldInstance():
 
 
 from .models import Room, Generation, STATE_QUEUED, STATE_STARTED, STATE_ERROR, db, Seed, Slot
-from .customserver import run_server_process, get_static_server_data
-from .generate import gen_game
+from .customserver import (ROOM_METRICS_INTERVAL, RoomStartData, get_room_start_data, get_static_server_data,
+                           run_server_process)
@@ -7,6 +7,7 @@ import functools
 import logging
 import multiprocessing
 import pickle
+import queue
 import random
 import socket
 import threading
@@ -21,11 +22,11 @@ import Utils
 
 from MultiServer import (
     Context, server, auto_shutdown, ServerCommandProcessor, ClientMessageProcessor, load_server_cert,
-    server_per_message_deflate_factory,
+    server_per_message_deflate_factory, SaveJournal, flush_background_log,
 )
 from Utils import restricted_loads, cache_argsless
 from .locker import Locker
-from .models import Command, GameDataPackage, Room, db
+from .models import Command, GameDataPackage, Room, SaveDelta, TrackerSnapshot, db
 
 
 class CustomClientMessageProcessor(ClientMessageProcessor):
@@ -37,11 +38,13 @@ class CustomClientMessageProcessor(ClientMessageProcessor):
         """
         if platform.lower().startswith("t"):  # twitch
             self.ctx.video[self.client.team, self.client.slot] = "Twitch", user
+            self.ctx.journal_change("video", (self.client.team, self.client.slot))
             self.ctx.save()
             self.output(f"Registered Twitch Stream https://www.twitch.tv/{user}")
             return True
         elif platform.lower().startswith("y"):  # youtube
             self.ctx.video[self.client.team, self.client.slot] = "Youtube", user
+            self.ctx.journal_change("video", (self.client.team, self.client.slot))
             self.ctx.save()
             self.output(f"Registered Youtube Stream for {user}")
             return True
@@ -60,8 +63,92 @@ class DBCommandProcessor(ServerCommandProcessor):
         self.ctx.logger.info(text)
 
 
+class DBCommandDispatcher:
+    """
+    Polls the database for the commands of all rooms of a host process with one query,
+    and runs each command in the room it is for.
+    """
+    interval: typing.ClassVar[float] = 1
+    processors: dict[typing.Any, DBCommandProcessor]
+    """room id -> command processor of the room"""
+
+    def __init__(self) -> None:
+        self.processors = {}
+
+    def add_room(self, ctx: WebHostContext) -> None:
+        self.processors[ctx.room_id] = DBCommandProcessor(ctx)
+
+    def remove_room(self, room_id: typing.Any) -> None:
+        self.processors.pop(room_id, None)
+
+    @staticmethod
+    def fetch_commands(room_ids: typing.AbstractSet[typing.Any]) -> list[tuple[typing.Any, str]]:
+        """Take the commands for the rooms out of the database, in the order they were sent."""
+        room_ids = list(room_ids)
+        with db_session:
+            commands = select((command.id, command.room.id, command.commandtext) for command in Command
+                              if command.room.id in room_ids).order_by(1)[:]
+            if commands:
+                command_ids = [command_id for command_id, _, _ in commands]
+                Command.select(lambda command: command.id in command_ids).delete(bulk=True)
+                commit()
+            return [(room_id, commandtext) for _, room_id, commandtext in commands]
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.interval)
+            if not self.processors:
+                continue
+            try:
+                room_commands = await loop.run_in_executor(None, self.fetch_commands, frozenset(self.processors))
+            except Exception as e:
+                logging.exception(e)
+                continue
+            for room_id, commandtext in room_commands:
+                if room_id in self.processors:
+                    self.processors[room_id](commandtext)
+
+
+class RoomStartData(typing.NamedTuple):
+    """Everything a host process reads of a room to start it, read for all rooms started at once."""
+    id: typing.Any
+    last_port: int
+    timeout: int
+    multidata: bytes
+    multisave: typing.Optional[bytes]
+    save_deltas: typing.List[bytes]
+
+
+def get_room_start_data(room_ids: typing.Collection[typing.Any]) -> typing.Dict[typing.Any, RoomStartData]:
+    """
+    Read the start data of the rooms in two queries, no matter how many rooms are started.
+    The data includes the multidata and save, so it should be handed over to the host processes and dropped right away.
+    """
+    room_ids = list(room_ids)
+    with db_session:
+        save_deltas: typing.Dict[typing.Any, typing.List[bytes]] = collections.defaultdict(list)
+        for room_id, _, data in select((save_delta.room.id, save_delta.id, save_delta.data)
+                                       for save_delta in SaveDelta if save_delta.room.id in room_ids).order_by(2):
+            save_deltas[room_id].append(data)
+        return {
+            room_id: RoomStartData(room_id, last_port, timeout, multidata, multisave, save_deltas.get(room_id, []))
+            for room_id, last_port, timeout, multidata, multisave
+            in select((room.id, room.last_port, room.timeout, room.seed.multidata, room.multisave)
+                      for room in Room if room.id in room_ids)
+        }
+
+
 class WebHostContext(Context):
     room_id: int
+    room_save: typing.Optional[typing.Tuple[typing.Optional[bytes], typing.List[bytes]]]
+    """multisave and save deltas handed over with the room, until init_save applies them"""
+    tracker_changes: typing.Set[str]
+    """save data fields changed since the tracker snapshot was last written"""
+    tracker_fields: typing.ClassVar[typing.FrozenSet[str]] = frozenset({
+        "location_checks", "received_items", "client_game_state", "client_activity_timers", "video",
+        "hints", "name_aliases"})
+    """save data fields that trackers show"""
 
     def __init__(self, static_server_data: dict, logger: logging.Logger):
         # static server data is used during _load_game_data to load required data,
@@ -74,6 +161,9 @@ class WebHostContext(Context):
         self.main_loop = asyncio.get_running_loop()
         self.video = {}
         self.tags = ["AP", "WebHost"]
+        # number of received items counted so far and their counts, per slot
+        self.tracker_inventories: typing.Dict[typing.Tuple[int, int], typing.Tuple[int, collections.Counter]] = {}
+        self.tracker_changes = set()
 
     def __del__(self):
         try:
@@ -89,35 +179,16 @@ class WebHostContext(Context):
             setattr(self, key, value)
         self.non_hintable_names = collections.defaultdict(frozenset, self.non_hintable_names)
 
-    async def listen_to_db_commands(self):
-        cmdprocessor = DBCommandProcessor(self)
-
-        while not self.exit_event.is_set():
-            await self.main_loop.run_in_executor(None, self._process_db_commands, cmdprocessor)
-            try:
-                await asyncio.wait_for(self.exit_event.wait(), 5)
-            except asyncio.TimeoutError:
-                pass
-
-    def _process_db_commands(self, cmdprocessor):
-        with db_session:
-            commands = select(command for command in Command if command.room.id == self.room_id)
-            if commands:
-                for command in commands:
-                    self.main_loop.call_soon_threadsafe(cmdprocessor, command.commandtext)
-                    command.delete()
-                commit()
-
     @db_session
-    def load(self, room_id: int):
-        self.room_id = room_id
-        room = Room.get(id=room_id)
+    def load(self, room: RoomStartData):
+        self.room_id = room.id
+        self.room_save = room.multisave, room.save_deltas
         if room.last_port:
             self.port = room.last_port
         else:
             self.port = get_random_port()
 
-        multidata = self.decompress(room.seed.multidata)
+        multidata = self.decompress(room.multidata)
         game_data_packages = {}
 
         static_gamespackage = self.gamespackage  # this is shared across all rooms
@@ -148,33 +219,89 @@ class WebHostContext(Context):
             self.item_name_groups[game] = static_item_name_groups.get(game, {})
             self.location_name_groups[game] = static_location_name_groups.get(game, {})
 
-        if not game_data_packages and not missing_checksum:
-            # all static -> use the static dicts directly
-            self.gamespackage = static_gamespackage
-            self.item_name_groups = static_item_name_groups
-            self.location_name_groups = static_location_name_groups
         return self._load(multidata, game_data_packages, True)
 
     def init_save(self, enabled: bool = True):
         self.saving = enabled
         if self.saving:
-            with db_session:
-                savegame_data = Room.get(id=self.room_id).multisave
-                if savegame_data:
-                    self.set_save(restricted_loads(savegame_data))
+            self.save_journal = SaveJournal()
+            savegame_data, frames = self.room_save
+            if savegame_data:
+                save_data = restricted_loads(savegame_data)
+                SaveJournal.apply(save_data, frames)
+                self.set_save(save_data)
+                self.save_journal.snapshot_size = len(savegame_data)
+                self.save_journal.journal_size = sum(len(frame) for frame in frames)
             self._start_async_saving(atexit_save=False)
-        asyncio.create_task(self.listen_to_db_commands())
+        self.room_save = None
 
     @db_session
     def _save(self, exit_save: bool = False) -> bool:
         room = Room.get(id=self.room_id)
-        # Does not use Utils.restricted_dumps because we'd rather make a save than not make one
-        room.multisave = pickle.dumps(self.get_save())
+        if self.save_journal:
+            self.tracker_changes |= self.save_journal.take_changed_fields()
+        self._save_tracker_snapshot(room)  # committed together with the save
+        try:
+            if self.save_journal and not exit_save and not self.save_journal.needs_snapshot:
+                # store only the changes, instead of rewriting all of multisave
+                frame = self.get_save_frame()
+                SaveDelta(room=room, data=frame)
+                commit()
+                self.save_journal.journal_size += len(frame)
+            else:
+                # Does not use Utils.restricted_dumps because we'd rather make a save than not make one
+                room.multisave = pickle.dumps(self.get_save_snapshot())
+                room.save_deltas.select().delete(bulk=True)
+                commit()
+                if self.save_journal:
+                    self.save_journal.snapshot_size = len(room.multisave)
+                    self.save_journal.journal_size = 0
+        except Exception:
+            if self.save_journal:
+                self.save_journal.snapshot_size = 0  # retry with a snapshot, as the changes were taken
+            raise
+        self.tracker_changes.clear()
         # saving only occurs on activity, so we can "abuse" this information to mark this as last_activity
         if not exit_save:  # we don't want to count a shutdown as activity, which would restart the server again
             room.last_activity = Utils.utcnow()
         return True
 
+    def _save_tracker_snapshot(self, room: Room) -> None:
+        snapshot = room.tracker_snapshot
+        if not snapshot:
+            TrackerSnapshot(room=room, version=1, data=pickle.dumps(self.get_tracker_snapshot()),
+                            hint_data=pickle.dumps(self.get_tracker_hint_data()))
+        elif not self.save_journal or self.tracker_changes & self.tracker_fields:
+            snapshot.set(version=snapshot.version + 1, data=pickle.dumps(self.get_tracker_snapshot()))
+            if not self.save_journal or self.tracker_changes & {"hints", "name_aliases"}:
+                snapshot.hint_data = pickle.dumps(self.get_tracker_hint_data())
+        # otherwise nothing trackers show changed since the snapshot was written
+
+    def get_tracker_snapshot(self) -> dict:
+        """
+        What trackers show of the save, with counts in place of checked locations and received items,
+        except for what get_tracker_hint_data returns. Other keys use the same format as get_save.
+        """
+        for (team, slot, remote), items in tuple(self.received_items.items()):
+            if remote:
+                counted, inventory = self.tracker_inventories.get((team, slot), (0, collections.Counter()))
+                # received items are only ever appended to, so only the new ones have to be counted
+                inventory.update(item.item for item in items[counted:])
+                self.tracker_inventories[team, slot] = len(items), inventory
+        return {
+            "location_check_counts": {team_slot: len(checks) for team_slot, checks in self.location_checks.items()},
+            "inventories": {team_slot: dict(inventory) for team_slot, (_, inventory)
+                            in self.tracker_inventories.items()},
+            "client_game_state": dict(self.client_game_state),
+            "client_activity_timers": tuple(
+                (key, value.timestamp()) for key, value in self.client_activity_timers.items()),
+            "video": [(tuple(playerslot), videodata) for playerslot, videodata in self.video.items()],
+        }
+
+    def get_tracker_hint_data(self) -> dict:
+        """The hints and name aliases of the tracker snapshot, which change rarely compared to the rest of it."""
+        return {"hints": dict(self.hints), "name_aliases": dict(self.name_aliases)}
+
     def get_save(self) -> dict:
         d = super(WebHostContext, self).get_save()
         d["video"] = [(tuple(playerslot), videodata) for playerslot, videodata in self.video.items()]
@@ -188,32 +315,31 @@ def get_random_port():
 @cache_argsless
 def get_static_server_data() -> dict:
     import worlds
+    from .sharedpackage import write_shared_data_package
     data = {
         "non_hintable_names": {
             world_name: world.hint_blacklist
             for world_name, world in worlds.AutoWorldRegister.world_types.items()
         },
-        "gamespackage": {
-            world_name: {
-                key: value
-                for key, value in game_package.items()
-                if key not in ("item_name_groups", "location_name_groups")
-            }
-            for world_name, game_package in worlds.network_data_package["games"].items()
-        },
-        "item_name_groups": {
-            world_name: world.item_name_groups
-            for world_name, world in worlds.AutoWorldRegister.world_types.items()
-        },
-        "location_name_groups": {
-            world_name: world.location_name_groups
-            for world_name, world in worlds.AutoWorldRegister.world_types.items()
-        },
+        # the data package is memory mapped by each room host process, see load_static_server_data
+        "shared_data_package": write_shared_data_package(worlds.network_data_package["games"]),
     }
 
     return data
 
 
+def load_static_server_data(static_server_data: dict) -> dict:
+    """Map the shared data package of get_static_server_data into the gamespackage and name groups for Context."""
+    from .sharedpackage import SharedDataPackage
+    data_package = SharedDataPackage(static_server_data["shared_data_package"])
+    return {
+        "non_hintable_names": static_server_data["non_hintable_names"],
+        "gamespackage": data_package.games,
+        "item_name_groups": data_package.item_name_groups,
+        "location_name_groups": data_package.location_name_groups,
+    }
+
+
 def set_up_logging(room_id) -> logging.Logger:
     import os
     # logger setup
@@ -239,15 +365,31 @@ def tear_down_logging(room_id):
     logger_name = f"RoomLogger {room_id}"
     if logger_name in logging.Logger.manager.loggerDict:
         logger = logging.getLogger(logger_name)
+        flush_background_log()  # so that the records still queued for the room are written before its handlers close
         for handler in logger.handlers[:]:
             logger.removeHandler(handler)
             handler.close()
         del logging.Logger.manager.loggerDict[logger_name]
 
 
+ROOM_METRICS_INTERVAL = 10
+"""seconds between the load reports of a room host process"""
+LOOP_LAG_PROBE_INTERVAL = 0.5
+
+
+def get_room_metrics(ctx: WebHostContext, last: tuple[int, float], interval: float) -> dict[str, float]:
+    """Load of a room since its counters read last, over interval seconds."""
+    return {
+        "cpu": (ctx.handling_time - last[1]) / interval,
+        "msg_rate": (ctx.handled_msgs - last[0]) / interval,
+        "clients": sum(len(clients) for team in ctx.clients.values() for clients in team.values()),
+    }
+
+
 def run_server_process(name: str, ponyconfig: dict, static_server_data: dict,
                        cert_file: typing.Optional[str], cert_key_file: typing.Optional[str],
-                       host: str, rooms_to_run: multiprocessing.Queue, rooms_shutting_down: multiprocessing.Queue):
+                       host: str, rooms_to_run: multiprocessing.Queue, rooms_shutting_down: multiprocessing.Queue,
+                       rooms_to_stop: multiprocessing.Queue, room_metrics: multiprocessing.Queue):
     from setproctitle import setproctitle
 
     setproctitle(name)
@@ -270,6 +412,8 @@ def run_server_process(name: str, ponyconfig: dict, static_server_data: dict,
     if "worlds" in sys.modules:
         raise Exception("Worlds system should not be loaded in the custom server.")
 
+    static_server_data = load_static_server_data(static_server_data)
+
     import gc
 
     if not cert_file:
@@ -291,14 +435,58 @@ def run_server_process(name: str, ponyconfig: dict, static_server_data: dict,
     gc.collect()  # free intermediate objects used during setup
 
     loop = asyncio.get_event_loop()
+    running_rooms: dict[typing.Any, WebHostContext] = {}
+    command_dispatcher = DBCommandDispatcher()
+    moving_rooms: set[typing.Any] = set()
 
-    async def start_room(room_id):
+    async def monitor_rooms():
+        """
+        Report the load of each room and the lag of the event loop they share to the autohost,
+        and stop the rooms it moves to another host process.
+        """
+        counters: dict[typing.Any, tuple[int, float]] = {}
+        loop_lag = 0.0
+        last_report = loop.time()
+        while True:
+            probe = loop.time()
+            await asyncio.sleep(LOOP_LAG_PROBE_INTERVAL)
+            loop_lag = max(loop_lag, loop.time() - probe - LOOP_LAG_PROBE_INTERVAL)
+
+            while True:
+                try:
+                    room_id = rooms_to_stop.get_nowait()
+                except queue.Empty:
+                    break
+                if room_id in running_rooms:
+                    moving_rooms.add(room_id)
+                    running_rooms[room_id].logger.info("Moving room to another host process.")
+                    running_rooms[room_id].exit_event.set()
+
+            now = loop.time()
+            if now - last_report >= ROOM_METRICS_INTERVAL:
+                rooms = {}
+                for room_id, ctx in running_rooms.items():
+                    rooms[room_id] = get_room_metrics(ctx, counters.get(room_id, (0, 0.0)), now - last_report)
+                    counters[room_id] = ctx.handled_msgs, ctx.handling_time
+                for room_id in counters.keys() - running_rooms.keys():
+                    del counters[room_id]
+                room_metrics.put({"loop_lag": loop_lag, "rooms": rooms})
+                if loop_lag > 1:
+                    logging.warning(f"Event loop of {name} lagged by {loop_lag:.2f} seconds.")
+                loop_lag = 0.0
+                last_report = now
+
+    async def start_room(room: RoomStartData):
+        room_id, last_port, timeout = room.id, room.last_port, room.timeout
         with Locker(f"RoomLocker {room_id}"):
             try:
                 logger = set_up_logging(room_id)
                 ctx = WebHostContext(static_server_data, logger)
-                ctx.load(room_id)
+                ctx.load(room)
+                del room  # the multidata and save are not needed anymore once loaded
+                running_rooms[room_id] = ctx
                 ctx.init_save()
+                command_dispatcher.add_room(ctx)
                 assert ctx.server is None
                 try:
                     ctx.server = websockets.serve(
@@ -325,14 +513,12 @@ def run_server_process(name: str, ponyconfig: dict, static_server_data: dict,
                         port = socketname[1]
                 if port:
                     ctx.logger.info(f'Hosting game at {host}:{port}')
-                    with db_session:
-                        room = Room.get(id=ctx.room_id)
-                        room.last_port = port
-                    del room
+                    if port != last_port:
+                        with db_session:
+                            Room.get(id=room_id).last_port = port
                 else:
                     ctx.logger.exception("Could not determine port. Likely hosting failure.")
-                with db_session:
-                    ctx.auto_shutdown = Room.get(id=room_id).timeout
+                ctx.auto_shutdown = timeout
                 if ctx.saving:
                     setattr(asyncio.current_task(), "save", lambda: ctx._save(True))
                 assert ctx.shutdown_task is None
@@ -356,6 +542,8 @@ def run_server_process(name: str, ponyconfig: dict, static_server_data: dict,
                     setattr(asyncio.current_task(), "save", None)
             finally:
                 try:
+                    running_rooms.pop(room_id, None)
+                    command_dispatcher.remove_room(room_id)
                     ctx.save_dirty = False  # make sure the saving thread does not write to DB after final wakeup
                     ctx.exit_event.set()  # make sure the saving thread stops at some point
                     # NOTE: async saving should probably be an async task and could be merged with shutdown_task
@@ -364,11 +552,14 @@ def run_server_process(name: str, ponyconfig: dict, static_server_data: dict,
                         ctx.server.ws_server.close()
                         await ctx.server.ws_server.wait_closed()
 
-                    with db_session:
-                        # ensure the Room does not spin up again on its own, minute of safety buffer
-                        room = Room.get(id=room_id)
-                        room.last_activity = Utils.utcnow() - datetime.timedelta(minutes=1, seconds=room.timeout)
-                    del room
+                    if room_id in moving_rooms:
+                        moving_rooms.remove(room_id)  # the autohost starts it again on another host process
+                    else:
+                        with db_session:
+                            # ensure the Room does not spin up again on its own, minute of safety buffer
+                            room = Room.get(id=room_id)
+                            room.last_activity = Utils.utcnow() - datetime.timedelta(minutes=1, seconds=room.timeout)
+                        del room
                     tear_down_logging(room_id)
                     logging.info(f"Shutting down room {room_id} on {name}.")
                 finally:
@@ -388,17 +579,20 @@ def run_server_process(name: str, ponyconfig: dict, static_server_data: dict,
 
         def run(self):
             while 1:
-                next_room = rooms_to_run.get(block=True,  timeout=None)
+                next_room: RoomStartData = rooms_to_run.get(block=True,  timeout=None)
                 gc.collect()
+                logging.info(f"Starting room {next_room.id} on {name}.")
                 task = asyncio.run_coroutine_threadsafe(start_room(next_room), loop)
+                del next_room  # the room loads its multidata and save from it, which should not be held on to here
                 self._tasks.append(task)
                 task.add_done_callback(self._done)
-                logging.info(f"Starting room {next_room} on {name}.")
                 del task  # delete reference to task object
 
     starter = Starter()
     starter.daemon = True
     starter.start()
+    # keep references, so the tasks are not garbage collected, and can be stopped on shutdown
+    background_tasks = [loop.create_task(monitor_rooms()), loop.create_task(command_dispatcher.run())]
     try:
         loop.run_forever()
     finally:
@@ -407,3 +601,6 @@ def run_server_process(name: str, ponyconfig: dict, static_server_data: dict,
             save: typing.Optional[typing.Callable[[], typing.Any]] = getattr(task, "save", None)
             if save:
                 save()
+        for task in background_tasks:
+            task.cancel()
+        loop.run_until_complete(asyncio.gather(*background_tasks, return_exceptions=True))
@@ -1,9 +1,9 @@
 import concurrent.futures
 import json
 import os
+import pathlib
 import random
 import tempfile
-import zipfile
 from collections import Counter
 from pickle import PicklingError
 from typing import Any
@@ -19,7 +19,7 @@ from WebHostLib import app
 from settings import ServerOptions, GeneratorOptions
 from .check import get_yaml_data, roll_options
 from .models import Generation, STATE_ERROR, STATE_QUEUED, Seed, UUID
-from .upload import upload_zip_to_db
+from .upload import upload_files_to_db
 
 
 def get_meta(options_source: dict, race: bool = False) -> dict[str, list[str] | dict[str, Any]]:
@@ -119,90 +119,22 @@ def start_generation(options: dict[str, dict | str], meta: dict[str, Any]):
 
 
 def gen_game(gen_options: dict, meta: dict[str, Any] | None = None, owner=None, sid=None, timeout: int|None = None):
-    if meta is None:
-        meta = {}
-
-    meta.setdefault("server_options", {}).setdefault("hint_cost", 10)
-    race = meta.setdefault("generator_options", {}).setdefault("race", False)
-
-    def task():
-        target = tempfile.TemporaryDirectory()
-        playercount = len(gen_options)
-        seed = get_seed()
-
-        if race:
-            random.seed()  # use time-based random source
-        else:
-            random.seed(seed)
-
-        seedname = "W" + (f"{random.randint(0, pow(10, seeddigits) - 1)}".zfill(seeddigits))
-
-        args = mystery_argparse([])  # Just to set up the Namespace with defaults
-        args.multi = playercount
-        args.seed = seed
-        args.name = {x: "" for x in range(1, playercount + 1)}  # only so it can be overwritten in mystery
-        args.spoiler = meta["generator_options"].get("spoiler", 0)
-        args.race = race
-        args.outputname = seedname
-        args.outputpath = target.name
-        args.teams = 1
-        args.plando_options = PlandoOptions.from_set(meta.setdefault("plando_options",
-                                                                     {"bosses", "items", "connections", "texts"}))
-        args.skip_prog_balancing = False
-        args.skip_output = False
-        args.spoiler_only = False
-        args.csv_output = False
-        args.sprite = dict.fromkeys(range(1, args.multi+1), None)
-        args.sprite_pool = dict.fromkeys(range(1, args.multi+1), None)
-
-        name_counter = Counter()
-        for player, (playerfile, settings) in enumerate(gen_options.items(), 1):
-            for k, v in settings.items():
-                if v is not None:
-                    if hasattr(args, k):
-                        getattr(args, k)[player] = v
-                    else:
-                        setattr(args, k, {player: v})
-
-            if not args.name[player]:
-                args.name[player] = os.path.splitext(os.path.split(playerfile)[-1])[0]
-            args.name[player] = handle_name(args.name[player], player, name_counter)
-        if len(set(args.name.values())) != len(args.name):
-            raise Exception(f"Names have to be unique. Names: {Counter(args.name.values())}")
-        ERmain(args, seed, baked_server_options=meta["server_options"])
-
-        return upload_to_db(target.name, sid, owner, race)
-
     thread_pool = DaemonThreadPoolExecutor(max_workers=1)
-    thread = thread_pool.submit(task)
+    thread = thread_pool.submit(generate_seed, gen_options, meta, owner, sid)
 
     try:
         return thread.result(timeout)
     except concurrent.futures.TimeoutError as e:
         if sid:
-            with db_session:
-                gen = Generation.get(id=sid)
-                if gen is not None:
-                    gen.state = STATE_ERROR
-                    meta = json.loads(gen.meta)
-                    meta["error"] = ("Allowed time for Generation exceeded, " +
-                                     "please consider generating locally instead. " +
-                                     format_exception(e))
-                    gen.meta = json.dumps(meta)
-                    commit()
+            record_generation_error(sid, "Allowed time for Generation exceeded, " +
+                                    "please consider generating locally instead. " +
+                                    format_exception(e))
     except (KeyboardInterrupt, SystemExit):
         # don't update db, retry next time
         raise
     except BaseException as e:
         if sid:
-            with db_session:
-                gen = Generation.get(id=sid)
-                if gen is not None:
-                    gen.state = STATE_ERROR
-                    meta = json.loads(gen.meta)
-                    meta["error"] = format_exception(e)
-                    gen.meta = json.dumps(meta)
-                    commit()
+            record_generation_error(sid, format_exception(e))
         raise
     finally:
         # free resources claimed by thread pool, if possible
@@ -211,6 +143,77 @@ def gen_game(gen_options: dict, meta: dict[str, Any] | None = None, owner=None,
         thread_pool.shutdown(wait=False, cancel_futures=True)
 
 
+def generate_seed(gen_options: dict, meta: dict[str, Any] | None = None, owner=None, sid=None) -> UUID:
+    """Generate a multiworld from the options of each player and store it as seed, returning the id of the seed."""
+    if meta is None:
+        meta = {}
+
+    meta.setdefault("server_options", {}).setdefault("hint_cost", 10)
+    race = meta.setdefault("generator_options", {}).setdefault("race", False)
+
+    target = tempfile.TemporaryDirectory()
+    playercount = len(gen_options)
+    seed = get_seed()
+
+    if race:
+        random.seed()  # use time-based random source
+    else:
+        random.seed(seed)
+
+    seedname = "W" + (f"{random.randint(0, pow(10, seeddigits) - 1)}".zfill(seeddigits))
+
+    args = mystery_argparse([])  # Just to set up the Namespace with defaults
+    args.multi = playercount
+    args.seed = seed
+    args.name = {x: "" for x in range(1, playercount + 1)}  # only so it can be overwritten in mystery
+    args.spoiler = meta["generator_options"].get("spoiler", 0)
+    args.race = race
+    args.outputname = seedname
+    args.outputpath = target.name
+    args.teams = 1
+    args.plando_options = PlandoOptions.from_set(meta.setdefault("plando_options",
+                                                                 {"bosses", "items", "connections", "texts"}))
+    args.skip_prog_balancing = False
+    args.skip_output = False
+    args.spoiler_only = False
+    args.csv_output = False
+    args.sprite = dict.fromkeys(range(1, args.multi+1), None)
+    args.sprite_pool = dict.fromkeys(range(1, args.multi+1), None)
+
+    name_counter = Counter()
+    for player, (playerfile, settings) in enumerate(gen_options.items(), 1):
+        for k, v in settings.items():
+            if v is not None:
+                if hasattr(args, k):
+                    getattr(args, k)[player] = v
+                else:
+                    setattr(args, k, {player: v})
+
+        if not args.name[player]:
+            args.name[player] = os.path.splitext(os.path.split(playerfile)[-1])[0]
+        args.name[player] = handle_name(args.name[player], player, name_counter)
+    if len(set(args.name.values())) != len(args.name):
+        raise Exception(f"Names have to be unique. Names: {Counter(args.name.values())}")
+    seed_ids: list[UUID] = []
+    ERmain(args, seed, baked_server_options=meta["server_options"],
+           output_handler=lambda output_dir, multidata: seed_ids.append(
+               upload_to_db(output_dir, multidata, sid, owner, race)))
+    return seed_ids[0]
+
+
+def record_generation_error(sid: UUID, error: str, **meta: Any) -> None:
+    """Mark the generation as failed with error, updating its meta with any other given values."""
+    with db_session:
+        gen = Generation.get(id=sid)
+        if gen is not None:
+            gen.state = STATE_ERROR
+            gen_meta = json.loads(gen.meta)
+            gen_meta["error"] = error
+            gen_meta.update(meta)
+            gen.meta = json.dumps(gen_meta)
+            commit()
+
+
 @app.route('/wait/<suuid:seed>')
 def wait_seed(seed: UUID):
     seed_id = seed
@@ -228,19 +231,16 @@ def wait_seed(seed: UUID):
     return render_template("waitSeed.html", seed_id=seed_id)
 
 
-def upload_to_db(folder, sid, owner, race):
-    for file in os.listdir(folder):
-        file = os.path.join(folder, file)
-        if file.endswith(".zip"):
-            with db_session:
-                with zipfile.ZipFile(file) as zfile:
-                    res = upload_zip_to_db(zfile, owner, {"race": race}, sid)
-                if type(res) == "str":
-                    raise Exception(res)
-                elif res:
-                    seed = res
-                    gen = Generation.get(id=seed.id)
-                    if gen is not None:
-                        gen.delete()
-                    return seed.id
-    raise Exception("Generation zipfile not found.")
+def upload_to_db(folder: str, multidata: dict[str, Any], sid, owner, race) -> UUID:
+    with db_session:
+        res = upload_files_to_db(((file.name, pathlib.Path(file.path).read_bytes) for file in os.scandir(folder)),
+                                 owner, {"race": race}, sid, multidata)
+        if isinstance(res, str):
+            raise Exception(res)
+        elif res:
+            seed = res
+            gen = Generation.get(id=seed.id)
+            if gen is not None:
+                gen.delete()
+            return seed.id
+    raise Exception("Generation multidata could not be stored.")
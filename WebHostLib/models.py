@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import date, datetime
 from uuid import UUID, uuid4
 from pony.orm import Database, PrimaryKey, Required, Set, Optional, buffer, LongStr
 
@@ -28,6 +28,8 @@ class Room(db.Entity):
     commands = Set('Command')
     seed = Required('Seed', index=True)
     multisave = Optional(buffer, lazy=True)
+    save_deltas = Set('SaveDelta')  # journal frames to apply to multisave, see MultiServer.SaveJournal
+    tracker_snapshot = Optional('TrackerSnapshot', cascade_delete=True)
     show_spoiler = Required(int, default=0)  # 0 -> never, 1 -> after completion, -> 2 always
     timeout = Required(int, default=lambda: 2 * 60 * 60)  # seconds since last activity to shutdown
     tracker = Optional(UUID, index=True)
@@ -35,6 +37,20 @@ class Room(db.Entity):
     last_port = Optional(int, default=lambda: 0)
 
 
+class SaveDelta(db.Entity):
+    id = PrimaryKey(int, auto=True)
+    room = Required(Room, index=True)
+    data = Required(buffer)
+
+
+class TrackerSnapshot(db.Entity):
+    """What trackers show of a room, written with each save so trackers don't have to load the whole multisave."""
+    room = PrimaryKey(Room)
+    version = Required(int)  # counts the changes of the snapshot, used as ETag
+    data = Required(buffer, lazy=True)
+    hint_data = Required(buffer, lazy=True)  # hints and name aliases, only rewritten when those change
+
+
 class Seed(db.Entity):
     id = PrimaryKey(UUID, default=uuid4)
     rooms = Set(Room)
@@ -60,6 +76,14 @@ class Generation(db.Entity):
     state = Required(int, default=0, index=True)
 
 
+class GamesPlayed(db.Entity):
+    """Slots of the rooms created on a complete day per game, rolled up for the stats page."""
+    day = Required(date)
+    game = Required(str)
+    count = Required(int)
+    PrimaryKey(day, game)
+
+
 class GameDataPackage(db.Entity):
     checksum = PrimaryKey(str)
     data = Required(bytes)
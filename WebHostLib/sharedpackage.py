@@ -0,0 +1,216 @@
+"""
+Read-only data package shared between room host processes.
+
+The data package is written once to a file of sorted string tables and integer arrays, which every room host
+process memory maps, so all of them share one physical copy through the page cache instead of each holding its own
+dicts of every name and id.
+"""
+from __future__ import annotations
+
+import hashlib
+import itertools
+import json
+import mmap
+import os
+import typing
+from array import array
+from bisect import bisect_left
+from collections.abc import ItemsView, Iterable, Iterator, Mapping, Sequence
+
+from Utils import cache_path
+
+if typing.TYPE_CHECKING:
+    from NetUtils import GamesPackage
+
+__all__ = ["SharedDataPackage", "SharedGroups", "SharedNameToId", "write_shared_data_package"]
+
+_MAGIC = b"APSDP001"
+_ALIGNMENT = 8
+
+
+class _StringTable(Sequence[str]):
+    """Strings stored as one utf-8 blob and the offsets between them."""
+    __slots__ = ("_blob", "_offsets")
+
+    def __init__(self, data: memoryview, blob: int, offsets: int, count: int) -> None:
+        self._offsets = data[offsets:offsets + (count + 1) * 8].cast("Q")
+        self._blob = data[blob:blob + self._offsets[count]]
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index: int) -> str:  # type: ignore[override]
+        if index < 0:
+            index += len(self)
+        return str(self._blob[self._offsets[index]:self._offsets[index + 1]], "utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        blob = self._blob
+        offsets = iter(self._offsets)
+        start = next(offsets)
+        for end in offsets:
+            yield str(blob[start:end], "utf-8")
+            start = end
+
+    def slice(self, start: int, end: int) -> Iterator[str]:
+        return (self[index] for index in range(start, end))
+
+
+class _NameToIdItems(ItemsView[str, int]):
+    _mapping: SharedNameToId
+
+    def __iter__(self) -> Iterator[tuple[str, int]]:
+        return zip(self._mapping._names, self._mapping._ids)
+
+
+class SharedNameToId(Mapping[str, int]):
+    """Read-only name -> id mapping, looked up by binary search of the sorted names."""
+    __slots__ = ("_names", "_ids")
+
+    def __init__(self, names: _StringTable, ids: memoryview) -> None:
+        self._names = names
+        self._ids = ids
+
+    def __getitem__(self, name: str) -> int:
+        index = bisect_left(self._names, name)
+        if index < len(self._names) and self._names[index] == name:
+            return self._ids[index]
+        raise KeyError(name)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._names)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def items(self) -> ItemsView[str, int]:
+        return _NameToIdItems(self)
+
+
+class SharedGroups(Mapping[str, typing.AbstractSet[str]]):
+    """Read-only group name -> member names mapping."""
+    __slots__ = ("_names", "_member_offsets", "_members")
+
+    def __init__(self, names: _StringTable, member_offsets: memoryview, members: _StringTable) -> None:
+        self._names = names
+        self._member_offsets = member_offsets
+        self._members = members
+
+    def __getitem__(self, name: str) -> typing.AbstractSet[str]:
+        index = bisect_left(self._names, name)
+        if index < len(self._names) and self._names[index] == name:
+            return frozenset(self._members.slice(self._member_offsets[index], self._member_offsets[index + 1]))
+        raise KeyError(name)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._names)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+
+class _Writer:
+    data: bytearray
+
+    def __init__(self) -> None:
+        self.data = bytearray()
+
+    def add(self, buffer: bytes) -> int:
+        self.data.extend(bytes(-len(self.data) % _ALIGNMENT))
+        offset = len(self.data)
+        self.data.extend(buffer)
+        return offset
+
+    def add_strings(self, strings: Iterable[str]) -> list[int]:
+        encoded = [string.encode("utf-8") for string in strings]
+        offsets = array("Q", itertools.accumulate((len(string) for string in encoded), initial=0))
+        return [self.add(b"".join(encoded)), self.add(offsets.tobytes()), len(encoded)]
+
+    def add_name_to_id(self, name_to_id: Mapping[str, int]) -> list[int]:
+        names = sorted(name_to_id)
+        return self.add_strings(names) + [self.add(array("q", (name_to_id[name] for name in names)).tobytes())]
+
+    def add_groups(self, groups: Mapping[str, Iterable[str]]) -> list[int]:
+        names = sorted(groups)
+        members = [sorted(groups[name]) for name in names]
+        member_offsets = array("Q", itertools.accumulate((len(group) for group in members), initial=0))
+        return self.add_strings(names) + [self.add(member_offsets.tobytes())] + \
+            self.add_strings(itertools.chain.from_iterable(members))
+
+
+def write_shared_data_package(games: Mapping[str, GamesPackage], directory: str | None = None) -> str:
+    """
+    Write the data package of games to a file for SharedDataPackage, returning its path.
+    The file is named by the checksums of the games, so an existing file for the same data package is reused.
+    """
+    key = hashlib.sha1(_MAGIC)
+    for game in sorted(games):
+        key.update(f"{game}\0{games[game].get('checksum', '')}\0".encode("utf-8"))
+    path = os.path.join(directory or cache_path("webhost"), f"datapackage_{key.hexdigest()}.bin")
+    if os.path.exists(path):
+        return path
+
+    writer = _Writer()
+    index: dict[str, dict[str, typing.Any]] = {}
+    for game, package in games.items():
+        index[game] = {
+            "checksum": package.get("checksum"),
+            "item_name_to_id": writer.add_name_to_id(package["item_name_to_id"]),
+            "location_name_to_id": writer.add_name_to_id(package["location_name_to_id"]),
+            "item_name_groups": writer.add_groups(package.get("item_name_groups", {})),
+            "location_name_groups": writer.add_groups(package.get("location_name_groups", {})),
+        }
+    encoded_index = json.dumps(index, separators=(",", ":")).encode("utf-8")
+    header_length = len(_MAGIC) + 8 + len(encoded_index)
+    header_length += -header_length % _ALIGNMENT
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(_MAGIC)
+        f.write(len(encoded_index).to_bytes(8, "little"))
+        f.write(encoded_index.ljust(header_length - len(_MAGIC) - 8, b" "))
+        f.write(writer.data)
+    os.replace(temp_path, path)
+    return path
+
+
+class SharedDataPackage:
+    """Memory mapped data package written by write_shared_data_package."""
+    games: dict[str, dict[str, typing.Any]]
+    """game -> data package without groups, as sent to clients"""
+    item_name_groups: dict[str, SharedGroups]
+    location_name_groups: dict[str, SharedGroups]
+
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:len(_MAGIC)] != _MAGIC:
+            raise ValueError(f"{path} is not a shared data package.")
+        index_length = int.from_bytes(self._mmap[len(_MAGIC):len(_MAGIC) + 8], "little")
+        index_start = len(_MAGIC) + 8
+        index = json.loads(self._mmap[index_start:index_start + index_length])
+        data_start = index_start + index_length + -(index_start + index_length) % _ALIGNMENT
+        data = memoryview(self._mmap)[data_start:]
+
+        def name_to_id(blob: int, offsets: int, count: int, ids: int) -> SharedNameToId:
+            return SharedNameToId(_StringTable(data, blob, offsets, count), data[ids:ids + count * 8].cast("q"))
+
+        def groups(blob: int, offsets: int, count: int, member_offsets: int, *members: int) -> SharedGroups:
+            return SharedGroups(_StringTable(data, blob, offsets, count),
+                                data[member_offsets:member_offsets + (count + 1) * 8].cast("Q"),
+                                _StringTable(data, *members))
+
+        self.games = {}
+        self.item_name_groups = {}
+        self.location_name_groups = {}
+        for game, game_index in index.items():
+            package: dict[str, typing.Any] = {
+                "item_name_to_id": name_to_id(*game_index["item_name_to_id"]),
+                "location_name_to_id": name_to_id(*game_index["location_name_to_id"]),
+            }
+            if game_index["checksum"] is not None:
+                package["checksum"] = game_index["checksum"]
+            self.games[game] = package
+            self.item_name_groups[game] = groups(*game_index["item_name_groups"])
+            self.location_name_groups[game] = groups(*game_index["location_name_groups"])
@@ -9,27 +9,60 @@ from bokeh.models import HoverTool
 from bokeh.plotting import figure, ColumnDataSource
 from bokeh.resources import INLINE
 from flask import render_template
-from pony.orm import select
+from pony.orm import count, db_session, select
 
+from Utils import utcnow
 from . import app, cache
-from .models import Room
+from .models import GamesPlayed, Room, Slot
 
 PLOT_WIDTH = 600
+STATS_DAYS = 30
+"""days before today shown on the stats page"""
+
+
+def count_games_played(days: list[date]) -> list[tuple[date, str, int]]:
+    """Count the slots of the rooms created on each of days per game, in one query."""
+    if not days:
+        return []
+    start = datetime.combine(min(days), datetime.min.time())
+    end = datetime.combine(max(days), datetime.min.time()) + timedelta(days=1)
+    # the time range can use the index on creation_time, the days then leave out those in between that aren't wanted
+    return select((room.creation_time.date(), slot.game, count())
+                  for room in Room for slot in Slot
+                  if slot.seed == room.seed and room.creation_time >= start and room.creation_time < end
+                  and room.creation_time.date() in days)[:]
+
+
+def update_games_played() -> None:
+    """Roll up the games played on the complete days of the stats period that aren't rolled up yet."""
+    today = utcnow().date()
+    cutoff = today - timedelta(days=STATS_DAYS)
+    with db_session:
+        rolled_up = set(select(entry.day for entry in GamesPlayed if entry.day >= cutoff))
+        # days without any rooms don't get an entry, so are counted again, which only takes an indexed query
+        days = [day for day in (cutoff + timedelta(days=days) for days in range(STATS_DAYS)) if day not in rolled_up]
+        for day, game, played in count_games_played(days):
+            GamesPlayed(day=day, game=game, count=played)
 
 
 def get_db_data(known_games: set[str]) -> tuple[Counter[str], defaultdict[date, dict[str, int]]]:
     games_played: defaultdict[date, dict[str, int]] = defaultdict(Counter)
     total_games: Counter[str] = Counter()
-    cutoff = date.today() - timedelta(days=30)
-    room: Room
-    for room in select(room for room in Room if room.creation_time >= cutoff):
-        for slot in room.seed.slots:
-            if slot.game in known_games:
-                current_game = slot.game
-            else:
-                current_game = "Other"
-            total_games[current_game] += 1
-            games_played[room.creation_time.date()][current_game] += 1
+    today = utcnow().date()
+    cutoff = today - timedelta(days=STATS_DAYS)
+    # complete days come from the rollup, today and days that aren't rolled up yet are counted from their rooms
+    counts = [(entry.day, entry.game, entry.count)
+              for entry in select(entry for entry in GamesPlayed if entry.day >= cutoff and entry.day < today)]
+    rolled_up = {day for day, _, _ in counts}
+    counts += count_games_played([day for day in (cutoff + timedelta(days=days) for days in range(STATS_DAYS + 1))
+                                  if day not in rolled_up])
+    for day, game, played in counts:
+        if game in known_games:
+            current_game = game
+        else:
+            current_game = "Other"
+        total_games[current_game] += played
+        games_played[day][current_game] += played
     return total_games, games_played
 
 
@@ -108,11 +141,11 @@ def stats():
         "end_angles": [],
     }
     current_angle = 0
-    for i, (game, count) in enumerate(total_games.most_common()):
+    for i, (game, played) in enumerate(total_games.most_common()):
         data["games"].append(game)
-        data["count"].append(count)
+        data["count"].append(played)
         data["start_angles"].append(current_angle)
-        angle = count / total * tau
+        angle = played / total * tau
         current_angle += angle
         data["end_angles"].append(current_angle)
 
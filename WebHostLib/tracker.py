@@ -1,5 +1,9 @@
 import datetime
 import collections
+import functools
+import hashlib
+import os
+import threading
 from dataclasses import dataclass
 from typing import Any, Callable, Dict, List, Optional, Set, Tuple, NamedTuple, Counter
 from uuid import UUID
@@ -8,11 +12,11 @@ from email.utils import parsedate_to_datetime
 from flask import make_response, render_template, request, Request, Response
 from werkzeug.exceptions import abort
 
-from MultiServer import Context, get_saving_second
+from MultiServer import Context, SaveJournal, get_saving_second
 from NetUtils import ClientStatus, Hint, NetworkItem, NetworkSlot, SlotType
-from Utils import restricted_loads, KeyedDefaultDict, utcnow
+from Utils import __version__, cache_argsless, restricted_loads, KeyedDefaultDict, utcnow
 from . import app, cache
-from .models import GameDataPackage, Room
+from .models import GameDataPackage, Room, SaveDelta
 
 # Multisave is currently updated, at most, every minute.
 TRACKER_CACHE_TIMEOUT_IN_SECONDS = 60
@@ -23,6 +27,92 @@ _player_trackers: Dict[str, Callable] = {}
 TeamPlayer = Tuple[int, int]
 ItemMetadata = Tuple[int, int, int]
 
+STATIC_DATA_CACHE_SIZE = 256 * 1024 * 1024
+"""approximate number of bytes of decoded multidata and data package lookup tables to keep in _static_data"""
+
+
+class StaticDataCache:
+    """
+    Memory bounded LRU cache of tracker data that never changes, shared by all requests of a process.
+    Cached values are shared between requests, so they must not be modified.
+    """
+    max_size: int
+    _entries: "collections.OrderedDict[Tuple[str, Any], Tuple[Any, int]]"
+    _size: int
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self._entries = collections.OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[str, Any], load: Callable[[], Tuple[Any, int]]) -> Any:
+        """Returns the cached value of key, or the value returned with its approximate size in bytes by load."""
+        with self._lock:
+            entry = self._entries.get(key, None)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry[0]
+        value, size = load()
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = value, size
+                self._size += size
+                while self._size > self.max_size and len(self._entries) > 1:
+                    self._size -= self._entries.popitem(last=False)[1][1]
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+_static_data = StaticDataCache(STATIC_DATA_CACHE_SIZE)
+
+
+class DataPackageTables(NamedTuple):
+    item_id_to_name: Dict[int, str]
+    location_id_to_name: Dict[int, str]
+    item_name_to_id: Dict[str, int]
+    location_name_to_id: Dict[str, int]
+
+
+def _load_multidata(room: Room) -> Tuple[Dict[str, Any], int]:
+    multidata = room.seed.multidata
+    # decoded, multidata takes roughly ten times as much memory as compressed
+    return Context.decompress(multidata), len(multidata) * 10
+
+
+class IdToNameTable(dict):
+    """
+    Names by id, which names missing ids without storing them,
+    as the tables are shared between requests and must not be modified.
+    """
+    unknown_name: str
+    """format string for the name of missing ids"""
+
+    def __init__(self, unknown_name: str, names: Dict[int, str]):
+        super().__init__(names)
+        self.unknown_name = unknown_name
+
+    def __missing__(self, code: int) -> str:
+        return self.unknown_name.format(code)
+
+
+def _load_data_package_tables(checksum: str) -> Tuple[DataPackageTables, int]:
+    game_package = restricted_loads(GameDataPackage.get(checksum=checksum).data)
+    tables = DataPackageTables(
+        IdToNameTable("Unknown Item (ID: {})", {
+            id: name for name, id in game_package["item_name_to_id"].items()}),
+        IdToNameTable("Unknown Location (ID: {})", {
+            id: name for name, id in game_package["location_name_to_id"].items()}),
+        game_package["item_name_to_id"],
+        game_package["location_name_to_id"],
+    )
+    # roughly 100 bytes for each name and id in each direction
+    return tables, 200 * (len(tables.item_name_to_id) + len(tables.location_name_to_id))
+
 
 def _cache_results(func: Callable) -> Callable:
     """Stores the results of any computationally expensive methods after the initial call in TrackerData.
@@ -49,14 +139,17 @@ class TrackerData:
     """
     room: Room
     _multidata: Dict[str, Any]
-    _multisave: Dict[str, Any]
+    _snapshot: Optional[Dict[str, Any]]
     _tracker_cache: Dict[str, Any]
 
     def __init__(self, room: Room):
         """Initialize a new RoomMultidata object for the current room."""
         self.room = room
-        self._multidata = Context.decompress(room.seed.multidata)
-        self._multisave = restricted_loads(room.multisave) if room.multisave else {}
+        self._multidata = _static_data.get(("multidata", room.seed.id), lambda: _load_multidata(room))
+        self._snapshot = None
+        if room.tracker_snapshot:
+            self._snapshot = restricted_loads(room.tracker_snapshot.data)
+            self._snapshot.update(restricted_loads(room.tracker_snapshot.hint_data))
         self._tracker_cache = {}
 
         self.item_name_to_id: Dict[str, Dict[str, int]] = {}
@@ -70,15 +163,29 @@ class TrackerData:
             game_name: KeyedDefaultDict(lambda code: f"Unknown Game {game_name} - Location (ID: {code})")
         })
         for game, game_package in self._multidata["datapackage"].items():
-            game_package = restricted_loads(GameDataPackage.get(checksum=game_package["checksum"]).data)
-            self.item_id_to_name[game] = KeyedDefaultDict(lambda code: f"Unknown Item (ID: {code})", {
-                id: name for name, id in game_package["item_name_to_id"].items()})
-            self.location_id_to_name[game] = KeyedDefaultDict(lambda code: f"Unknown Location (ID: {code})", {
-                id: name for name, id in game_package["location_name_to_id"].items()})
+            checksum = game_package["checksum"]
+            tables: DataPackageTables = _static_data.get(("datapackage", checksum),
+                                                         lambda: _load_data_package_tables(checksum))
+            self.item_id_to_name[game] = tables.item_id_to_name
+            self.location_id_to_name[game] = tables.location_id_to_name
 
             # Normal lookup tables as well.
-            self.item_name_to_id[game] = game_package["item_name_to_id"]
-            self.location_name_to_id[game] = game_package["location_name_to_id"]
+            self.item_name_to_id[game] = tables.item_name_to_id
+            self.location_name_to_id[game] = tables.location_name_to_id
+
+    @functools.cached_property
+    def _multisave(self) -> Dict[str, Any]:
+        """The full save of the room, only loaded when the tracker snapshot isn't enough."""
+        multisave = restricted_loads(self.room.multisave) if self.room.multisave else {}
+        if multisave:
+            SaveJournal.apply(multisave,
+                              [save_delta.data for save_delta in self.room.save_deltas.order_by(SaveDelta.id)])
+        return multisave
+
+    @property
+    def _save_state(self) -> Dict[str, Any]:
+        """The tracker snapshot if the room saved one, else the multisave, which share the format of most keys."""
+        return self._multisave if self._snapshot is None else self._snapshot
 
     def get_seed_name(self) -> str:
         """Retrieves the seed name."""
@@ -112,6 +219,13 @@ class TrackerData:
         """Retrieves the set of all locations marked complete by this player."""
         return self._multisave.get("location_checks", {}).get((team, player), set())
 
+    @_cache_results
+    def get_player_checked_locations_count(self, team: int, player: int) -> int:
+        """Retrieves the number of locations marked complete by this player."""
+        if self._snapshot is None:
+            return len(self.get_player_checked_locations(team, player))
+        return self._snapshot["location_check_counts"].get((team, player), 0)
+
     @_cache_results
     def get_player_missing_locations(self, team: int, player: int) -> Set[int]:
         """Retrieves the set of all locations not marked complete by this player."""
@@ -124,11 +238,13 @@ class TrackerData:
     @_cache_results
     def get_player_inventory_counts(self, team: int, player: int) -> collections.Counter:
         """Retrieves a dictionary of all items received by their id and their received count."""
-        received_items = self.get_player_received_items(team, player)
         starting_items = self.get_player_starting_inventory(player)
         inventory = collections.Counter()
-        for item in received_items:
-            inventory[item.item] += 1
+        if self._snapshot is None:
+            for item in self.get_player_received_items(team, player):
+                inventory[item.item] += 1
+        else:
+            inventory.update(self._snapshot["inventories"].get((team, player), {}))
         for item in starting_items:
             inventory[item] += 1
 
@@ -137,7 +253,7 @@ class TrackerData:
     @_cache_results
     def get_player_hints(self, team: int, player: int) -> Set[Hint]:
         """Retrieves a set of all hints relevant for a particular player."""
-        return self._multisave.get("hints", {}).get((team, player), set())
+        return self._save_state.get("hints", {}).get((team, player), set())
 
     @_cache_results
     def get_player_last_activity(self, team: int, player: int) -> Optional[datetime.timedelta]:
@@ -148,11 +264,11 @@ class TrackerData:
 
     def get_player_client_status(self, team: int, player: int) -> ClientStatus:
         """Retrieves the ClientStatus of a particular player."""
-        return self._multisave.get("client_game_state", {}).get((team, player), ClientStatus.CLIENT_UNKNOWN)
+        return self._save_state.get("client_game_state", {}).get((team, player), ClientStatus.CLIENT_UNKNOWN)
 
     def get_player_alias(self, team: int, player: int) -> Optional[str]:
         """Returns the alias of a particular player, if any."""
-        return self._multisave.get("name_aliases", {}).get((team, player), None)
+        return self._save_state.get("name_aliases", {}).get((team, player), None)
 
     @_cache_results
     def get_team_completed_worlds_count(self) -> Dict[int, int]:
@@ -186,7 +302,7 @@ class TrackerData:
     def get_team_locations_checked_count(self) -> Dict[int, int]:
         """Retrieves a dictionary of checked player locations each team has."""
         return {
-            team: sum(len(self.get_player_checked_locations(team, player)) for player in players)
+            team: sum(self.get_player_checked_locations_count(team, player) for player in players)
             for team, players in self.get_all_players().items()
         }
 
@@ -241,7 +357,7 @@ class TrackerData:
     def get_room_locations_complete(self) -> Dict[TeamPlayer, int]:
         """Retrieves a dictionary of all locations complete per player."""
         return {
-            (team, player): len(self.get_player_checked_locations(team, player))
+            (team, player): self.get_player_checked_locations_count(team, player)
             for team, players in self.get_all_players().items() for player in players
         }
 
@@ -274,7 +390,7 @@ class TrackerData:
         """
         last_activity: Dict[TeamPlayer, datetime.timedelta] = {}
         now = utcnow()
-        for (team, player), timestamp in self._multisave.get("client_activity_timers", []):
+        for (team, player), timestamp in self._save_state.get("client_activity_timers", []):
             from_timestamp = datetime.datetime.fromtimestamp(timestamp, datetime.timezone.utc).replace(tzinfo=None)
             last_activity[team, player] = now - from_timestamp
 
@@ -287,7 +403,7 @@ class TrackerData:
         Only supported platforms are Twitch and YouTube.
         """
         video_feeds = {}
-        for (team, player), video_data in self._multisave.get("video", []):
+        for (team, player), video_data in self._save_state.get("video", []):
             video_feeds[team, player] = video_data
 
         return video_feeds
@@ -298,10 +414,40 @@ class TrackerData:
         return self._multidata.get("spheres", [])
 
 
+@cache_argsless
+def get_tracker_code_version() -> str:
+    """Returns a hash of the version and the code and templates that render trackers, which changes with each update."""
+    digest = hashlib.sha256(__version__.encode())
+    directory = os.path.dirname(__file__)
+    paths = [__file__, os.path.join(directory, "api", "tracker.py")]
+    paths += sorted(os.path.join(root, name) for root, _, names in os.walk(os.path.join(directory, "templates"))
+                    for name in names)
+    for path in paths:
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def get_tracker_etag(room: Room) -> Optional[str]:
+    """
+    Returns an ETag that changes with each change of the tracker snapshot of the room and with each update of the
+    tracker code, or None if the room hasn't saved a tracker snapshot.
+    """
+    snapshot = room.tracker_snapshot
+    return f"{get_tracker_code_version()}-{snapshot.version}" if snapshot else None
+
+
 def _process_if_request_valid(incoming_request: Request, room: Optional[Room]) -> Optional[Response]:
     if not room:
         abort(404)
 
+    if incoming_request.if_none_match:
+        etag = get_tracker_etag(room)
+        # If-None-Match takes precedence over If-Modified-Since
+        if etag and incoming_request.if_none_match.contains_weak(etag):
+            return make_response("", 304)
+        return None
+
     if_modified_str: Optional[str] = incoming_request.headers.get("If-Modified-Since", None)
     if if_modified_str:
         if_modified = parsedate_to_datetime(if_modified_str)
@@ -318,12 +464,19 @@ def _process_if_request_valid(incoming_request: Request, room: Optional[Room]) -
     return None
 
 
+def _get_cached_response(incoming_request: Request, response: Response) -> Response:
+    etag, _ = response.get_etag()
+    if etag and incoming_request.if_none_match.contains_weak(etag):
+        return make_response("", 304)
+    return response
+
+
 @app.route("/tracker/<suuid:tracker>/<int:tracked_team>/<int:tracked_player>")
 def get_player_tracker(tracker: UUID, tracked_team: int, tracked_player: int, generic: bool = False) -> Response:
     key = f"{tracker}_{tracked_team}_{tracked_player}_{generic}"
     response: Optional[Response] = cache.get(key)
     if response:
-        return response
+        return _get_cached_response(request, response)
 
     # Room must exist.
     room = Room.get(tracker=tracker)
@@ -335,6 +488,10 @@ def get_player_tracker(tracker: UUID, tracked_team: int, tracked_player: int, ge
     timeout, last_modified, tracker_page = get_timeout_and_player_tracker(room, tracked_team, tracked_player, generic)
     response = make_response(tracker_page)
     response.last_modified = last_modified
+    etag = get_tracker_etag(room)
+    if etag:
+        # pages show times relative to now, so they are only semantically equivalent between saves
+        response.set_etag(etag, weak=True)
     cache.set(key, response, timeout)
     return response
 
@@ -365,7 +522,7 @@ def get_multiworld_tracker(tracker: UUID, game: str) -> Response:
     key = f"{tracker}_{game}"
     response: Optional[Response] = cache.get(key)
     if response:
-        return response
+        return _get_cached_response(request, response)
 
     # Room must exist.
     room = Room.get(tracker=tracker)
@@ -377,6 +534,10 @@ def get_multiworld_tracker(tracker: UUID, game: str) -> Response:
     timeout, last_modified, tracker_page = get_timeout_and_multiworld_tracker(room, game)
     response = make_response(tracker_page)
     response.last_modified = last_modified
+    etag = get_tracker_etag(room)
+    if etag:
+        # pages show times relative to now, so they are only semantically equivalent between saves
+        response.set_etag(etag, weak=True)
     cache.set(key, response, timeout)
     return response
 
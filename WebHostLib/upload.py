@@ -1,3 +1,4 @@
+import functools
 import json
 import pickle
 import typing
@@ -14,7 +15,7 @@ import schema
 
 import MultiServer
 from NetUtils import GamesPackage, SlotType
-from Utils import VersionException, __version__
+from Utils import VersionException, __version__, restricted_dumps
 from worlds.Files import AutoPatchRegister
 from worlds.AutoWorld import data_package_checksum
 from . import app
@@ -47,9 +48,15 @@ def banned_file(filename: str) -> bool:
 
 
 def process_multidata(compressed_multidata, files={}):
-    game_data: GamesPackage
-
     decompressed_multidata = MultiServer.Context.decompress(compressed_multidata)
+    slots = store_multidata_parts(decompressed_multidata, files)
+    compressed_multidata = compressed_multidata[0:1] + zlib.compress(pickle.dumps(decompressed_multidata), 9)
+    return slots, compressed_multidata
+
+
+def store_multidata_parts(decompressed_multidata, files={}) -> typing.Set[Slot]:
+    """Store the data packages and slots of multidata, and strip the data packages from it, leaving the checksums."""
+    game_data: GamesPackage
 
     slots: typing.Set[Slot] = set()
     if "datapackage" in decompressed_multidata:
@@ -57,8 +64,10 @@ def process_multidata(compressed_multidata, files={}):
         game_data_packages: typing.List[GameDataPackage] = []
         for game, game_data in decompressed_multidata["datapackage"].items():
             if game_data.get("checksum"):
-                original_checksum = game_data.pop("checksum")
-                game_data = games_package_schema.validate(game_data)
+                # may be the data package of this process when generated here, so it is not modified
+                original_checksum = game_data["checksum"]
+                game_data = games_package_schema.validate(
+                    {key: value for key, value in game_data.items() if key != "checksum"})
                 game_data = {key: value for key, value in sorted(game_data.items())}
                 game_data["checksum"] = data_package_checksum(game_data)
                 if original_checksum != game_data["checksum"]:
@@ -90,8 +99,7 @@ def process_multidata(compressed_multidata, files={}):
                            game=slot_info.game))
         flush()  # commit slots
 
-    compressed_multidata = compressed_multidata[0:1] + zlib.compress(pickle.dumps(decompressed_multidata), 9)
-    return slots, compressed_multidata
+    return slots
 
 
 def upload_zip_to_db(zfile: zipfile.ZipFile, owner=None, meta={"race": False}, sid=None):
@@ -103,69 +111,84 @@ def upload_zip_to_db(zfile: zipfile.ZipFile, owner=None, meta={"race": False}, s
                      'Did you mean to <a href="/generate">generate a game</a>?'))
         return
 
+    return upload_files_to_db(((file.filename, functools.partial(zfile.read, file)) for file in infolist),
+                              owner, meta, sid)
+
+
+def upload_files_to_db(output_files: typing.Iterable[typing.Tuple[str, typing.Callable[[], bytes]]], owner,
+                       meta={"race": False}, sid=None, decompressed_multidata=None):
+    """
+    Create a seed from the output files of a generation, given as file names and functions reading them.
+    decompressed_multidata is used in place of an .archipelago file, when the multidata was generated in this process.
+    """
     spoiler = ""
     files = {}
     multidata = None
 
     # Load files.
-    for file in infolist:
-        handler = AutoPatchRegister.get_handler(file.filename)
-        if banned_file(file.filename):
+    for filename, read in output_files:
+        handler = AutoPatchRegister.get_handler(filename)
+        if banned_file(filename):
             return "Uploaded data contained a rom file, which is likely to contain copyrighted material. " \
                    "Your file was deleted."
 
         # AP Container
         elif handler:
-            data = zfile.open(file, "r").read()
+            data = read()
             with zipfile.ZipFile(BytesIO(data)) as container:
                 player = json.loads(container.open("archipelago.json").read())["player"]
             files[player] = data
 
         # Spoiler
-        elif file.filename.endswith(".txt"):
-            spoiler = zfile.open(file, "r").read().decode("utf-8-sig")
+        elif filename.endswith(".txt"):
+            spoiler = read().decode("utf-8-sig")
 
         # Multi-data
-        elif file.filename.endswith(".archipelago"):
+        elif filename.endswith(".archipelago"):
             try:
-                multidata = zfile.open(file).read()
+                multidata = read()
             except:
                 flash("Could not load multidata. File may be corrupted or incompatible.")
                 multidata = None
 
 
         # Factorio
-        elif file.filename.endswith(".zip"):
+        elif filename.endswith(".zip"):
             try:
-                _, _, slot_id, *_ = file.filename.split('_')[0].split('-', 3)
+                _, _, slot_id, *_ = filename.split('_')[0].split('-', 3)
             except ValueError:
-                flash("Error: Unexpected file found in .zip: " + file.filename)
+                flash("Error: Unexpected file found in .zip: " + filename)
                 return
-            data = zfile.open(file, "r").read()
+            data = read()
             files[int(slot_id[1:])] = data
 
         # All other files using the standard MultiWorld.get_out_file_name_base method
         else:
             try:
-                _, _, slot_id, *_ = file.filename.split('.')[0].split('_', 3)
+                _, _, slot_id, *_ = filename.split('.')[0].split('_', 3)
             except ValueError:
-                flash("Error: Unexpected file found in .zip: " + file.filename)
+                flash("Error: Unexpected file found in .zip: " + filename)
                 return
-            data = zfile.open(file, "r").read()
+            data = read()
             files[int(slot_id[1:])] = data
 
     # Load multi data.
-    if multidata:
+    if decompressed_multidata:
+        slots = store_multidata_parts(decompressed_multidata, files)
+        # compressed only once, after the data packages were stripped
+        multidata = bytes([3]) + zlib.compress(restricted_dumps(decompressed_multidata), 9)
+    elif multidata:
         slots, multidata = process_multidata(multidata, files)
-
-        seed = Seed(multidata=multidata, spoiler=spoiler, slots=slots, owner=owner, meta=json.dumps(meta),
-                    id=sid if sid else uuid.uuid4())
-        flush()  # create seed
-        for slot in slots:
-            slot.seed = seed
-        return seed
     else:
         flash("No multidata was found in the zip file, which is required.")
+        return
+
+    seed = Seed(multidata=multidata, spoiler=spoiler, slots=slots, owner=owner, meta=json.dumps(meta),
+                id=sid if sid else uuid.uuid4())
+    flush()  # create seed
+    for slot in slots:
+        slot.seed = seed
+    return seed
 
 
 @app.route("/uploads", methods=["GET", "POST"])
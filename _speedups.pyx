@@ -14,6 +14,7 @@ from cpython cimport PyObject
 from typing import Any, Dict, Iterable, Iterator, Generator, Sequence, Tuple, TypeVar, Union, Set, List, TYPE_CHECKING
 from cymem.cymem cimport Pool
 from libc.stdint cimport int64_t, uint32_t
+from libc.stdlib cimport qsort
 from collections import defaultdict
 
 cdef extern from *:
@@ -69,6 +70,21 @@ cdef struct IndexEntry:
     size_t count
 
 
+cdef struct ItemIndexEntry:
+    ap_id_t item
+    size_t entry  # index into LocationStore.entries
+
+
+cdef int compare_item_index_entries(const void* a, const void* b) noexcept nogil:
+    cdef const ItemIndexEntry* x = <const ItemIndexEntry*>a
+    cdef const ItemIndexEntry* y = <const ItemIndexEntry*>b
+    if x.item != y.item:
+        return -1 if x.item < y.item else 1
+    if x.entry != y.entry:
+        return -1 if x.entry < y.entry else 1
+    return 0
+
+
 if TYPE_CHECKING:
     State = Dict[Tuple[int, int], Set[int]]
 else:
@@ -96,6 +112,11 @@ cdef class LocationStore:
     cdef list _items  # ~64KB/1000 players, speed up items (56 per tuple + 8 per list entry)
     cdef list _proxies  # ~92KB/1000 players, speed up self[player] (56 per struct + 28 per len + 8 per list entry)
     cdef PyObject** _raw_proxies  # 8K/1000 players, faster access to _proxies, but does not keep a ref
+    # reverse index for find_item and get_for_player, built on first use:
+    # entries grouped by receiver and sorted by item within each receiver
+    cdef ItemIndexEntry* item_index  # 1.6MB/100k items
+    cdef IndexEntry* receiver_index  # 16KB/1000 players
+    cdef size_t receiver_index_size
 
     def get_size(self):
         from sys import getsizeof
@@ -106,6 +127,8 @@ cdef class LocationStore:
         size += sum(sizeof(item) for item in self._items)
         size += sum(sizeof(proxy) for proxy in self._proxies)
         size += sizeof(self._raw_proxies[0]) * self.sender_index_size
+        if self.receiver_index:
+            size += sizeof(ItemIndexEntry) * self.entry_count + sizeof(IndexEntry) * self.receiver_index_size
         return size
 
     def __init__(self, locations_dict: Dict[int, Dict[int, Sequence[int]]]) -> None:
@@ -214,48 +237,86 @@ cdef class LocationStore:
     def items(self) -> Iterable[Tuple[int, PlayerLocationProxy]]:
         return self._items
 
+    cdef void _build_receiver_index(self):
+        if self.receiver_index:
+            return
+        cdef size_t i
+        cdef size_t max_receiver = 0
+        for i in range(self.entry_count):
+            max_receiver = max(max_receiver, self.entries[i].receiver)
+        cdef IndexEntry* receiver_index = <IndexEntry*>self._mem.alloc(max_receiver + 1, sizeof(IndexEntry))
+        if self.entry_count:
+            self.item_index = <ItemIndexEntry*>self._mem.alloc(self.entry_count, sizeof(ItemIndexEntry))
+
+        # counting sort by receiver, then sort each receiver's entries by item
+        cdef size_t start = 0
+        for i in range(self.entry_count):
+            receiver_index[self.entries[i].receiver].count += 1
+        for i in range(max_receiver + 1):
+            receiver_index[i].start = start
+            start += receiver_index[i].count
+            receiver_index[i].count = 0
+        cdef IndexEntry* receiver_entries
+        cdef ItemIndexEntry* item_entry
+        for i in range(self.entry_count):
+            receiver_entries = receiver_index + self.entries[i].receiver
+            item_entry = self.item_index + receiver_entries.start + receiver_entries.count
+            item_entry.item = self.entries[i].item
+            item_entry.entry = i
+            receiver_entries.count += 1
+        for i in range(max_receiver + 1):
+            if receiver_index[i].count > 1:
+                qsort(self.item_index + receiver_index[i].start, receiver_index[i].count, sizeof(ItemIndexEntry),
+                      compare_item_index_entries)
+
+        self.receiver_index_size = max_receiver + 1
+        self.receiver_index = receiver_index
+
     # specialized accessors
     def find_item(self, slots: Set[int], seeked_item_id: int) -> Generator[Tuple[int, int, int, int, int], None, None]:
         cdef ap_id_t item = seeked_item_id
-        cdef ap_player_t receiver
-        cdef ap_player_set* receivers
-        cdef size_t slot_count = len(slots)
-        if slot_count == 1:
-            # specialized implementation for single slot
-            receiver = list(slots)[0]
-            with nogil:
-                for entry in self.entries[:self.entry_count]:
-                    if entry.item == item and entry.receiver == receiver:
-                        with gil:
-                            yield entry.sender, entry.location, entry.item, entry.receiver, entry.flags
-        elif slot_count:
-            # generic implementation with lookup in set
-            receivers = ap_player_set_new(min(1023, slot_count))  # limit top level struct to 16KB
-            if not receivers:
-                raise MemoryError()
-            try:
-                for receiver in slots:
-                    if not ap_player_set_add(receivers, receiver):
-                        raise MemoryError()
-                with nogil:
-                    for entry in self.entries[:self.entry_count]:
-                        if entry.item == item and ap_player_set_contains(receivers, entry.receiver):
-                            with gil:
-                                yield entry.sender, entry.location, entry.item, entry.receiver, entry.flags
-            finally:
-                ap_player_set_free(receivers)
+        cdef size_t receiver
+        cdef size_t l
+        cdef size_t r
+        cdef size_t m
+        cdef size_t end
+        cdef LocationEntry* entry
+        self._build_receiver_index()
+        for slot in slots:
+            if slot < 1 or slot >= self.receiver_index_size:
+                continue
+            receiver = slot
+            # binary search for the first entry of the item
+            l = self.receiver_index[receiver].start
+            end = l + self.receiver_index[receiver].count
+            r = end
+            while l < r:
+                m = (l + r) // 2
+                if self.item_index[m].item < item:
+                    l = m + 1
+                else:
+                    r = m
+            while l < end and self.item_index[l].item == item:
+                entry = self.entries + self.item_index[l].entry
+                yield entry.sender, entry.location, entry.item, entry.receiver, entry.flags
+                l += 1
 
     def get_for_player(self, slot: int) -> Dict[int, Set[int]]:
-        cdef ap_player_t receiver = slot
         all_locations: Dict[int, Set[int]] = {}
-        with nogil:
-            for entry in self.entries[:self.entry_count]:
-                if entry.receiver == receiver:
-                    with gil:
-                        sender: int = entry.sender
-                        if sender not in all_locations:
-                            all_locations[sender] = set()
-                        all_locations[sender].add(entry.location)
+        cdef size_t receiver
+        cdef size_t i
+        cdef LocationEntry* entry
+        self._build_receiver_index()
+        if slot < 1 or slot >= self.receiver_index_size:
+            return all_locations
+        receiver = slot
+        cdef size_t start = self.receiver_index[receiver].start
+        for i in range(start, start + self.receiver_index[receiver].count):
+            entry = self.entries + self.item_index[i].entry
+            sender: int = entry.sender
+            if sender not in all_locations:
+                all_locations[sender] = set()
+            all_locations[sender].add(entry.location)
         return all_locations
 
     def get_checked(self, state: State, team: int, slot: int) -> List[int]:
@@ -1,9 +1,10 @@
 from collections import defaultdict
+from collections.abc import Set
 from typing import ClassVar, cast
 
 from typing_extensions import override
 
-from BaseClasses import CollectionState, Item, MultiWorld, Region
+from BaseClasses import CollectionRule, CollectionState, Entrance, Item, MultiWorld, Region
 from worlds.AutoWorld import LogicMixin, World
 
 from .rules import Rule
@@ -32,12 +33,18 @@ class CachedRuleBuilderWorld(World):
     rule_caching_enabled: ClassVar[bool] = True
     """Flag to inform rules that the caching system for this world is enabled. It should not be overridden."""
 
+    known_entrance_item_dependencies: ClassVar[bool] = True
+
+    _entrance_item_dependencies: dict[Entrance, tuple[CollectionRule, frozenset[str] | None]]
+    """A mapping of entrance to the rule its item dependencies were calculated for and the dependencies"""
+
     def __init__(self, multiworld: MultiWorld, player: int) -> None:
         super().__init__(multiworld, player)
         self.rule_item_dependencies = defaultdict(set)
         self.rule_region_dependencies = defaultdict(set)
         self.rule_location_dependencies = defaultdict(set)
         self.rule_entrance_dependencies = defaultdict(set)
+        self._entrance_item_dependencies = {}
 
     @override
     def register_rule_dependencies(self, resolved_rule: Rule.Resolved) -> None:
@@ -122,6 +129,28 @@ class CachedRuleBuilderWorld(World):
 
         return changed
 
+    @override
+    def get_entrance_item_dependencies(self, entrance: Entrance) -> Set[str] | None:
+        rule = entrance.access_rule
+        cached = self._entrance_item_dependencies.get(entrance)
+        if cached is not None and cached[0] is rule:
+            return cached[1]
+
+        item_dependencies: frozenset[str] | None = None
+        # rules that also depend on regions, locations or entrances can change while no items are collected
+        if (
+            isinstance(rule, Rule.Resolved)
+            and not rule.force_recalculate
+            and not rule.region_dependencies()
+            and not rule.location_dependencies()
+            and not rule.entrance_dependencies()
+        ):
+            item_names = set(rule.item_dependencies())
+            item_names.update(name for name, logical_name in self.item_mapping.items() if logical_name in item_names)
+            item_dependencies = frozenset(item_names)
+        self._entrance_item_dependencies[entrance] = rule, item_dependencies
+        return item_dependencies
+
     @override
     def reached_region(self, state: CollectionState, region: Region) -> None:
         super().reached_region(state, region)
@@ -36,8 +36,16 @@ def _update_cache() -> None:
         return
 
     try:
+        from worlds import get_cached_game
         from worlds.AutoWorld import AutoWorldRegister
-        for world in AutoWorldRegister.world_types.values():
+        for game in AutoWorldRegister.world_types:
+            cached_game = get_cached_game(game)
+            if cached_game:
+                # don't import worlds that are imported lazily just to find their settings
+                if cached_game["settings_key"]:
+                    _world_settings_name_cache[cached_game["settings_key"]] = cached_game["world_type"]
+                continue
+            world = AutoWorldRegister.world_types[game]
             annotation = world.__annotations__.get("settings", None)
             if annotation is None or annotation == "ClassVar[Optional['Group']]":
                 continue
@@ -687,6 +695,34 @@ class GeneratorOptions(Group):
         start_inventory -> Move remaining items to start_inventory, generate additional filler items to fill locations.
         """
 
+    class OutputProcesses(int):
+        """
+        Amount of worker processes to generate output files in, 0 to generate all output in threads.
+        Only used when generating from the command line on systems with the fork start method, like Linux.
+        On Windows and for generation on the WebHost, which does not run on the main thread, it does nothing.
+        Worlds that are not marked as portable_output always generate their output in threads.
+        """
+
+    class IncrementalSweep(IntEnum):
+        """
+        Keep the maximum exploration state of the progression fill up to date between placements,
+        instead of sweeping it from scratch for every placement. Speeds up the fill of large multiworlds.
+        0 -> Off
+        1 -> On
+        """
+        OFF = 0
+        ON = 1
+
+    class CompactProgItems(IntEnum):
+        """
+        Count the progression items of collection states in arrays of interned item names instead of Counters,
+        which makes the many state copies during fill and playthrough calculation cheaper.
+        0 -> Off
+        1 -> On
+        """
+        OFF = 0
+        ON = 1
+
     enemizer_path: EnemizerPath = EnemizerPath("EnemizerCLI/EnemizerCLI.Core")  # + ".exe" is implied on Windows
     player_files_path: PlayerFilesPath = PlayerFilesPath("Players")
     players: Players = Players(0)
@@ -696,6 +732,9 @@ class GeneratorOptions(Group):
     race: Race = Race(0)
     plando_options: PlandoOptions = PlandoOptions("bosses, connections, texts")
     panic_method: PanicMethod = PanicMethod("swap")
+    incremental_sweep: IncrementalSweep = IncrementalSweep(0)
+    output_processes: OutputProcesses = OutputProcesses(0)
+    compact_prog_items: CompactProgItems = CompactProgItems(0)
     loglevel: str = "info"
     logtime: bool = False
 
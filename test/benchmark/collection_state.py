@@ -0,0 +1,97 @@
+def run_collection_state_benchmark(game: str = "A Link to the Past", player_counts: tuple[int, ...] = (1, 10, 50),
+                                   copies: int = 1000, seed: int = 0) -> None:
+    """
+    Run a benchmark of the memory and copy time of a CollectionState holding all items, with Counter progression
+    item counts and with interned progression item counts.
+
+    :param game: The game to generate every player of the multiworld as, with default options.
+    :param player_counts: The amounts of players to generate multiworlds for.
+    :param copies: How many copies of the state to make for each measurement.
+    :param seed: The seed to generate the multiworlds with, the same for both representations.
+    """
+    import argparse
+    import gc
+    import logging
+    import tracemalloc
+
+    from time_it import TimeIt
+
+    from Utils import init_logging
+    from BaseClasses import CollectionState, MultiWorld
+    from worlds import AutoWorld
+    from worlds.AutoWorld import call_all
+
+    init_logging("Benchmark Runner")
+    logger = logging.getLogger("Benchmark")
+
+    gen_steps = ("generate_early", "create_regions", "create_items", "set_rules", "connect_entrances",
+                 "generate_basic", "pre_fill")
+    world_type = AutoWorld.AutoWorldRegister.world_types[game]
+
+    def setup_multiworld(players: int) -> MultiWorld:
+        multiworld = MultiWorld(players)
+        multiworld.game = {player: game for player in multiworld.player_ids}
+        multiworld.player_name = {player: f"Tester{player}" for player in multiworld.player_ids}
+        multiworld.set_seed(seed)
+        args = argparse.Namespace()
+        for name, option in world_type.options_dataclass.type_hints.items():
+            setattr(args, name, {player: option.from_any(option.default) for player in multiworld.player_ids})
+        multiworld.set_options(args)
+        multiworld.state = CollectionState(multiworld)
+        for step in gen_steps:
+            call_all(multiworld, step)
+        return multiworld
+
+    def prog_items_size(state: CollectionState) -> int:
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        prog_items = {player: counts.copy() for player, counts in state.prog_items.items()}
+        size = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+        del prog_items
+        return size
+
+    results: dict[int, dict[bool, tuple[int, float, float]]] = {}
+    for players in player_counts:
+        results[players] = {}
+        multiworld = setup_multiworld(players)
+        for interned in (False, True):
+            if interned:
+                multiworld.intern_prog_items()
+            state = multiworld.get_all_state()
+            item_names = [(item.name, item.player) for item in multiworld.itempool if item.advancement]
+            gc.collect()
+            size = prog_items_size(state)
+            with TimeIt(f"{copies} copies of {players} players with interned={interned}", logger) as copy_timer:
+                for _ in range(copies):
+                    state.copy()
+            with TimeIt(f"{copies} has() of all items of {players} players with interned={interned}",
+                        logger) as has_timer:
+                for _ in range(copies):
+                    for item_name, player in item_names:
+                        state.has(item_name, player)
+            results[players][interned] = size, copy_timer.dif / copies, has_timer.dif / copies
+        del multiworld
+
+    logger.info(f"{'players':>8} {'counter bytes':>14} {'interned bytes':>14} "
+                f"{'counter copy':>13} {'interned copy':>13} {'counter has':>12} {'interned has':>12}")
+    for players, times in results.items():
+        counter, interned = times[False], times[True]
+        logger.info(f"{players:>8} {counter[0]:>14} {interned[0]:>14} "
+                    f"{counter[1] * 1000:>11.3f}ms {interned[1] * 1000:>11.3f}ms "
+                    f"{counter[2] * 1000:>10.3f}ms {interned[2] * 1000:>10.3f}ms")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from path_change import change_home
+    change_home()
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--game", default="A Link to the Past")
+    parser.add_argument("--players", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--copies", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    run_collection_state_benchmark(args.game, tuple(args.players), args.copies, args.seed)
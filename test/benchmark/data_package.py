@@ -0,0 +1,57 @@
+def run_data_package_benchmark(clients: int = 300) -> None:
+    """
+    Compare encoding a DataPackage response for every client of a reconnect storm against putting it together from
+    the cached encoded data package of each game.
+
+    :param clients: How many clients request the full data package.
+    """
+    import logging
+    import time
+
+    from Utils import init_logging
+    import MultiServer
+    from NetUtils import encode
+    from worlds import network_data_package
+
+    init_logging("Benchmark Runner")
+    logger = logging.getLogger("Benchmark")
+
+    games = network_data_package["games"]
+    encoded_bytes = 0
+
+    def counting_encode(obj) -> str:
+        nonlocal encoded_bytes
+        encoded = encode(obj)
+        encoded_bytes += len(encoded.encode("utf-8"))
+        return encoded
+
+    def uncached() -> None:
+        for _ in range(clients):
+            counting_encode([{"cmd": "DataPackage", "data": {"games": games}}])
+
+    def cached() -> None:
+        MultiServer._encoded_game_packages.clear()
+        for _ in range(clients):
+            MultiServer.encode_data_package_msg(games)
+
+    MultiServer.encode = counting_encode
+    try:
+        for name, run in (("uncached", uncached), ("cached", cached)):
+            encoded_bytes = 0
+            start = time.process_time()
+            run()
+            cpu_time = time.process_time() - start
+            logger.info(f"{name}: {clients} clients, {len(games)} games, "
+                        f"{encoded_bytes / 1024 / 1024:.1f} MiB encoded in {cpu_time:.2f} seconds of CPU time.")
+    finally:
+        MultiServer.encode = encode
+
+
+if __name__ == "__main__":
+    import argparse
+    import path_change
+
+    path_change.change_home()
+    parser = argparse.ArgumentParser(description=run_data_package_benchmark.__doc__)
+    parser.add_argument("--clients", type=int, default=300, help="number of clients requesting the data package")
+    run_data_package_benchmark(parser.parse_args().clients)
@@ -0,0 +1,76 @@
+def run_fill_benchmark(game: str = "A Link to the Past", player_counts: tuple[int, ...] = (1, 5, 10, 25, 50),
+                       seed: int = 0) -> None:
+    """
+    Run a benchmark of distribute_items_restrictive wall-clock time against player count, with and without the
+    incremental sweep of fill_restrictive.
+
+    :param game: The game to generate every player of the multiworld as, with default options.
+    :param player_counts: The amounts of players to generate multiworlds for.
+    :param seed: The seed to generate the multiworlds with, the same for both fill modes.
+    """
+    import argparse
+    import gc
+    import logging
+
+    from time_it import TimeIt
+
+    from Utils import init_logging
+    from BaseClasses import CollectionState, MultiWorld
+    from Fill import distribute_items_restrictive
+    from worlds import AutoWorld
+    from worlds.AutoWorld import call_all
+
+    init_logging("Benchmark Runner")
+    logger = logging.getLogger("Benchmark")
+    # fill progress logging would drown out the results
+    logging.getLogger().setLevel(logging.WARNING)
+    logger.setLevel(logging.INFO)
+
+    gen_steps = ("generate_early", "create_regions", "create_items", "set_rules", "connect_entrances",
+                 "generate_basic", "pre_fill")
+    world_type = AutoWorld.AutoWorldRegister.world_types[game]
+
+    def setup_multiworld(players: int) -> MultiWorld:
+        multiworld = MultiWorld(players)
+        multiworld.game = {player: game for player in multiworld.player_ids}
+        multiworld.player_name = {player: f"Tester{player}" for player in multiworld.player_ids}
+        multiworld.set_seed(seed)
+        args = argparse.Namespace()
+        for name, option in world_type.options_dataclass.type_hints.items():
+            setattr(args, name, {player: option.from_any(option.default) for player in multiworld.player_ids})
+        multiworld.set_options(args)
+        multiworld.state = CollectionState(multiworld)
+        for step in gen_steps:
+            call_all(multiworld, step)
+        return multiworld
+
+    results: dict[int, dict[bool, float]] = {}
+    for players in player_counts:
+        results[players] = {}
+        for incremental_sweep in (False, True):
+            multiworld = setup_multiworld(players)
+            gc.collect()
+            gc.freeze()
+            with TimeIt(f"{game} fill of {players} players with incremental_sweep={incremental_sweep}", logger) as t:
+                distribute_items_restrictive(multiworld, incremental_sweep=incremental_sweep)
+            gc.unfreeze()
+            results[players][incremental_sweep] = t.dif
+            del multiworld
+
+    logger.info(f"{'players':>8} {'full sweep':>12} {'incremental':>12} {'speedup':>8}")
+    for players, times in results.items():
+        logger.info(f"{players:>8} {times[False]:>11.3f}s {times[True]:>11.3f}s {times[False] / times[True]:>7.2f}x")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from path_change import change_home
+    change_home()
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--game", default="A Link to the Past")
+    parser.add_argument("--players", type=int, nargs="+", default=[1, 5, 10, 25, 50])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    run_fill_benchmark(args.game, tuple(args.players), args.seed)
@@ -21,7 +21,63 @@ def run_load_worlds_benchmark():
         logger.info(f"{module} took {module.time_taken:.4f} seconds.")
 
 
+def run_startup_benchmark(runs: int = 3) -> None:
+    """
+    Run a benchmark of the time it takes a fresh process to import worlds, with all worlds imported eagerly and
+    with lazy world imports from a cold and a warm startup cache.
+
+    :param runs: How many processes to time for each mode, reporting the fastest.
+    """
+    import logging
+    import os
+    import subprocess
+    import sys
+
+    from Utils import init_logging
+
+    init_logging("Benchmark Runner")
+    logger = logging.getLogger("Benchmark")
+
+    code = "import time; start = time.perf_counter(); import worlds; print(time.perf_counter() - start)"
+
+    def time_startup(lazy: bool) -> float:
+        env = dict(os.environ, SKIP_REQUIREMENTS_UPDATE="1", LAZY_WORLD_IMPORTS="1" if lazy else "0")
+        output = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True)
+        return float(output.stdout.strip().splitlines()[-1])
+
+    def clear_cache() -> None:
+        from worlds import local_folder, user_folder
+        from worlds.StartupCache import get_cache_file
+        cache_file = get_cache_file(folder for folder in (user_folder, local_folder) if folder)
+        if os.path.exists(cache_file):
+            os.remove(cache_file)
+
+    results: dict[str, float] = {}
+    results["eager"] = min(time_startup(False) for _ in range(runs))
+    cold = []
+    for _ in range(runs):
+        clear_cache()
+        cold.append(time_startup(True))
+    results["lazy, cold cache"] = min(cold)
+    results["lazy, warm cache"] = min(time_startup(True) for _ in range(runs))
+
+    logger.info(f"{'mode':>18} {'startup':>9} {'speedup':>8}")
+    for mode, time_taken in results.items():
+        logger.info(f"{mode:>18} {time_taken:>8.3f}s {results['eager'] / time_taken:>7.2f}x")
+
+
 if __name__ == "__main__":
+    import argparse
+
     from path_change import change_home
     change_home()
-    run_load_worlds_benchmark()
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--startup", action="store_true",
+                        help="compare the startup time of eager and lazy world imports instead")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+    if args.startup:
+        run_startup_benchmark(args.runs)
+    else:
+        run_load_worlds_benchmark()
@@ -0,0 +1,56 @@
+def run_location_store_benchmark(players: int = 1000, locations_per_player: int = 200, lookups: int = 10000) -> None:
+    """
+    Time looking up where the items of a player are, as every hint and collect does, in the LocationStore and the
+    pure python _LocationStore, including building their reverse item index on the first lookup.
+
+    :param players: Number of players in the multiworld.
+    :param locations_per_player: Number of locations of each player, each holding an item for a random player.
+    :param lookups: Number of find_item lookups, which every !hint does.
+    """
+    import logging
+    import random
+
+    from time_it import TimeIt
+
+    from Utils import init_logging
+    from NetUtils import LocationStore, _LocationStore
+
+    init_logging("Benchmark Runner")
+    logger = logging.getLogger("Benchmark")
+
+    rng = random.Random(0)
+    items_per_player = 100
+    locations = {
+        sender: {
+            location: (rng.randrange(items_per_player), rng.randint(1, players), 0)
+            for location in range(1, locations_per_player + 1)
+        }
+        for sender in range(1, players + 1)
+    }
+    queries = [({rng.randint(1, players)}, rng.randrange(items_per_player)) for _ in range(lookups)]
+
+    for store_type in (_LocationStore, LocationStore):
+        store = store_type(locations)
+        name = store_type.__name__
+        with TimeIt(f"{name} first find_item", logger):
+            list(store.find_item(*queries[0]))
+        with TimeIt(f"{name} find_item, {lookups} lookups", logger) as timer:
+            for slots, item_id in queries:
+                list(store.find_item(slots, item_id))
+        logger.info(f"{timer.dif / lookups * 1e6:.1f} us per lookup.")
+        with TimeIt(f"{name} get_for_player, {players} players", logger):
+            for slot in range(1, players + 1):
+                store.get_for_player(slot)
+
+
+if __name__ == "__main__":
+    import argparse
+    import path_change
+
+    path_change.change_home()
+    parser = argparse.ArgumentParser(description=run_location_store_benchmark.__doc__)
+    parser.add_argument("--players", type=int, default=1000, help="number of players")
+    parser.add_argument("--locations", type=int, default=200, help="number of locations per player")
+    parser.add_argument("--lookups", type=int, default=10000, help="number of find_item lookups")
+    args = parser.parse_args()
+    run_location_store_benchmark(args.players, args.locations, args.lookups)
@@ -3,7 +3,7 @@ import unittest
 
 from Options import Accessibility
 from test.general import generate_items, generate_locations, generate_test_multiworld
-from Fill import FillError, balance_multiworld_progression, fill_restrictive, \
+from Fill import FillError, IncrementalSweepState, balance_multiworld_progression, fill_restrictive, \
     distribute_early_items, distribute_items_restrictive
 from BaseClasses import Entrance, LocationProgressType, MultiWorld, Region, Item, Location, \
     ItemClassification
@@ -463,6 +463,69 @@ class TestFillRestrictive(unittest.TestCase):
         self.assertEqual(1, len(player1.prog_items))
         self.assertIsNot(loc0.item, player1.prog_items[0], "Filled item was still present in item pool")
 
+    def test_incremental_sweep_matches_full_sweep(self):
+        """Test that `fill_restrictive` places the same items with and without the incremental sweep"""
+        def fill(incremental_sweep: bool) -> List[str]:
+            multiworld = generate_test_multiworld(3)
+            players = [generate_player_data(multiworld, player_id, prog_item_count=20) for player_id in (1, 2, 3)]
+            for player in players:
+                items = player.prog_items.copy()
+                player.generate_region(player.menu, 5)
+                for gate in items[:3]:
+                    player.generate_region(player.regions[-1], 5, lambda state, name=gate.name,
+                                           player_id=player.id: state.has(name, player_id))
+                multiworld.completion_condition[player.id] = lambda state, names=list(names(items)), \
+                    player_id=player.id: state.has_all(names, player_id)
+            locations = multiworld.get_unfilled_locations()
+            item_pool = [item for player in players for item in player.prog_items]
+            multiworld.random.shuffle(locations)
+            multiworld.random.shuffle(item_pool)
+            fill_restrictive(multiworld, multiworld.state, locations, item_pool, incremental_sweep=incremental_sweep)
+            self.assertFalse(item_pool)
+            self.assertTrue(multiworld.can_beat_game())
+            return [f"{location.name}: {location.item.name}" for location in multiworld.get_filled_locations()]
+
+        self.assertEqual(fill(False), fill(True))
+
+    def test_incremental_sweep_swap(self):
+        """Test that swapping during `fill_restrictive` works with the incremental sweep"""
+        multiworld = generate_test_multiworld(1)
+        player1 = generate_player_data(multiworld, 1, 4, 4)
+        locations = player1.locations[:]
+        items = player1.prog_items[:]
+        for location in locations[:-1]:
+            set_rule(location, lambda state: any(state.has(item.name, player1.id) for item in items))
+        sphere1_loc = locations[-1]
+        allowed_item = items[1]
+        add_item_rule(sphere1_loc, lambda item_to_place: item_to_place == allowed_item)
+        fill_restrictive(multiworld, multiworld.state, player1.locations, player1.prog_items, incremental_sweep=True)
+        self.assertEqual(sphere1_loc.item, allowed_item, "Wrong item in Sphere 1")
+        self.assertFalse(player1.prog_items)
+
+    def test_incremental_sweep_remove(self):
+        """Test that removing an item from the pool does not keep locations that are only reachable through each other"""
+        multiworld = generate_test_multiworld(1)
+        player1 = generate_player_data(multiworld, 1, 2, 3)
+        key, item_a, item_b = player1.prog_items
+        location_a, location_b = player1.locations
+        set_rule(location_a, lambda state: state.has_any((key.name, item_b.name), player1.id))
+        set_rule(location_b, lambda state: state.has(item_a.name, player1.id))
+        multiworld.push_item(location_a, item_a, False)
+        multiworld.push_item(location_b, item_b, False)
+
+        sweep_state = IncrementalSweepState(multiworld.state, [key])
+        state = sweep_state.get()
+        self.assertTrue(state.has_all((key.name, item_a.name, item_b.name), player1.id), "Test is flawed")
+
+        sweep_state.remove([key])
+        state = sweep_state.get()
+        self.assertFalse(state.has_any((key.name, item_a.name, item_b.name), player1.id))
+        self.assertFalse(state.advancements)
+
+        sweep_state.collect([key])
+        state = sweep_state.get()
+        self.assertTrue(state.has_all((key.name, item_a.name, item_b.name), player1.id))
+
 
 class TestDistributeItemsRestrictive(unittest.TestCase):
     def test_basic_distribute(self):
@@ -0,0 +1,75 @@
+import multiprocessing
+import os
+import unittest
+from tempfile import TemporaryDirectory
+from types import MethodType
+
+from BaseClasses import MultiWorld
+from Main import _collect_output, _start_output_processes, _stop_output_processes
+from worlds.AutoWorld import World
+from . import generate_test_multiworld
+
+
+def generate_output(self: World, output_directory: str) -> None:
+    with open(os.path.join(output_directory, f"{self.player}.txt"), "w") as f:
+        f.write(f"{self.player_name} {self.random.random()} {os.getpid()}")
+    self.output_pid = os.getpid()
+
+
+def get_output_results(self: World) -> int:
+    return self.output_pid
+
+
+def receive_output_results(self: World, results: int | None) -> None:
+    self.received_results = results
+
+
+def generate_output_multiworld(players: int) -> MultiWorld:
+    multiworld = generate_test_multiworld(players)
+    for world in multiworld.worlds.values():
+        world.generate_output = MethodType(generate_output, world)
+        world.get_output_results = MethodType(get_output_results, world)
+        world.receive_output_results = MethodType(receive_output_results, world)
+    return multiworld
+
+
+@unittest.skipUnless("fork" in multiprocessing.get_all_start_methods(), "output processes need fork")
+class TestOutputProcesses(unittest.TestCase):
+    def test_output_processes(self) -> None:
+        """Test that output generated in processes matches output generated in the generator process"""
+        multiworld = generate_output_multiworld(3)
+        with TemporaryDirectory() as process_dir, TemporaryDirectory() as local_dir:
+            pool, futures = _start_output_processes(multiworld, [1, 2, 3], process_dir, 2)
+            try:
+                for player, future in futures.items():
+                    _collect_output(multiworld, player, process_dir, future)
+            finally:
+                _stop_output_processes(pool)
+            self.assertEqual(sorted(os.listdir(process_dir)), ["1.txt", "2.txt", "3.txt"])
+            for player in multiworld.player_ids:
+                multiworld.worlds[player].generate_output(local_dir)
+
+            for player in multiworld.player_ids:
+                with open(os.path.join(process_dir, f"{player}.txt")) as f:
+                    name, number, pid = f.read().split(" ")
+                with open(os.path.join(local_dir, f"{player}.txt")) as f:
+                    local_name, local_number, local_pid = f.read().split(" ")
+                self.assertEqual(name, local_name)
+                self.assertEqual(number, local_number, "random state was not inherited by the output process")
+                self.assertNotEqual(pid, local_pid)
+                # the results of the output process are handed to the world in the generator process
+                self.assertEqual(multiworld.worlds[player].received_results, int(pid))
+
+    def test_output_process_errors(self) -> None:
+        """Test that errors raised in an output process are raised when collecting its output"""
+        multiworld = generate_output_multiworld(1)
+        multiworld.worlds[1].generate_output = MethodType(lambda self, output_directory: 1 / 0, multiworld.worlds[1])
+        with TemporaryDirectory() as output_dir:
+            pool, futures = _start_output_processes(multiworld, [1], output_dir, 1)
+            try:
+                with self.assertRaises(ZeroDivisionError):
+                    _collect_output(multiworld, 1, output_dir, futures[1])
+            finally:
+                _stop_output_processes(pool)
+        # the world is still told, so nothing waits on its results forever
+        self.assertIsNone(multiworld.worlds[1].received_results)
@@ -1,10 +1,11 @@
 import unittest
 from dataclasses import dataclass, fields
 from typing import Any, ClassVar, cast
+from unittest.mock import patch
 
 from typing_extensions import override
 
-from BaseClasses import CollectionState, Item, ItemClassification, Location, MultiWorld, Region
+from BaseClasses import CollectionState, Entrance, Item, ItemClassification, Location, MultiWorld, Region
 from NetUtils import JSONMessagePart
 from Options import Choice, FreeText, Option, OptionSet, PerGameCommonOptions, Toggle
 from rule_builder.cached_world import CachedRuleBuilderWorld
@@ -500,6 +501,74 @@ class TestCaching(CachedRuleBuilderTestCase):
         self.assertTrue(entrance.can_reach(self.state))
 
 
+class TestEntranceItemDependencies(CachedRuleBuilderTestCase):
+    multiworld: MultiWorld  # pyright: ignore[reportUninitializedInstanceVariable]
+    world: World  # pyright: ignore[reportUninitializedInstanceVariable]
+
+    @override
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.multiworld = setup_solo_multiworld(self.world_cls, seed=0)
+        world = self.multiworld.worlds[1]
+        self.world = world
+
+        region1 = Region("Region 1", 1, self.multiworld)
+        region2 = Region("Region 2", 1, self.multiworld)
+        region3 = Region("Region 3", 1, self.multiworld)
+        region4 = Region("Region 4", 1, self.multiworld)
+        self.multiworld.regions.extend([region1, region2, region3, region4])
+
+        world.create_entrance(region1, region2, Has("Item 1"))
+        world.create_entrance(region1, region3, HasAny("Item 3", "Item 4"))
+        world.create_entrance(region1, region4, CanReachRegion("Region 3") & Has("Item 5"))
+
+    def test_dependencies(self) -> None:
+        self.assertEqual(self.world.get_entrance_item_dependencies(self.world.get_entrance("Region 1 -> Region 2")),
+                         {"Item 1"})
+        self.assertEqual(self.world.get_entrance_item_dependencies(self.world.get_entrance("Region 1 -> Region 3")),
+                         {"Item 3", "Item 4"})
+        # also depends on a region, so it can change without collecting items
+        self.assertIsNone(self.world.get_entrance_item_dependencies(self.world.get_entrance("Region 1 -> Region 4")))
+
+    def test_only_dependent_entrances_are_retested(self) -> None:
+        state = CollectionState(self.multiworld)
+        region2 = self.world.get_region("Region 2")
+        region3 = self.world.get_region("Region 3")
+        tested: list[str] = []
+        can_reach = Entrance.can_reach
+
+        def traced_can_reach(entrance: Entrance, state: CollectionState) -> bool:
+            tested.append(entrance.name)
+            return can_reach(entrance, state)
+
+        with patch.object(Entrance, "can_reach", traced_can_reach):
+            self.assertFalse(region2.can_reach(state))
+            tested.clear()
+
+            state.collect(self.world.create_item("Item 2"), True)
+            self.assertFalse(region2.can_reach(state))
+            self.assertEqual(tested, ["Region 1 -> Region 4"])
+            tested.clear()
+
+            state.collect(self.world.create_item("Item 3"), True)
+            self.assertTrue(region3.can_reach(state))
+            self.assertFalse(region2.can_reach(state))
+            self.assertNotIn("Region 1 -> Region 2", tested)
+
+        state.collect(self.world.create_item("Item 1"), True)
+        self.assertTrue(region2.can_reach(state))
+
+    def test_copies_keep_changed_items(self) -> None:
+        state = CollectionState(self.multiworld)
+        region2 = self.world.get_region("Region 2")
+        self.assertFalse(region2.can_reach(state))
+        state.collect(self.world.create_item("Item 1"), True)
+        self.assertTrue(region2.can_reach(state.copy()))
+        self.assertTrue(region2.can_reach(state.copy_on_write()))
+        self.assertTrue(region2.can_reach(state))
+
+
 class TestCacheDisabled(RuleBuilderTestCase):
     multiworld: MultiWorld  # pyright: ignore[reportUninitializedInstanceVariable]
     world: World  # pyright: ignore[reportUninitializedInstanceVariable]
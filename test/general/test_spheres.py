@@ -0,0 +1,111 @@
+import unittest
+
+from BaseClasses import Item, ItemClassification, Location, MultiWorld
+from worlds.generic.Rules import set_rule
+from . import generate_test_multiworld
+
+
+class TestSphereLog(unittest.TestCase):
+    multiworld: MultiWorld
+    start: Location
+    event: Location
+    goal: Location
+    unreachable: Location
+
+    def setUp(self) -> None:
+        self.multiworld = generate_test_multiworld()
+        menu = self.multiworld.get_region("Menu", 1)
+        self.start = Location(1, "Start", 1, menu)
+        self.event = Location(1, "Event", None, menu)
+        self.goal = Location(1, "Goal", 2, menu)
+        self.unreachable = Location(1, "Unreachable", 3, menu)
+        menu.locations += [self.start, self.event, self.goal, self.unreachable]
+
+        self.start.place_locked_item(Item("Key", ItemClassification.progression, 1, 1))
+        self.event.place_locked_item(Item("Door Open", ItemClassification.progression, None, 1))
+        self.goal.place_locked_item(Item("Victory", ItemClassification.progression, 2, 1))
+        self.unreachable.place_locked_item(Item("Junk", ItemClassification.filler, 3, 1))
+        set_rule(self.event, lambda state: state.has("Key", 1))
+        set_rule(self.goal, lambda state: state.has("Door Open", 1))
+        set_rule(self.unreachable, lambda state: False)
+        self.multiworld.completion_condition[1] = lambda state: state.has("Victory", 1)
+
+    def test_spheres(self) -> None:
+        """Test that the spheres of every consumer are read from the same sweep"""
+        sphere_log = self.multiworld.get_sphere_log()
+        self.assertEqual([sphere.locations for sphere in sphere_log.spheres],
+                         [{self.start}, {self.event}, {self.goal}])
+        self.assertEqual([sphere.events for sphere in sphere_log.spheres], [set(), {self.event}, set()])
+        self.assertEqual([sphere.beaten for sphere in sphere_log.spheres], [{1: False}, {1: False}, {1: True}])
+        self.assertEqual(sphere_log.unreachable, {self.unreachable})
+        self.assertTrue(all(sphere.state is None for sphere in sphere_log.spheres))
+
+        self.assertEqual(list(self.multiworld.get_spheres()),
+                         [{self.start}, {self.event}, {self.goal}, set(), {self.unreachable}])
+        # events are collected within the sphere they become reachable in, so no sphere is left with only the event
+        self.assertEqual(list(self.multiworld.get_sendable_spheres()),
+                         [{self.start}, {self.goal}, set(), {self.unreachable}])
+
+    def test_sendable_spheres(self) -> None:
+        """Test that locations unlocked by an event are in the same sendable sphere as the event"""
+        menu = self.multiworld.get_region("Menu", 1)
+        free_event = Location(1, "Free Event", None, menu)
+        behind_event = Location(1, "Behind Event", 4, menu)
+        chained_event = Location(1, "Chained Event", None, menu)
+        behind_chain = Location(1, "Behind Chain", 5, menu)
+        menu.locations += [free_event, behind_event, chained_event, behind_chain]
+        free_event.place_locked_item(Item("Lever Pulled", ItemClassification.progression, None, 1))
+        behind_event.place_locked_item(Item("Junk", ItemClassification.filler, 3, 1))
+        chained_event.place_locked_item(Item("Gate Open", ItemClassification.progression, None, 1))
+        behind_chain.place_locked_item(Item("Junk", ItemClassification.filler, 3, 1))
+        set_rule(behind_event, lambda state: state.has("Lever Pulled", 1))
+        set_rule(chained_event, lambda state: state.has("Lever Pulled", 1))
+        set_rule(behind_chain, lambda state: state.has("Gate Open", 1))
+
+        self.assertEqual(list(self.multiworld.get_sendable_spheres()),
+                         [{self.start, behind_event, behind_chain}, {self.goal}, set(), {self.unreachable}])
+        # the sweep of all locations still has the events in spheres of their own
+        self.assertEqual([sphere.locations for sphere in self.multiworld.get_sphere_log().spheres],
+                         [{self.start, free_event}, {self.event, behind_event, chained_event},
+                          {self.goal, behind_chain}])
+
+    def test_shared_sphere_log(self) -> None:
+        """Test that the sphere log is only created once after enabling it"""
+        self.assertIsNot(self.multiworld.get_sphere_log(), self.multiworld.get_sphere_log())
+        self.multiworld.enable_sphere_log(checkpoints=True)
+        sphere_log = self.multiworld.get_sphere_log()
+        self.assertIs(sphere_log, self.multiworld.get_sphere_log())
+        self.assertTrue(sphere_log.spheres[0].state.has("Key", 1))
+        self.assertFalse(sphere_log.spheres[0].state.has("Door Open", 1))
+
+        self.multiworld.enable_sphere_log()
+        self.assertIsNot(sphere_log, self.multiworld.get_sphere_log())
+
+    def test_accessibility(self) -> None:
+        """Test that the accessibility check from the sphere log matches the check from a fresh state"""
+        accessibility = self.multiworld.worlds[1].options.accessibility
+        accessibility.value = accessibility.option_minimal
+        self.multiworld.enable_sphere_log()
+        # minimal accessibility only needs the game to be beatable
+        self.assertTrue(self.multiworld.fulfills_accessibility())
+        self.assertTrue(self.multiworld.fulfills_accessibility(self.multiworld.state.copy()))
+
+        accessibility.value = accessibility.option_full
+        self.multiworld.enable_sphere_log()
+        if __debug__:
+            with self.assertRaises(RuntimeError):
+                self.multiworld.fulfills_accessibility()
+        else:
+            self.assertFalse(self.multiworld.fulfills_accessibility())
+
+    def test_playthrough(self) -> None:
+        """Test that the playthrough is the same with and without a shared sphere log"""
+        self.multiworld.spoiler.create_playthrough(create_paths=False)
+        playthrough = self.multiworld.spoiler.playthrough
+        self.assertEqual(len(playthrough), 4)
+
+        for checkpoints in (False, True):
+            with self.subTest(checkpoints=checkpoints):
+                self.multiworld.enable_sphere_log(checkpoints)
+                self.multiworld.spoiler.create_playthrough(create_paths=False)
+                self.assertEqual(self.multiworld.spoiler.playthrough, playthrough)
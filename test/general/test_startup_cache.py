@@ -0,0 +1,129 @@
+import os
+import unittest
+from tempfile import TemporaryDirectory
+
+from worlds.AutoWorld import LazyWorldTypes, World
+from worlds.StartupCache import get_fingerprint, make_cached_game, read_cache, write_cache
+
+
+class TestLazyWorldTypes(unittest.TestCase):
+    world_types: LazyWorldTypes
+    loaded: list[str]
+
+    def setUp(self) -> None:
+        self.world_types = LazyWorldTypes({"Loaded": World})
+        self.loaded = []
+
+        def load(game: str, succeeds: bool = True) -> bool:
+            self.loaded.append(game)
+            if succeeds:
+                self.world_types[game] = World
+            return succeeds
+
+        self.world_types.add_pending("Pending", lambda: load("Pending"))
+        self.world_types.add_pending("Broken", lambda: load("Broken", False))
+        self.world_types.add_pending("Loaded", lambda: load("Loaded"))
+
+    def test_pending_games(self) -> None:
+        """Test that pending games are known without loading them"""
+        self.assertEqual(len(self.world_types), 3)
+        self.assertEqual(set(self.world_types), {"Loaded", "Pending", "Broken"})
+        self.assertIn("Pending", self.world_types)
+        self.assertNotIn("Missing", self.world_types)
+        self.assertFalse(self.world_types.is_loaded("Pending"))
+        self.assertEqual(self.loaded, [])
+
+    def test_lookup_loads(self) -> None:
+        """Test that looking up a pending game loads it once"""
+        self.assertIs(self.world_types["Pending"], World)
+        self.assertIs(self.world_types.get("Pending"), World)
+        self.assertTrue(self.world_types.is_loaded("Pending"))
+        self.assertEqual(self.loaded, ["Pending"])
+
+        with self.assertLogs(level="ERROR"):
+            self.assertIsNone(self.world_types.get("Broken"))
+        self.assertNotIn("Broken", self.world_types)
+        with self.assertRaises(KeyError):
+            self.world_types["Broken"]
+        self.assertEqual(self.loaded, ["Pending", "Broken"])
+
+    def test_register_pending(self) -> None:
+        """Test that registering a pending game without loading it through the registry is reported"""
+        registered = []
+        self.world_types.on_register_pending = lambda game, world_type: registered.append(game)
+        self.world_types["Pending"] = World
+        self.world_types["New"] = World
+        self.assertEqual(registered, ["Pending"])
+        self.assertNotIn("Pending", self.world_types.pending)
+        self.assertEqual(self.loaded, [])
+
+    def test_values_load_all(self) -> None:
+        """Test that iterating over the World classes loads every pending game"""
+        copy = self.world_types.copy()
+        with self.assertLogs(level="ERROR"):
+            self.assertEqual(dict(self.world_types.items()), {"Loaded": World, "Pending": World})
+        self.assertEqual(self.world_types.pending, {})
+        self.assertEqual(self.loaded, ["Pending", "Broken"])
+        self.assertEqual(set(copy.pending), {"Pending", "Broken"})
+
+
+class TestStartupCache(unittest.TestCase):
+    def test_cached_game(self) -> None:
+        """Test that the cache entry of a world holds what is needed without importing it"""
+        from worlds.alttp import ALTTPWorld
+        data_package = ALTTPWorld.get_data_package_data()
+        cached_game = make_cached_game(ALTTPWorld, data_package)
+        self.assertEqual(cached_game["world_type"], "worlds.alttp.ALTTPWorld")
+        self.assertEqual(cached_game["settings_key"], ALTTPWorld.settings_key)
+        self.assertEqual(set(cached_game["hint_blacklist"]), ALTTPWorld.hint_blacklist)
+        self.assertIs(cached_game["data_package"], data_package)
+        self.assertIsNone(make_cached_game(World, data_package)["settings_key"])
+
+    def test_fingerprint(self) -> None:
+        """Test that the fingerprint of a world source changes with its files, but not its bytecode cache"""
+        with TemporaryDirectory() as world_folder:
+            init_file = os.path.join(world_folder, "__init__.py")
+            with open(init_file, "w") as f:
+                f.write("game = 'Test'")
+            fingerprint = get_fingerprint(world_folder)
+
+            os.makedirs(os.path.join(world_folder, "__pycache__"))
+            with open(os.path.join(world_folder, "__pycache__", "__init__.pyc"), "w") as f:
+                f.write("bytecode")
+            self.assertEqual(get_fingerprint(world_folder), fingerprint)
+
+            with open(os.path.join(world_folder, "Items.py"), "w") as f:
+                f.write("items = []")
+            self.assertNotEqual(get_fingerprint(world_folder), fingerprint)
+            fingerprint = get_fingerprint(world_folder)
+
+            stat = os.stat(init_file)
+            os.utime(init_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+            self.assertNotEqual(get_fingerprint(world_folder), fingerprint)
+            fingerprint = get_fingerprint(world_folder)
+
+            # edited with the same size, with the modification time set back, like restored by a checkout
+            stat = os.stat(init_file)
+            replacement = os.path.join(world_folder, "replacement")
+            with open(replacement, "w") as f:
+                f.write("game = 'Tset'")
+            os.replace(replacement, init_file)
+            os.utime(init_file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+            self.assertNotEqual(get_fingerprint(world_folder), fingerprint)
+
+    def test_read_write(self) -> None:
+        """Test that the cache can be read back and that unreadable caches are treated as empty"""
+        sources = {"test": {"fingerprint": "abc", "games": {"Test": {"world_version": (1, 2, 3), "data_package": {
+            "item_name_to_id": {"Item": 1}, "location_name_to_id": {"Location": 1}, "checksum": "def",
+        }}}}}
+        with TemporaryDirectory() as cache_folder:
+            cache_file = os.path.join(cache_folder, "worlds", "cache.pickle")
+            self.assertEqual(read_cache(cache_file), {})
+            write_cache(cache_file, sources)
+            self.assertEqual(read_cache(cache_file), sources)
+            self.assertEqual(os.listdir(os.path.dirname(cache_file)), ["cache.pickle"])
+
+            with open(cache_file, "wb") as f:
+                f.write(b"not a pickle")
+            with self.assertLogs(level="WARNING"):
+                self.assertEqual(read_cache(cache_file), {})
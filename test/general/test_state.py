@@ -1,7 +1,9 @@
 import unittest
+from collections import Counter
 
+from BaseClasses import CollectionState, Item, ItemClassification, MultiWorld, ProgItemCounts
 from worlds.AutoWorld import AutoWorldRegister, call_all
-from . import setup_solo_multiworld
+from . import generate_test_multiworld, setup_solo_multiworld
 
 
 class TestBase(unittest.TestCase):
@@ -27,3 +29,152 @@ class TestBase(unittest.TestCase):
                     with self.subTest("Step", step=step):
                         call_all(multiworld, step)
                         self.assertTrue(multiworld.get_all_state(False, allow_partial_entrances=True))
+
+
+class TestProgItemCounts(unittest.TestCase):
+    def test_counter_behavior(self) -> None:
+        """Test that interned progression item counts behave like a Counter"""
+        counts = ProgItemCounts({"Sword": 0, "Shield": 1}, ["Sword", "Sword", "Custom"])
+        counter = Counter(["Sword", "Sword", "Custom"])
+        for name in ("Sword", "Shield", "Custom", "Missing"):
+            self.assertEqual(counts[name], counter[name], name)
+            self.assertEqual(name in counts, name in counter, name)
+        self.assertEqual(dict(counts), dict(counter))
+        self.assertEqual(counts.get("Shield", 5), 5)
+
+        counts.update({"Shield": 2, "Custom": 1})
+        counts.subtract(["Sword"])
+        counts["Sword"] -= 2
+        self.assertEqual(dict(counts), {"Sword": -1, "Shield": 2, "Custom": 2})
+        self.assertEqual(counts.total(), 3)
+
+    def test_counter_zeros(self) -> None:
+        """Test that names counted down to 0 and deleted names behave like in a Counter"""
+        counts = ProgItemCounts({"Sword": 0, "Shield": 1}, ["Sword", "Shield", "Custom"])
+        counter = Counter(["Sword", "Shield", "Custom"])
+        for container in (counts, counter):
+            container["Sword"] -= 1  # stays contained at 0
+            container["Custom"] -= 1
+            del container["Shield"]
+            del container["Missing"]  # deleting a missing name does nothing
+        for name in ("Sword", "Shield", "Custom", "Missing"):
+            self.assertEqual(name in counts, name in counter, name)
+        self.assertEqual(dict(counts), dict(counter))
+        self.assertEqual(len(counts), len(counter))
+
+        copy = counts.copy()
+        copy["Sword"] += 1
+        del counts["Sword"]
+        self.assertNotIn("Sword", counts)
+        self.assertEqual(dict(copy), {"Sword": 1, "Custom": 0})
+
+    def test_copy(self) -> None:
+        """Test that copies of interned progression item counts are independent"""
+        counts = ProgItemCounts({"Sword": 0})
+        counts["Sword"] += 1
+        copy = counts.copy()
+        copy["Sword"] += 1
+        copy["Custom"] = 1.5
+        self.assertEqual(dict(counts), {"Sword": 1})
+        self.assertEqual(dict(copy), {"Sword": 2, "Custom": 1.5})
+
+    def test_intern_prog_items(self) -> None:
+        """Test that states created after interning the progression items use interned counts"""
+        multiworld = generate_test_multiworld()
+        sword = Item("Sword", ItemClassification.progression, 1, 1)
+        multiworld.itempool.append(Item("Filler", ItemClassification.filler, 2, 1))
+        multiworld.push_precollected(sword)
+        multiworld.intern_prog_items()
+        self.assertEqual(multiworld.prog_item_ids, {1: {"Sword": 0}})
+
+        for state in (multiworld.state, multiworld.state.copy(), multiworld.get_all_state()):
+            self.assertIsInstance(state.prog_items[1], ProgItemCounts)
+            self.assertTrue(state.has("Sword", 1))
+            self.assertFalse(state.has("Sword", 1, 2))
+            state.remove(sword)
+            self.assertFalse(state.has("Sword", 1))
+
+    def test_all_state_matches(self) -> None:
+        """Test that interning the progression items of each world does not change its all_state"""
+        for game_name, world_type in AutoWorldRegister.world_types.items():
+            with self.subTest("Game", game=game_name):
+                multiworld = setup_solo_multiworld(world_type)
+                all_state = multiworld.get_all_state(allow_partial_entrances=True)
+                multiworld.intern_prog_items()
+                interned_state = multiworld.get_all_state(allow_partial_entrances=True)
+                self.assertIsInstance(interned_state.prog_items[1], ProgItemCounts)
+                # interned names without a count are left out of iteration
+                self.assertEqual(
+                    {name: count for name, count in interned_state.prog_items[1].items() if count},
+                    {name: count for name, count in all_state.prog_items[1].items() if count}
+                )
+                self.assertEqual(interned_state.reachable_regions[1], all_state.reachable_regions[1])
+
+
+class TestCopyOnWrite(unittest.TestCase):
+    multiworld: MultiWorld
+
+    def setUp(self) -> None:
+        self.multiworld = generate_test_multiworld(2)
+
+    def test_changes_are_not_shared(self) -> None:
+        """Test that changes of a copy on write state and its parent stay separate"""
+        parent = CollectionState(self.multiworld)
+        parent.collect(Item("Sword", ItemClassification.progression, 1, 1), True)
+        child = parent.copy_on_write()
+        self.assertIs(child.prog_items[1], parent.prog_items[1])
+        self.assertIs(child.reachable_regions[2], parent.reachable_regions[2])
+
+        child.collect(Item("Shield", ItemClassification.progression, 2, 1), True)
+        parent.collect(Item("Bow", ItemClassification.progression, 3, 2), True)
+        self.assertTrue(child.has_all(("Sword", "Shield"), 1))
+        self.assertFalse(parent.has("Shield", 1))
+        self.assertFalse(child.has("Bow", 2))
+        self.assertTrue(parent.has("Bow", 2))
+
+        parent.remove_item("Sword", 1)
+        self.assertTrue(child.has("Sword", 1))
+        self.assertFalse(parent.has("Sword", 1))
+
+    def test_unchanged_players_are_shared(self) -> None:
+        """Test that a copy on write state only copies the data of players that changed"""
+        parent = CollectionState(self.multiworld)
+        child = parent.copy_on_write()
+        self.multiworld.get_region("Menu", 1).can_reach(child)
+        child.collect(Item("Sword", ItemClassification.progression, 1, 1), True)
+        self.assertIsNot(child.prog_items[1], parent.prog_items[1])
+        self.assertIsNot(child.reachable_regions[1], parent.reachable_regions[1])
+        self.assertIs(child.prog_items[2], parent.prog_items[2])
+        self.assertIs(child.blocked_connections[2], parent.blocked_connections[2])
+        self.assertEqual(child.shared_players, {2})
+        self.assertEqual(len(parent.reachable_regions[1]), 0)
+        self.assertEqual(len(child.reachable_regions[1]), 1)
+
+    def test_queries_keep_players_shared(self) -> None:
+        """Test that querying an unchanged player of a copy on write state does not copy the data of that player"""
+        parent = CollectionState(self.multiworld)
+        for player in (1, 2):
+            self.multiworld.get_region("Menu", player).can_reach(parent)
+        child = parent.copy_on_write()
+        child.collect(Item("Sword", ItemClassification.progression, 1, 1), True)
+        for player in (1, 2):
+            self.assertTrue(self.multiworld.get_region("Menu", player).can_reach(child))
+        self.assertEqual(child.shared_players, {2})
+        self.assertIs(child.reachable_regions[2], parent.reachable_regions[2])
+        self.assertIsNot(child.reachable_regions[1], parent.reachable_regions[1])
+
+    def test_copy_functions(self) -> None:
+        """Test that copy on write states run the copy functions of logic mixins"""
+        copied: list[tuple[CollectionState, CollectionState]] = []
+
+        def copy_mixin(state: CollectionState, new_state: CollectionState) -> CollectionState:
+            copied.append((state, new_state))
+            return new_state
+
+        CollectionState.additional_copy_functions.append(copy_mixin)
+        try:
+            parent = CollectionState(self.multiworld)
+            child = parent.copy_on_write()
+        finally:
+            CollectionState.additional_copy_functions.remove(copy_mixin)
+        self.assertEqual(copied, [(parent, child)])
@@ -117,6 +117,19 @@ class Base:
             self.assertEqual(self.store.get_for_player(1), {1: {13}, 2: {22, 23}})
             self.assertEqual(self.store.get_for_player(9999), {})
 
+        def test_find_item_matches_scan(self) -> None:
+            # find_item goes through a reverse index, compare it against scanning all locations
+            items = {item for locations in sample_data.values() for item, _, _ in locations.values()} | {1}
+            for slots in ({-1}, {0, 1}, {1}, {2}, {1, 2}, {3, 4, 5}, set(range(-2, 8))):
+                for item_id in items:
+                    expected = sorted((sender, location, item, receiver, flags)
+                                      for sender, locations in sample_data.items()
+                                      for location, (item, receiver, flags) in locations.items()
+                                      if receiver in slots and item == item_id)
+                    self.assertEqual(sorted(self.store.find_item(slots, item_id)), expected)
+            self.assertEqual(self.store.get_for_player(0), {})
+            self.assertEqual(self.store.get_for_player(-1), {})
+
         def test_get_checked(self) -> None:
             self.assertEqual(self.store.get_checked(full_state, 0, 1), [11, 12, 13])
             self.assertEqual(self.store.get_checked(one_state, 0, 1), [12])
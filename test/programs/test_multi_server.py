@@ -1,5 +1,18 @@
+import asyncio
+import json
+import logging
+import os
 import unittest
-from MultiServer import Context, ServerCommandProcessor
+import zlib
+from tempfile import TemporaryDirectory
+from typing import Any, Iterable
+from unittest.mock import patch
+
+from MultiServer import (Client, Context, SaveJournal, ServerCommandProcessor, add_received_items,
+                         encode_data_package_msg, flush_background_log, get_background_logger,
+                         get_shared_fuzzy_index, send_items_to, send_new_items)
+from Utils import get_intended_text, restricted_loads
+from NetUtils import Endpoint, GamesPackage, Hint, HintStatus, NetworkItem, encode
 
 
 class TestResolvePlayerName(unittest.TestCase):
@@ -38,3 +51,249 @@ class TestResolvePlayerName(unittest.TestCase):
         assert p.resolve_player("ABC") == (1, 2, "abc"), "case insensitive resolves when 1 match"
         assert p.resolve_player("abcd") == (1, 3, "abCD"), "case insensitive resolves when 1 match"
         assert not p.resolve_player("aB"), "partial name shouldn't resolve to player"
+
+
+class _RecordingSocket:
+    open = True
+
+    def __init__(self) -> None:
+        self.sent: list[list[dict[str, Any]]] = []
+
+    async def send(self, msg: str) -> None:
+        self.sent.append(json.loads(msg))
+
+
+def _record_broadcasts(ctx: Context) -> None:
+    """Make broadcasts go through _RecordingSocket.send, as websockets.broadcast needs real connections."""
+    async def broadcast_send_encoded_msgs(endpoints: Iterable[Endpoint], msg: str) -> bool:
+        for endpoint in endpoints:
+            await endpoint.socket.send(msg)
+        return True
+
+    ctx.broadcast_send_encoded_msgs = broadcast_send_encoded_msgs  # type: ignore[method-assign]
+
+
+class TestSendNewItems(unittest.TestCase):
+    def test_batched(self) -> None:
+        """Test that items sent in the same event loop iteration only reach their receivers, in one message each"""
+        ctx = Context("", 0, "", "", 0, 0, False)
+        sockets: dict[int, _RecordingSocket] = {}
+        for slot in (1, 2, 3):
+            socket = sockets[slot] = _RecordingSocket()
+            client = Client(socket, ctx)  # type: ignore[arg-type]
+            client.team = 0
+            client.slot = slot
+            client.remote_items = slot == 2
+            ctx.clients.setdefault(0, {})[slot] = [client]
+        _record_broadcasts(ctx)
+
+        async def check_locations() -> None:
+            send_items_to(ctx, 0, 1, NetworkItem(10, 100, 2, 0))
+            send_new_items(ctx)
+            send_items_to(ctx, 0, 1, NetworkItem(11, 101, 2, 0))
+            send_items_to(ctx, 0, 2, NetworkItem(12, 102, 2, 0))
+            send_new_items(ctx)
+            self.assertEqual([socket.sent for socket in sockets.values()], [[], [], []])
+            await asyncio.sleep(0.01)
+
+        asyncio.run(check_locations())
+        self.assertEqual(sockets[1].sent, [[{"cmd": "ReceivedItems", "index": 0, "items": [
+            {"item": 10, "location": 100, "player": 2, "flags": 0, "class": "NetworkItem"},
+            {"item": 11, "location": 101, "player": 2, "flags": 0, "class": "NetworkItem"},
+        ]}]])
+        self.assertEqual(sockets[2].sent, [[{"cmd": "ReceivedItems", "index": 0, "items": [
+            {"item": 12, "location": 102, "player": 2, "flags": 0, "class": "NetworkItem"},
+        ]}]])
+        self.assertEqual(sockets[3].sent, [])
+        self.assertEqual(ctx.changed_received_items, set())
+
+    def test_coalesced(self) -> None:
+        """
+        Test that messages queued in the same event loop iteration are merged into as few frames as possible,
+        in the order they were queued, including those broadcast to all teams or to single clients
+        """
+        ctx = Context("", 0, "", "", 0, 0, False)
+        sockets: dict[int, _RecordingSocket] = {}
+        clients: dict[int, Client] = {}
+        for slot in (1, 2, 3):
+            socket = sockets[slot] = _RecordingSocket()
+            client = clients[slot] = Client(socket, ctx)  # type: ignore[arg-type]
+            client.team = 0
+            client.slot = slot
+            client.no_text = slot == 3
+            ctx.clients.setdefault(0, {})[slot] = [client]
+        _record_broadcasts(ctx)
+        text = {"cmd": "PrintJSON", "data": [{"text": "Text"}]}
+        set_reply = {"cmd": "SetReply", "key": "key", "value": 1}
+
+        async def queue() -> None:
+            ctx.broadcast_team(0, [text, text])
+            ctx.queue_msgs(0, [{"cmd": "RoomUpdate", "hint_points": 1}], 1)
+            send_items_to(ctx, 0, 1, NetworkItem(10, 100, 2, 0))
+            send_new_items(ctx)
+            ctx.broadcast_team(0, [text])
+            ctx.queue_msgs(0, [{"cmd": "RoomUpdate", "hint_points": 2}], 3)
+            ctx.broadcast_text_all("Text")
+            ctx.broadcast([clients[1]], [set_reply])
+            await asyncio.sleep(0.01)
+
+        with patch.object(Context, "max_msgs_per_frame", 2):
+            asyncio.run(queue())
+        self.assertEqual([[msg["cmd"] for msg in frame] for frame in sockets[1].sent],
+                         [["PrintJSON", "PrintJSON"], ["RoomUpdate", "ReceivedItems"], ["PrintJSON", "PrintJSON"],
+                          ["SetReply"]])
+        self.assertEqual(sockets[2].sent, [[text, text], [text, text]])
+        self.assertEqual(sockets[3].sent, [[{"cmd": "RoomUpdate", "hint_points": 2}]])
+
+
+
+class TestRecheckHints(unittest.TestCase):
+    def test_recheck_location_hints(self) -> None:
+        """Test that checking a location updates the hints for it held by every slot and no other hints"""
+        ctx = Context("", 0, "", "", 0, 0, False)
+        hint = Hint(2, 1, 100, 10, False)
+        other_hint = Hint(1, 1, 101, 11, False)
+        for slot in (1, 2):
+            ctx.add_hint(0, slot, hint)
+        ctx.add_hint(0, 1, other_hint)
+
+        ctx.location_checks[0, 1] = {100, 101}
+        changed: set[tuple[int, int]] = set()
+        ctx.recheck_location_hints(0, 1, [100], changed)
+        found_hint = hint._replace(found=True, status=HintStatus.HINT_FOUND)
+        self.assertEqual(changed, {(0, 1), (0, 2)})
+        self.assertEqual(ctx.hints[0, 1], {found_hint, other_hint})
+        self.assertEqual(ctx.hints[0, 2], {found_hint})
+        self.assertEqual(ctx.get_hint(0, 1, 100), found_hint)
+        self.assertEqual(ctx.location_hints[0, 1, 100], {(1, found_hint), (2, found_hint)})
+
+        changed.clear()
+        ctx.recheck_location_hints(0, 1, [100, 102], changed)
+        self.assertEqual(changed, set())
+
+
+class TestSaveJournal(unittest.TestCase):
+    def test_journal(self) -> None:
+        """Test that a snapshot with the journal appended to it restores the changes made after the snapshot"""
+        ctx = Context("", 0, "", "", 0, 0, False)
+        ctx.save_journal = SaveJournal()
+        ctx.saving = True
+        ctx.name_aliases[0, 2] = "Alias"
+        add_received_items(ctx, 0, 1, True, NetworkItem(10, 100, 2, 0))
+        with TemporaryDirectory() as directory:
+            ctx.save_filename = os.path.join(directory, "test.apsave")
+            self.assertTrue(ctx.save(now=True))
+            self.assertFalse(os.path.exists(ctx.save_filename + ".journal"))
+
+            add_received_items(ctx, 0, 1, True, NetworkItem(11, 101, 2, 0), NetworkItem(12, 102, 2, 0))
+            ctx.location_checks[0, 2] |= {101, 102}
+            ctx.save_journal.update("location_checks", (0, 2), {101, 102})
+            ctx.add_hint(0, 1, Hint(1, 2, 103, 13, False))
+            ctx.stored_data["key"] = [1, 2]
+            ctx.journal_change("stored_data", "key")
+            del ctx.name_aliases[0, 2]
+            ctx.journal_change("name_aliases", (0, 2))
+            ctx.random.random()
+            ctx.save_journal.snapshot_size = 1 << 20  # don't compact into a snapshot yet
+            self.assertTrue(ctx.save(now=True))
+
+            with open(ctx.save_filename, "rb") as f:
+                savedata = restricted_loads(zlib.decompress(f.read()))
+            frames = SaveJournal.read_frames(ctx.save_filename + ".journal")
+            self.assertEqual(len(frames), 1)
+            _, entries = restricted_loads(zlib.decompress(frames[0]))
+            # only whole fields that changed since the snapshot are journaled again
+            self.assertEqual([entry[1] for entry in entries if entry[0] == "field"], ["random_state"])
+            SaveJournal.apply(savedata, frames)
+            self.assertEqual(savedata, ctx.get_save() | {"journal_generation": 1})
+
+            # frames of an older snapshot are ignored
+            savedata["journal_generation"] = 2
+            savedata["stored_data"] = {}
+            SaveJournal.apply(savedata, frames)
+            self.assertEqual(savedata["stored_data"], {})
+
+
+class TestDataPackageMsg(unittest.TestCase):
+    def test_encode_data_package_msg(self) -> None:
+        """Test that the DataPackage message put together from cached games matches encoding it as a whole"""
+        games = {
+            "Game \"A\"": {"item_name_to_id": {"Item \N{BOW AND ARROW}": 1}, "location_name_to_id": {}, "checksum": "a"},
+            "Game B": {"item_name_to_id": {}, "location_name_to_id": {"Location": 2}},
+        }
+        for selected in ({}, games, {"Game B": games["Game B"]}):
+            expected = json.loads(encode([{"cmd": "DataPackage", "data": {"games": selected}}]))
+            self.assertEqual(json.loads(encode_data_package_msg(selected)), expected)
+            self.assertEqual(json.loads(encode_data_package_msg(selected)), expected)
+
+
+class TestFuzzyIndex(unittest.TestCase):
+    def test_shared(self) -> None:
+        """Test that rooms share the fuzzy index of a data package while they use it"""
+        import gc
+
+        package: GamesPackage = {"item_name_to_id": {"Sword": 1, "Shield": 2}, "location_name_to_id": {},
+                                 "checksum": "abc"}
+
+        def make_context() -> Context:
+            ctx = Context("", 0, "", "", 0, 0, False)
+            ctx.gamespackage["Test Game"] = package
+            ctx.checksums["Test Game"] = "abc"
+            return ctx
+
+        contexts = [make_context() for _ in range(2)]
+        index = contexts[0].get_fuzzy_index("Test Game", "item_names")
+        self.assertIs(contexts[1].get_fuzzy_index("Test Game", "item_names"), index)
+        self.assertIs(get_shared_fuzzy_index("Test Game", "abc", "item_names"), index)
+        self.assertEqual(get_intended_text("sord", index)[0], "Sword")
+
+        del contexts, index
+        gc.collect()
+        self.assertIsNone(get_shared_fuzzy_index("Test Game", "abc", "item_names"))
+
+
+class TestBounceTargets(unittest.TestCase):
+    def test_bounce_targets(self) -> None:
+        """Test that Bounce targets are found by game, tag and slot, within the team, until they disconnect"""
+        ctx = Context("", 0, "", "", 0, 0, False)
+        ctx.games = {1: "Game A", 2: "Game B", 3: "Game A"}
+        clients: dict[tuple[int, int], Client] = {}
+        for team, slot, tags in ((0, 1, ["DeathLink"]), (0, 2, []), (0, 3, ["DeathLink", "Tracker"]), (1, 1, [])):
+            client = clients[team, slot] = Client(_RecordingSocket(), ctx)  # type: ignore[arg-type]
+            client.team = team
+            client.slot = slot
+            client.tags = tags
+            ctx.clients.setdefault(team, {})[slot] = [client]
+            ctx.add_bounce_targets(client)
+
+        self.assertEqual(ctx.get_bounce_targets(0, {"Game A"}, set(), set()), {clients[0, 1], clients[0, 3]})
+        self.assertEqual(ctx.get_bounce_targets(0, set(), {"DeathLink"}, {2}), set(clients.values()) - {clients[1, 1]})
+        self.assertEqual(ctx.get_bounce_targets(1, {"Game A"}, {"DeathLink"}, set()), {clients[1, 1]})
+        self.assertEqual(ctx.get_bounce_targets(0, {"Game C"}, {"Tag"}, {4}), set())
+
+        ctx.remove_bounce_targets(clients[0, 3])
+        clients[0, 3].tags = ["Tracker"]
+        ctx.add_bounce_targets(clients[0, 3])
+        self.assertEqual(ctx.get_bounce_targets(0, set(), {"DeathLink"}, set()), {clients[0, 1]})
+
+        asyncio.run(ctx.disconnect(clients[0, 1]))
+        self.assertEqual(ctx.get_bounce_targets(0, {"Game A"}, {"DeathLink"}, set()), {clients[0, 3]})
+        self.assertNotIn((0, "DeathLink"), ctx.tag_clients)
+
+
+class TestBackgroundLog(unittest.TestCase):
+    def test_flush(self) -> None:
+        """Test that flushing hands every record logged in the background to the handlers before returning"""
+        logger = logging.Logger("TestBackgroundLog")
+        records: list[str] = []
+        handler = logging.Handler()
+        handler.emit = lambda record: records.append(record.getMessage())  # type: ignore[method-assign]
+        logger.addHandler(handler)
+        background_logger = get_background_logger(logger)
+        for index in range(100):
+            background_logger.info("Record %d", index)
+        flush_background_log()
+        self.assertEqual(records, [f"Record {index}" for index in range(100)])
+        background_logger.info("Record after flush")  # still handled after the listener was restarted
+        flush_background_log()
+        self.assertEqual(records[-1], "Record after flush")
@@ -0,0 +1,60 @@
+# Tests for fuzzy name matching in Utils.py
+
+import random
+import string
+import unittest
+
+from Utils import FuzzyIndex, get_fuzzy_results
+
+
+def get_sorted_results(input_word: str, word_list: list[str], limit: int | None = None) -> list[tuple[str, int]]:
+    """Score and sort every word, the way get_fuzzy_results did before FuzzyIndex"""
+    import jellyfish
+
+    def get_fuzzy_ratio(word1: str, word2: str) -> float:
+        if word1 == word2:
+            return 1.01
+        return (1 - jellyfish.damerau_levenshtein_distance(word1.lower(), word2.lower())
+                / max(len(word1), len(word2)))
+
+    results = sorted(((word, get_fuzzy_ratio(input_word, word)) for word in word_list),
+                     key=lambda result: result[1], reverse=True)
+    return [(word, int(ratio * 100)) for word, ratio in results[:limit or len(word_list)]]
+
+
+class TestFuzzyIndex(unittest.TestCase):
+    words = ["Progressive Sword", "progressive sword", "Progressive Shield", "Bow", "Arrows (10)", "Bombs (3)",
+             "Boss Key (Eastern Palace)", "Small Key (Eastern Palace)", "Heart Container", "Piece of Heart", "",
+             "\N{LATIN CAPITAL LETTER I WITH DOT ABOVE}stanbul Ticket", "Bow", "Blue Boomerang", "Red Boomerang"]
+
+    def test_same_results(self) -> None:
+        """Test that the index scores and orders words like sorting all of them does"""
+        index = FuzzyIndex(self.words)
+        for input_word in ("Progressive Sword", "PROGRESSIVE SWORD", "sword", "bow", "Bow", "boomerang", "",
+                           "key eastern palace", "istanbul ticket", "heart", "zzz"):
+            for limit in (None, 1, 2, 5, 100):
+                with self.subTest(input_word=input_word, limit=limit):
+                    self.assertEqual(index.get_results(input_word, limit),
+                                     get_sorted_results(input_word, self.words, limit))
+                    self.assertEqual(get_fuzzy_results(input_word, self.words, limit),
+                                     get_sorted_results(input_word, self.words, limit))
+
+    def test_random_words(self) -> None:
+        """Test that the index matches sorting all words for many random words of similar lengths"""
+        rng = random.Random(0)
+        alphabet = string.ascii_letters + " ()'-"
+        words = ["".join(rng.choices(alphabet, k=rng.randint(3, 12))) for _ in range(2000)]
+        index = FuzzyIndex(words)
+        for _ in range(50):
+            input_word = rng.choice(words)[:rng.randint(1, 12)] + "".join(rng.choices(alphabet, k=rng.randint(0, 3)))
+            with self.subTest(input_word=input_word):
+                self.assertEqual(index.get_results(input_word, 2), get_sorted_results(input_word, words, 2))
+
+    def test_collection(self) -> None:
+        """Test that the index can stand in for the words it was built from"""
+        index = FuzzyIndex(self.words)
+        self.assertEqual(len(index), len(self.words))
+        self.assertEqual(list(index), self.words)
+        self.assertIn("Bow", index)
+        self.assertNotIn("bow", index)
+        self.assertEqual(FuzzyIndex([]).get_results("Bow"), [])
@@ -0,0 +1,164 @@
+import asyncio
+import logging
+import pickle
+import unittest
+from pathlib import Path
+from uuid import UUID, uuid4
+
+from WebHostLib.autolauncher import MultiworldInstance, get_least_loaded_hoster, get_room_moves
+from . import TestBase
+
+
+class TestRoomPlacement(unittest.TestCase):
+    config = {"PONY": {}, "SELFLAUNCHCERT": None, "SELFLAUNCHKEY": None, "HOST_ADDRESS": ""}
+
+    def setUp(self) -> None:
+        self.hosters = [MultiworldInstance(self.config, x) for x in range(3)]
+
+    def add_room(self, hoster: MultiworldInstance, cpu: float, clients: int = 0):
+        room_id = uuid4()
+        hoster.room_ids.add(room_id)
+        hoster.room_load[room_id] = {"cpu": cpu, "msg_rate": 0.0, "clients": clients}
+        return room_id
+
+    def test_least_loaded(self) -> None:
+        """Test that new rooms go to the host process with the least busy rooms, avoiding lagging event loops"""
+        busy, quiet, lagging = self.hosters
+        self.add_room(busy, 0.5, 10)
+        self.add_room(quiet, 0.05, 2)
+        self.add_room(quiet, 0.05, 2)
+        lagging.loop_lag = 0.3
+        self.assertIs(get_least_loaded_hoster(self.hosters), quiet)
+
+        quiet.room_ids.update(uuid4() for _ in range(100))  # started, but not reported yet
+        self.assertIs(get_least_loaded_hoster(self.hosters), busy)
+
+        for hoster in self.hosters:
+            hoster.loop_lag = 0.3
+        self.assertIs(get_least_loaded_hoster(self.hosters), lagging)
+
+    def test_room_moves(self) -> None:
+        """Test that only idle rooms are moved, and only off host processes with a lagging event loop"""
+        hot, cold, _ = self.hosters
+        self.add_room(hot, 0.9, 20)
+        idle_room = self.add_room(hot, 0.0)
+        self.add_room(cold, 0.0)
+        self.assertEqual(get_room_moves(self.hosters), [])
+
+        hot.loop_lag = 0.5
+        self.add_room(cold, 0.2, 4)
+        self.assertEqual(get_room_moves(self.hosters), [(idle_room, hot, self.hosters[2])])
+
+        for hoster in self.hosters[1:]:
+            hoster.loop_lag = 0.5
+        self.assertEqual(get_room_moves(self.hosters), [])
+
+
+class TestRoomStartData(TestBase):
+    room_ids: list[UUID]
+    rooms = 100
+
+    def setUp(self) -> None:
+        from pony.orm import db_session
+        from WebHostLib.models import Room, SaveDelta, Seed
+
+        super().setUp()
+        with (Path(__file__).parent / "data" / "One_Archipelago.archipelago").open("rb") as f:
+            self.multidata = f.read()
+        with db_session:
+            self.owner = uuid4()
+            seed = Seed(multidata=self.multidata, owner=self.owner)
+            self.room_ids = []
+            for x in range(self.rooms):
+                room = Room(seed=seed, owner=self.owner, tracker=uuid4(), last_port=50000 + x, timeout=x)
+                if x % 2:
+                    room.multisave = pickle.dumps({"room": x})
+                    for frame in range(x % 4):
+                        SaveDelta(room=room, data=bytes([x, frame]))
+                self.room_ids.append(room.id)
+
+    def tearDown(self) -> None:
+        from pony.orm import db_session, select
+        from WebHostLib.models import Room, SaveDelta, Seed
+
+        with db_session:
+            select(save_delta for save_delta in SaveDelta if save_delta.room.owner == self.owner).delete(bulk=True)
+            select(room for room in Room if room.owner == self.owner).delete(bulk=True)
+            select(seed for seed in Seed if seed.owner == self.owner).delete(bulk=True)
+
+    def test_start_data(self) -> None:
+        """Test that the start data of any number of rooms is read in two queries"""
+        from WebHostLib.customserver import get_room_start_data
+        from WebHostLib.models import db
+
+        db.merge_local_stats()  # reset the query counter of this thread
+        start_data = get_room_start_data(self.room_ids + [uuid4()])
+        self.assertEqual(db.local_stats[None].db_count, 2)
+        self.assertEqual(start_data.keys(), set(self.room_ids))  # unknown rooms are left out
+        for x, room_id in enumerate(self.room_ids):
+            multisave = pickle.dumps({"room": x}) if x % 2 else None
+            save_deltas = [bytes([x, frame]) for frame in range(x % 4)] if x % 2 else []
+            self.assertEqual(start_data[room_id], (room_id, 50000 + x, x, self.multidata, multisave, save_deltas))
+
+    def test_start_queries(self) -> None:
+        """Test that starting rooms doesn't query the database per room, besides the room's own saving"""
+        from WebHostLib.customserver import (WebHostContext, get_room_start_data, get_static_server_data,
+                                             load_static_server_data)
+        from WebHostLib.models import db
+
+        static_server_data = load_static_server_data(get_static_server_data())
+        room_ids = self.room_ids[:20:2]  # rooms without a save
+
+        async def load_rooms() -> None:
+            start_data = get_room_start_data(room_ids)
+            for room_id in room_ids:
+                ctx = WebHostContext(static_server_data, logging.getLogger("TestRoom"))
+                ctx.load(start_data.pop(room_id))
+                ctx.init_save()
+                ctx.exit_event.set()
+
+        db.merge_local_stats()  # reset the query counter of this thread
+        asyncio.run(load_rooms())
+        self.assertEqual(db.local_stats[None].db_count, 2)
+
+    def test_load_room(self) -> None:
+        """Test that a room loads its multidata and save with a fixed number of queries"""
+        from pony.orm import db_session
+        from WebHostLib.customserver import (WebHostContext, get_room_start_data, get_static_server_data,
+                                             load_static_server_data)
+        from WebHostLib.models import Room, db
+
+        static_server_data = load_static_server_data(get_static_server_data())
+
+        async def load_room(room_id: UUID) -> WebHostContext:
+            ctx = WebHostContext(static_server_data, logging.getLogger("TestRoom"))
+            ctx.load(get_room_start_data([room_id])[room_id])
+            ctx.init_save()
+            ctx.exit_event.set()
+            return ctx
+
+        ctx = asyncio.run(load_room(self.room_ids[0]))
+        self.assertEqual(ctx.port, 50000)
+        ctx.location_checks[0, 1].add(1)
+        with db_session:
+            Room.get(id=self.room_ids[0]).multisave = pickle.dumps(ctx.get_save_snapshot())
+
+        db.merge_local_stats()  # reset the query counter of this thread
+        ctx = asyncio.run(load_room(self.room_ids[0]))
+        self.assertLessEqual(db.local_stats[None].db_count, 2)  # start data with multidata and save, save deltas
+        self.assertEqual(ctx.location_checks[0, 1], {1})
+
+    def test_load_save_deltas(self) -> None:
+        """Test that the save deltas of a room are read in the order they were written"""
+        from WebHostLib.customserver import WebHostContext, get_room_start_data
+
+        async def load_room(room_id: UUID) -> WebHostContext:
+            ctx = WebHostContext({"gamespackage": {}, "item_name_groups": {}, "location_name_groups": {},
+                                  "non_hintable_names": {}}, logging.getLogger("TestRoom"))
+            ctx.load(get_room_start_data([room_id])[room_id])
+            return ctx
+
+        room_id = self.room_ids[3]
+        multisave, save_deltas = asyncio.run(load_room(room_id)).room_save
+        self.assertEqual(multisave, pickle.dumps({"room": 3}))
+        self.assertEqual(save_deltas, [bytes([3, 0]), bytes([3, 1]), bytes([3, 2])])
@@ -0,0 +1,94 @@
+import asyncio
+from concurrent.futures import Future, ThreadPoolExecutor
+from uuid import UUID, uuid4
+
+from WebHostLib.customserver import DBCommandDispatcher
+from . import TestBase
+
+
+class _InlineExecutor(ThreadPoolExecutor):
+    """Runs functions in the calling thread, which holds the connection to the in-memory database."""
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        future: Future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+        return future
+
+
+class TestDBCommandDispatcher(TestBase):
+    room_ids: list[UUID]
+    rooms = 100
+
+    def setUp(self) -> None:
+        from pony.orm import db_session
+        from WebHostLib.models import Room, Seed
+
+        super().setUp()
+        with db_session:
+            owner = uuid4()
+            seed = Seed(multidata=b"", owner=owner)
+            self.room_ids = [Room(seed=seed, owner=owner, tracker=uuid4()).id for _ in range(self.rooms)]
+
+    def tearDown(self) -> None:
+        from pony.orm import db_session, select
+        from WebHostLib.models import Command, Room
+
+        with db_session:
+            select(command for command in Command).delete(bulk=True)
+            seed = Room.get(id=self.room_ids[0]).seed
+            select(room for room in Room if room.seed == seed).delete(bulk=True)
+            seed.delete()
+
+    def add_commands(self, *commands: tuple[UUID, str]) -> None:
+        from pony.orm import db_session
+        from WebHostLib.models import Command, Room
+
+        with db_session:
+            for room_id, commandtext in commands:
+                Command(room=Room.get(id=room_id), commandtext=commandtext)
+
+    def test_dispatch(self) -> None:
+        """Test that commands are run in the room they are for, and left for rooms of other host processes"""
+        from pony.orm import db_session, select
+        from WebHostLib.models import Command
+
+        hosted, other = self.room_ids[:2], self.room_ids[2]
+        received: list[tuple[UUID, str]] = []
+        dispatcher = DBCommandDispatcher()
+        dispatcher.interval = 0
+        for room_id in hosted:
+            dispatcher.processors[room_id] = lambda text, room_id=room_id: received.append((room_id, text))
+        self.add_commands((hosted[1], "/first"), (other, "/other"), (hosted[0], "/second"), (hosted[1], "/third"))
+
+        async def dispatch() -> None:
+            asyncio.get_running_loop().set_default_executor(_InlineExecutor())
+            task = asyncio.create_task(dispatcher.run())
+            while len(received) < 3:
+                await asyncio.sleep(0.01)
+            task.cancel()
+
+        asyncio.run(asyncio.wait_for(dispatch(), 10))
+        self.assertEqual(received, [(hosted[1], "/first"), (hosted[0], "/second"), (hosted[1], "/third")])
+        with db_session:
+            self.assertEqual([command.room.id for command in select(command for command in Command)], [other])
+
+    def test_queries_per_minute(self) -> None:
+        """Test that a host process queries the database once per poll, no matter how many rooms it hosts"""
+        from WebHostLib.models import db
+
+        room_ids = frozenset(self.room_ids)
+        polls_per_minute = int(60 / DBCommandDispatcher.interval)
+        db.merge_local_stats()  # reset the query counter of this thread
+        for _ in range(polls_per_minute):
+            self.assertEqual(DBCommandDispatcher.fetch_commands(room_ids), [])
+        queries = db.local_stats[None].db_count
+        self.assertLessEqual(queries, polls_per_minute)
+        # each room used to poll for its own commands every 5 seconds
+        self.assertLess(queries, self.rooms * 60 // 5)
+
+        self.add_commands(*((room_id, "/help") for room_id in self.room_ids))
+        db.merge_local_stats()
+        self.assertEqual(len(DBCommandDispatcher.fetch_commands(room_ids)), self.rooms)
+        self.assertLessEqual(db.local_stats[None].db_count, 3)
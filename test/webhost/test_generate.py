@@ -25,6 +25,34 @@ class TestGenerate(TestBase):
                             "/wait/" in response.request.path,
                             f"Response did not properly redirect ({response.request.path})")
 
+    def test_generated_multidata(self) -> None:
+        """
+        Verify that multidata generated in this process is stored apart from its data packages,
+        without modifying the data package of this process.
+        """
+        from pathlib import Path
+        from uuid import uuid4
+        from pony.orm import db_session
+        from MultiServer import Context
+        from WebHostLib.models import GameDataPackage
+        from WebHostLib.upload import upload_files_to_db
+        from worlds import network_data_package
+
+        with (Path(__file__).parent / "data" / "One_Archipelago.archipelago").open("rb") as f:
+            multidata = Context.decompress(f.read())
+        data_package = network_data_package["games"]["Archipelago"]
+        multidata["datapackage"] = {"Archipelago": data_package}
+        spoiler = ("AP_00000000000000000000_Spoiler.txt", lambda: b"Spoiler")
+        with db_session:
+            seed = upload_files_to_db([spoiler], uuid4(), decompressed_multidata=multidata)
+            self.assertEqual(seed.spoiler, "Spoiler")
+            self.assertEqual(Context.decompress(seed.multidata)["datapackage"],
+                             {"Archipelago": {"checksum": data_package["checksum"], "version": 0}})
+            self.assertIsNotNone(GameDataPackage.get(checksum=data_package["checksum"]))
+            self.assertEqual(len(seed.slots), 1)
+        self.assertIs(network_data_package["games"]["Archipelago"], data_package)
+        self.assertIn("checksum", data_package)
+
     def test_empty_zip(self) -> None:
         """
         Verify that posting an empty zip will give an error.
@@ -0,0 +1,81 @@
+import multiprocessing
+import os
+import sys
+import tempfile
+import unittest
+
+
+def run_generations(db_file: str, results: multiprocessing.Queue) -> None:
+    """
+    Run a generation for each set of limits, reporting how each ended.
+    Runs in a process of its own, as the generator processes need a database file, while the tests use memory.
+    """
+    import json
+    import time
+    from uuid import uuid4
+    from pony.orm import db_session
+    from Utils import restricted_dumps
+    from WebHostLib.autolauncher import GeneratorJobs
+    from WebHostLib.check import roll_options
+    from WebHostLib.models import Generation, Seed, db
+
+    config = {
+        "PONY": {"provider": "sqlite", "filename": db_file, "create_db": True},
+        "GENERATORS": 1,
+        "JOB_TIME": 120,
+        "GENERATOR_MEMORY_LIMIT": -1,
+        "GENERATOR_RSS_LIMIT": None,
+    }
+    db.bind(**config["PONY"])
+    db.generate_mapping(create_tables=True)
+    _, gen_options = roll_options({"test.yaml": "name: Player1\ngame: Archipelago\nArchipelago: {}\n"}, set())
+    options = restricted_dumps({name: vars(options) for name, options in gen_options.items()})
+
+    for limits in ({}, {"GENERATOR_RSS_LIMIT": 1}, {"JOB_TIME": 0}):
+        with db_session:
+            generation_id = Generation(options=options, owner=uuid4()).id
+        generator_jobs = GeneratorJobs(config | limits)
+        generator_jobs.update()
+        job = generator_jobs.running[generation_id]
+        while generator_jobs.running:
+            time.sleep(0.1)
+            generator_jobs.update()
+        generator_jobs.stop()
+        with db_session:
+            generation = Generation.get(id=generation_id)
+            results.put({
+                "seed": Seed.exists(id=generation_id),
+                "meta": json.loads(generation.meta) if generation else None,
+                "progress": job.progress,
+                "stats": job.stats,
+            })
+
+
+@unittest.skipIf(sys.platform == "win32", "peak RSS can't be measured on Windows")
+class TestGeneratorJobs(unittest.TestCase):
+    def test_limits(self) -> None:
+        """Test that generations report their progress and resource use, and get killed once exceeding a limit"""
+        context = multiprocessing.get_context("spawn")
+        with tempfile.TemporaryDirectory() as tempdir:
+            results = context.Queue()
+            process = context.Process(target=run_generations, args=(os.path.join(tempdir, "ap.db3"), results))
+            process.start()
+            try:
+                generated, out_of_memory, out_of_time = (results.get(timeout=120) for _ in range(3))
+            finally:
+                process.join(10)
+                process.kill()
+
+        self.assertTrue(generated["seed"])
+        self.assertIsNone(generated["meta"])  # done with
+        self.assertIn("stage", generated["progress"])
+        self.assertGreater(generated["stats"]["cpu"], 0)
+        self.assertGreater(generated["stats"]["peak_rss"], 0)
+
+        self.assertFalse(out_of_memory["seed"])
+        self.assertIn("Allowed memory for Generation exceeded", out_of_memory["meta"]["error"])
+        self.assertGreater(out_of_memory["meta"]["stats"]["peak_rss"], 1)
+        self.assertIn("stage", out_of_memory["meta"]["progress"])
+
+        self.assertFalse(out_of_time["seed"])
+        self.assertIn("Allowed time for Generation exceeded", out_of_time["meta"]["error"])
@@ -0,0 +1,63 @@
+import json
+import os
+import unittest
+from tempfile import TemporaryDirectory
+
+from NetUtils import encode
+from WebHostLib.sharedpackage import SharedDataPackage, write_shared_data_package
+
+
+class TestSharedDataPackage(unittest.TestCase):
+    games = {
+        "Test Game": {
+            "item_name_to_id": {"Sword": 3, "Shield": 1, "Bow \N{BOW AND ARROW}": 2},
+            "location_name_to_id": {"Chest": 10, "Boss": 11},
+            "item_name_groups": {"Weapons": ["Sword", "Bow \N{BOW AND ARROW}"], "Everything": ["Sword", "Shield"]},
+            "location_name_groups": {},
+            "checksum": "abc",
+        },
+        "Empty Game": {
+            "item_name_to_id": {},
+            "location_name_to_id": {},
+            "checksum": "def",
+        },
+    }
+
+    def test_shared_data_package(self) -> None:
+        """Test that the memory mapped data package matches the data package it was written from"""
+        with TemporaryDirectory() as directory:
+            path = write_shared_data_package(self.games, directory)
+            data_package = SharedDataPackage(path)
+            for game, package in self.games.items():
+                with self.subTest(game=game):
+                    shared_package = data_package.games[game]
+                    self.assertEqual(dict(shared_package["item_name_to_id"]), package["item_name_to_id"])
+                    self.assertEqual(dict(shared_package["location_name_to_id"].items()),
+                                     package["location_name_to_id"])
+                    self.assertEqual(shared_package["checksum"], package["checksum"])
+                    self.assertNotIn("item_name_groups", shared_package)
+                    self.assertEqual(json.loads(encode(shared_package)),
+                                     {key: value for key, value in package.items() if not key.endswith("groups")})
+
+            item_name_to_id = data_package.games["Test Game"]["item_name_to_id"]
+            self.assertEqual(item_name_to_id["Bow \N{BOW AND ARROW}"], 2)
+            self.assertNotIn("Arrow", item_name_to_id)
+            self.assertNotIn("Zzz", item_name_to_id)
+            with self.assertRaises(KeyError):
+                item_name_to_id["Arrow"]
+
+            item_name_groups = data_package.item_name_groups["Test Game"]
+            self.assertEqual(set(item_name_groups), {"Weapons", "Everything"})
+            self.assertEqual(item_name_groups["Weapons"], {"Sword", "Bow \N{BOW AND ARROW}"})
+            self.assertEqual(item_name_groups["Everything"], {"Sword", "Shield"})
+            self.assertNotIn("Armor", item_name_groups)
+            self.assertEqual(len(data_package.location_name_groups["Empty Game"]), 0)
+
+    def test_reuse(self) -> None:
+        """Test that the file is named by the checksums, so the same data package is only written once"""
+        with TemporaryDirectory() as directory:
+            path = write_shared_data_package(self.games, directory)
+            self.assertEqual(write_shared_data_package(self.games, directory), path)
+            changed = {**self.games, "Empty Game": {**self.games["Empty Game"], "checksum": "ghi"}}
+            self.assertNotEqual(write_shared_data_package(changed, directory), path)
+            self.assertEqual(len(os.listdir(directory)), 2)
@@ -0,0 +1,95 @@
+from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta
+from uuid import uuid4
+
+from . import TestBase
+
+
+def get_room_data(known_games: set[str]) -> tuple[Counter[str], defaultdict[date, dict[str, int]]]:
+    """Count the slots of every room, the way get_db_data did before the rollup"""
+    from pony.orm import select
+    from Utils import utcnow
+    from WebHostLib.models import Room
+
+    games_played: defaultdict[date, dict[str, int]] = defaultdict(Counter)
+    total_games: Counter[str] = Counter()
+    cutoff = utcnow().date() - timedelta(days=30)
+    for room in select(room for room in Room if room.creation_time >= cutoff):
+        for slot in room.seed.slots:
+            current_game = slot.game if slot.game in known_games else "Other"
+            total_games[current_game] += 1
+            games_played[room.creation_time.date()][current_game] += 1
+    return total_games, games_played
+
+
+class TestStats(TestBase):
+    known_games = {"Archipelago", "A Link to the Past", "Clique"}
+
+    def setUp(self) -> None:
+        from pony.orm import db_session
+        from Utils import utcnow
+        from WebHostLib.models import Room, Seed, Slot
+
+        super().setUp()
+        now = utcnow()
+        self.owner = owner = uuid4()
+        with db_session:
+            for days_ago, games, rooms in ((0, ["Archipelago", "Clique"], 1),
+                                           (1, ["Clique", "Clique", "Unknown Game"], 2),
+                                           (1, ["A Link to the Past"], 1),
+                                           (5, ["Archipelago", "Other"], 1),
+                                           (30, ["Clique"], 1),
+                                           (31, ["Clique"], 1),
+                                           (60, ["Archipelago"], 3)):
+                slots = [Slot(player_id=player, player_name=f"Player{player}", game=game)
+                         for player, game in enumerate(games, 1)]
+                seed = Seed(multidata=b"", owner=owner, slots=slots)
+                for room in range(rooms):
+                    creation_time = datetime.combine(now.date() - timedelta(days=days_ago), datetime.min.time())
+                    Room(seed=seed, owner=owner, creation_time=creation_time + timedelta(hours=room * 10))
+
+    def tearDown(self) -> None:
+        from pony.orm import db_session, select
+        from WebHostLib.models import GamesPlayed, Room, Seed, Slot
+
+        with db_session:
+            select(entry for entry in GamesPlayed).delete(bulk=True)
+            select(room for room in Room if room.owner == self.owner).delete(bulk=True)
+            select(slot for slot in Slot if slot.seed.owner == self.owner).delete(bulk=True)
+            select(seed for seed in Seed if seed.owner == self.owner).delete(bulk=True)
+
+    def test_rollup(self) -> None:
+        """Test that the stats page counts the same games per day from the rollup as from the rooms"""
+        from pony.orm import db_session
+        from WebHostLib.stats import get_db_data, update_games_played
+
+        update_games_played()
+        with db_session:
+            expected = get_room_data(self.known_games)
+            self.assertEqual(get_db_data(self.known_games), expected)
+        self.assertEqual(expected[0], Counter({"Clique": 6, "Other": 3, "Archipelago": 2, "A Link to the Past": 1}))
+
+        update_games_played()  # already rolled up days are kept as they are
+        with db_session:
+            self.assertEqual(get_db_data(self.known_games), expected)
+
+    def test_without_rollup(self) -> None:
+        """Test that days that aren't rolled up yet are counted from their rooms"""
+        from pony.orm import db_session
+        from WebHostLib.stats import get_db_data
+
+        with db_session:
+            self.assertEqual(get_db_data(self.known_games), get_room_data(self.known_games))
+
+    def test_queries(self) -> None:
+        """Test that the stats page queries the database a fixed number of times, no matter how many rooms there are"""
+        from pony.orm import db_session
+        from WebHostLib.models import db
+        from WebHostLib.stats import get_db_data, update_games_played
+
+        update_games_played()
+        with db_session:
+            db.merge_local_stats()  # reset the query counter of this thread
+            get_db_data(self.known_games)
+            # the rollup, then the days without entries: today and the days without rooms
+            self.assertEqual(db.local_stats[None].db_count, 2)
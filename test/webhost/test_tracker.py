@@ -1,5 +1,8 @@
+import asyncio
+import logging
 import os
 import pickle
+import unittest
 from pathlib import Path
 from typing import ClassVar
 from uuid import UUID, uuid4
@@ -103,3 +106,106 @@ class TestTracker(TestBase):
                 self.assertEqual(response.status_code, 200)
             with self.client.open(url_for("api.tracker_slot_data", tracker=self.tracker_uuid)) as response:
                 self.assertEqual(response.status_code, 200)
+
+    def test_static_data_shared(self) -> None:
+        """Verify that tracker data of the same room shares the decoded multidata and lookup tables."""
+        from pony.orm import db_session
+        from WebHostLib.models import Room
+        from WebHostLib.tracker import TrackerData
+
+        with db_session:
+            room = Room.get(id=self.room_id)
+            first, second = TrackerData(room), TrackerData(room)
+            self.assertIs(first._multidata, second._multidata)
+            self.assertIs(first.item_id_to_name["Archipelago"], second.item_id_to_name["Archipelago"])
+            self.assertIs(first.location_name_to_id["Archipelago"], second.location_name_to_id["Archipelago"])
+            self.assertEqual(first.item_id_to_name["Archipelago"][-1], "Nothing")
+            # unknown ids are named without adding them to the shared tables
+            item_count = len(first.item_id_to_name["Archipelago"])
+            self.assertEqual(first.item_id_to_name["Archipelago"][123456789], "Unknown Item (ID: 123456789)")
+            self.assertEqual(first.location_id_to_name["Archipelago"][-123], "Unknown Location (ID: -123)")
+            self.assertEqual(len(first.item_id_to_name["Archipelago"]), item_count)
+            self.assertNotIn(-123, second.location_id_to_name["Archipelago"])
+
+    def test_tracker_snapshot(self) -> None:
+        """Verify that trackers show the snapshot saved by the room, and can be requested conditionally with it."""
+        from pony.orm import db_session
+        from MultiServer import SaveJournal, add_received_items
+        from NetUtils import ClientStatus, Hint, NetworkItem
+        from WebHostLib.customserver import WebHostContext
+        from WebHostLib.models import Room
+        from WebHostLib.tracker import TrackerData
+
+        async def save() -> None:
+            ctx = WebHostContext({"non_hintable_names": {}}, logging.getLogger("test"))
+            ctx.room_id = self.room_id
+            ctx.save_journal = SaveJournal()
+            ctx.saving = True
+            ctx.client_game_state[0, 1] = ClientStatus.CLIENT_PLAYING
+            for items in ([NetworkItem(-1, 1, 1, 0), NetworkItem(-1, 2, 1, 0)], [NetworkItem(-1, 3, 1, 0)]):
+                add_received_items(ctx, 0, 1, True, *items)
+                ctx.location_checks[0, 1] |= {item.location for item in items}
+                ctx.save_journal.update("location_checks", (0, 1), {item.location for item in items})
+                ctx.save(now=True)
+            # nothing trackers show changed
+            ctx.stored_data["key"] = 1
+            ctx.journal_change("stored_data", "key")
+            ctx.save(now=True)
+            with db_session:
+                room = Room.get(id=self.room_id)
+                self.assertEqual(room.tracker_snapshot.version, 2)
+                hint_data = room.tracker_snapshot.hint_data
+            ctx.add_hint(0, 1, Hint(1, 1, 3, -1, True))
+            ctx.save(now=True)
+            with db_session:
+                self.assertNotEqual(Room.get(id=self.room_id).tracker_snapshot.hint_data, hint_data)
+
+        asyncio.run(save())
+
+        with db_session:
+            room = Room.get(id=self.room_id)
+            self.assertEqual(room.tracker_snapshot.version, 3)
+            tracker_data = TrackerData(room)
+            self.assertEqual(tracker_data.get_player_inventory_counts(0, 1)[-1], 3)
+            self.assertEqual(tracker_data.get_player_checked_locations_count(0, 1), 3)
+            self.assertEqual(tracker_data.get_player_client_status(0, 1), ClientStatus.CLIENT_PLAYING)
+            self.assertEqual(tracker_data.get_player_hints(0, 1), {Hint(1, 1, 3, -1, True)})
+            self.assertNotIn("_multisave", vars(tracker_data))
+            # the full save is still there for trackers that need it
+            self.assertEqual(tracker_data.get_player_checked_locations(0, 1), {1, 2, 3})
+
+        with self.app.test_request_context():
+            for url in (url_for("get_multiworld_tracker", tracker=self.tracker_uuid),
+                        url_for("api.tracker_data", tracker=self.tracker_uuid)):
+                with self.subTest(url=url):
+                    response = self.client.get(url)
+                    self.assertEqual(response.status_code, 200)
+                    etag = response.headers["ETag"]
+                    response = self.client.get(url, headers={"If-None-Match": etag})
+                    self.assertEqual(response.status_code, 304)
+
+
+class TestStaticDataCache(unittest.TestCase):
+    def test_eviction(self) -> None:
+        """Verify that the least recently used values are evicted to stay within the size limit."""
+        from WebHostLib.tracker import StaticDataCache
+
+        loads: list[str] = []
+
+        def loader(value: str, size: int):
+            def load():
+                loads.append(value)
+                return value, size
+            return load
+
+        cache = StaticDataCache(100)
+        self.assertEqual(cache.get(("test", 1), loader("a", 40)), "a")
+        self.assertEqual(cache.get(("test", 2), loader("b", 40)), "b")
+        self.assertEqual(cache.get(("test", 1), loader("a", 40)), "a")
+        self.assertEqual(cache.get(("test", 3), loader("c", 40)), "c")  # evicts b
+        self.assertEqual(cache.get(("test", 1), loader("a", 40)), "a")
+        self.assertEqual(cache.get(("test", 2), loader("b", 40)), "b")
+        self.assertEqual(loads, ["a", "b", "c", "b"])
+        self.assertEqual(cache.get(("test", 4), loader("d", 500)), "d")  # too large, but kept until the next value
+        self.assertEqual(cache.get(("test", 4), loader("d", 500)), "d")
+        self.assertEqual(loads, ["a", "b", "c", "b", "d"])
@@ -5,9 +5,9 @@ import logging
 import pathlib
 import sys
 import time
-from collections.abc import Callable, Iterable, Mapping
+from collections.abc import Callable, Iterable, Iterator, Mapping
 from random import Random
-from typing import (Any, ClassVar, Dict, FrozenSet, List, Optional, Self, Set, TextIO, Tuple,
+from typing import (AbstractSet, Any, ClassVar, Dict, FrozenSet, List, Optional, Self, Set, TextIO, Tuple,
                     TYPE_CHECKING, Type, Union)
 
 from Options import item_and_loc_options, ItemsAccessibility, OptionGroup, PerGameCommonOptions
@@ -22,6 +22,17 @@ if TYPE_CHECKING:
 
 perf_logger = logging.getLogger("performance")
 
+progress_listeners: List[Callable[[str, Any], None]] = []
+"""
+Called with "stage" and the method name by call_all, and with "fill" and (fill name, placed, total) during fill,
+so that a generator can report how far along it is.
+"""
+
+
+def report_progress(kind: str, value: Any) -> None:
+    for listener in progress_listeners:
+        listener(kind, value)
+
 
 class InvalidItemError(KeyError):
     pass
@@ -89,7 +100,7 @@ class AutoWorldRegister(type):
         new_class = super().__new__(mcs, name, bases, dct)
         new_class.__file__ = sys.modules[new_class.__module__].__file__
         if "game" in dct:
-            if dct["game"] in AutoWorldRegister.world_types:
+            if dict.__contains__(AutoWorldRegister.world_types, dct["game"]):
                 raise RuntimeError(f"""Game {dct["game"]} already registered in 
                 {AutoWorldRegister.world_types[dct["game"]].__file__} when attempting to register from
                 {new_class.__file__}.""")
@@ -104,6 +115,95 @@ class AutoWorldRegister(type):
         return new_class
 
 
+class LazyWorldTypes(Dict[str, Type["World"]]):
+    """
+    Registry of World classes, some of which are only imported once they are first looked up.
+
+    Pending games are known by name and behave like registered games for membership tests, iteration and len, but
+    their World class is only imported by looking them up, or for every pending game by iterating over the values
+    or items.
+    """
+    pending: Dict[str, Callable[[], bool]]
+    """game name -> function that imports the world source of the game, returning whether that succeeded"""
+    on_register_pending: Optional[Callable[[str, Type[World]], None]]
+    """called with the game and World class when a pending game gets registered, however its world was imported"""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.pending = {}
+        self.on_register_pending = None
+
+    def add_pending(self, game: str, load: Callable[[], bool]) -> None:
+        """Register a game that is imported by calling load once it is first looked up."""
+        if not dict.__contains__(self, game):
+            self.pending[game] = load
+
+    def is_loaded(self, game: str) -> bool:
+        return dict.__contains__(self, game)
+
+    def load(self, game: str) -> bool:
+        """Import the world source of a pending game, returning whether the game is registered afterwards."""
+        load = self.pending.get(game, None)
+        if load is not None and not load():
+            logging.error(f"Could not load world for {game}.")
+        self.pending.pop(game, None)
+        return dict.__contains__(self, game)
+
+    def load_all(self) -> None:
+        for game in list(self.pending):
+            self.load(game)
+
+    def __missing__(self, game: str) -> Type[World]:
+        if game in self.pending and self.load(game):
+            return dict.__getitem__(self, game)
+        raise KeyError(game)
+
+    def __setitem__(self, game: str, world_type: Type[World]) -> None:
+        was_pending = self.pending.pop(game, None) is not None
+        super().__setitem__(game, world_type)
+        if was_pending and self.on_register_pending:
+            self.on_register_pending(game, world_type)
+
+    def __delitem__(self, game: str) -> None:
+        if self.pending.pop(game, None) is None:
+            super().__delitem__(game)
+
+    def __contains__(self, game: object) -> bool:
+        return game in self.pending or super().__contains__(game)
+
+    def __iter__(self) -> Iterator[str]:
+        yield from super().__iter__()
+        yield from tuple(self.pending)
+
+    def __len__(self) -> int:
+        return super().__len__() + len(self.pending)
+
+    def get(self, game: str, default: Any = None) -> Any:
+        if game in self:
+            try:
+                return self[game]
+            except KeyError:
+                pass
+        return default
+
+    def keys(self) -> List[str]:  # type: ignore[override]
+        return list(self)
+
+    def values(self) -> List[Type[World]]:  # type: ignore[override]
+        self.load_all()
+        return list(super().values())
+
+    def items(self) -> List[Tuple[str, Type[World]]]:  # type: ignore[override]
+        self.load_all()
+        return list(super().items())
+
+    def copy(self) -> LazyWorldTypes:
+        new = LazyWorldTypes(dict.items(self))
+        new.pending = self.pending.copy()
+        new.on_register_pending = self.on_register_pending
+        return new
+
+
 class AutoLogicRegister(type):
     def __new__(mcs, name: str, bases: Tuple[type, ...], dct: Dict[str, Any]) -> AutoLogicRegister:
         new_class = super().__new__(mcs, name, bases, dct)
@@ -198,6 +298,7 @@ def call_single(multiworld: "MultiWorld", method_name: str, player: int, *args:
 
 
 def call_all(multiworld: "MultiWorld", method_name: str, *args: Any) -> None:
+    report_progress("stage", method_name)
     world_types: Set[AutoWorldRegister] = set()
     for player in multiworld.player_ids:
         prev_item_count = len(multiworld.itempool)
@@ -319,11 +420,20 @@ class World(metaclass=AutoWorldRegister):
     origin_region_name: str = "Menu"
     """Name of the Region from which accessibility is tested."""
 
+    portable_output: ClassVar[bool] = False
+    """If True, generate_output may run in a separate process when the host enables process output.
+    Changes it makes to the world are not carried back from that process, so anything that is read by another step
+    afterward, like a ROM name waited on in modify_multidata, has to be handed back through get_output_results."""
+
     explicit_indirect_conditions: bool = True
     """If True, the world implementation is supposed to use MultiWorld.register_indirect_condition() correctly.
     If False, everything is rechecked at every step, which is slower computationally, 
     but may be desirable in complex/dynamic worlds."""
 
+    known_entrance_item_dependencies: ClassVar[bool] = False
+    """If True, get_entrance_item_dependencies is used to only retest the blocked entrances of a CollectionState
+    whose items were collected since its reachable regions were last updated."""
+
     multiworld: "MultiWorld"
     """autoset on creation. The MultiWorld object for the currently generating multiworld."""
     player: int
@@ -454,6 +564,20 @@ class World(metaclass=AutoWorldRegister):
         """
         pass
 
+    def get_output_results(self) -> Any:
+        """
+        Called right after generate_output in the output process, if it runs in one.
+        Return what generate_output left behind for later steps, it has to be picklable.
+        """
+        return None
+
+    def receive_output_results(self, results: Any) -> None:
+        """
+        Called in the generator process with the return of get_output_results, once generate_output finished in an
+        output process. Called with None if it failed, so that nothing is left waiting for the results.
+        """
+        pass
+
     def fill_slot_data(self) -> Mapping[str, Any]:  # json of WebHostLib.models.Slot
         """
         What is returned from this function will be in the `slot_data` field
@@ -576,6 +700,14 @@ class World(metaclass=AutoWorldRegister):
         """Called when a region is newly reachable by the state."""
         pass
 
+    def get_entrance_item_dependencies(self, entrance: Entrance) -> Optional[AbstractSet[str]]:
+        """
+        Returns the names of all items that can change the result of the access rule of entrance, or None if its rule
+        can also change otherwise, like by reaching other regions. Only used if known_entrance_item_dependencies is set.
+        The names are compared to the names of collected items and to the names added with `CollectionState.add_item`.
+        """
+        return None
+
     # following methods should not need to be overridden.
     def create_filler(self) -> "Item":
         return self.create_item(self.get_filler_item_name())
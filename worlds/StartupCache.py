@@ -0,0 +1,127 @@
+"""
+On-disk cache of the games each world source registers, so that world sources which did not change since they were
+last imported don't have to be imported to know their games, data packages and world versions.
+"""
+import hashlib
+import logging
+import os
+import pickle
+import sys
+from typing import Any, Dict, Iterable, List, Optional, Tuple, TypedDict
+
+from NetUtils import GamesPackage
+from Utils import cache_path, version_tuple
+
+__all__ = [
+    "CachedGame",
+    "CachedSource",
+    "get_cache_file",
+    "get_fingerprint",
+    "make_cached_game",
+    "read_cache",
+    "write_cache",
+]
+
+CACHE_FORMAT = 3
+
+
+class CachedGame(TypedDict):
+    world_type: str
+    """module and name of the World class"""
+    world_version: Tuple[int, int, int]
+    data_package: GamesPackage
+    hint_blacklist: List[str]
+    settings_key: Optional[str]
+    """settings_key of the World class, if it defines settings"""
+
+
+class CachedSource(TypedDict):
+    fingerprint: str
+    games: Dict[str, CachedGame]
+
+
+class _DataUnpickler(pickle.Unpickler):
+    """The cache only holds builtin containers and scalars, so no globals have to be loaded."""
+
+    def find_class(self, module: str, name: str) -> type:
+        raise pickle.UnpicklingError(f"global '{module}.{name}' is forbidden")
+
+
+def _get_file_fingerprint(stat: os.stat_result) -> str:
+    # the inode and change time catch files replaced or written within the resolution of the modification time,
+    # or with the modification time set back, like by a checkout, without having to read the files
+    return f"{stat.st_size} {stat.st_mtime_ns} {stat.st_ctime_ns} {stat.st_ino}"
+
+
+def get_fingerprint(path: str) -> str:
+    """
+    Hash of the names, sizes, modification and change times and inodes of all files of a world source,
+    excluding bytecode caches.
+    """
+    sha1 = hashlib.sha1()
+    if os.path.isfile(path):
+        sha1.update(_get_file_fingerprint(os.stat(path)).encode())
+        return sha1.hexdigest()
+    for dirpath, dirnames, filenames in os.walk(path):
+        dirnames[:] = sorted(dirname for dirname in dirnames if dirname != "__pycache__")
+        for filename in sorted(filenames):
+            file_path = os.path.join(dirpath, filename)
+            sha1.update(f"{os.path.relpath(file_path, path)} {_get_file_fingerprint(os.stat(file_path))}\n".encode())
+    return sha1.hexdigest()
+
+
+def make_cached_game(world_type: Any, data_package: GamesPackage) -> CachedGame:
+    """Cache entry of a World class with the data package it provides."""
+    settings_annotation = world_type.__annotations__.get("settings", None)
+    has_settings = settings_annotation is not None and settings_annotation != "ClassVar[Optional['Group']]"
+    return {
+        "world_type": f"{world_type.__module__}.{world_type.__name__}",
+        "world_version": tuple(world_type.world_version),
+        "data_package": data_package,
+        "hint_blacklist": sorted(world_type.hint_blacklist),
+        "settings_key": world_type.settings_key if has_settings else None,
+    }
+
+
+def get_cache_file(folders: Iterable[str]) -> str:
+    """Path of the cache file for the world sources found in folders."""
+    folder_hash = hashlib.sha1("\n".join(os.path.abspath(folder) for folder in folders).encode()).hexdigest()
+    return cache_path("worlds", f"{folder_hash[:16]}.pickle")
+
+
+def _get_cache_key() -> str:
+    # what a world source registers also depends on AutoWorldRegister, which is not part of any world source
+    return f"{CACHE_FORMAT} {version_tuple.as_simple_string()} {sys.version} " \
+           f"{get_fingerprint(os.path.join(os.path.dirname(__file__), 'AutoWorld.py'))}"
+
+
+def read_cache(cache_file: str) -> Dict[str, CachedSource]:
+    """
+    Read the cached world sources by world source path from cache_file.
+
+    Returns an empty cache if the file does not exist, can't be read or was written by a different version of
+    Archipelago or Python.
+    """
+    try:
+        with open(cache_file, "rb") as f:
+            key, sources = _DataUnpickler(f).load()
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        logging.warning(f"Could not read world startup cache {cache_file}: {e}")
+        return {}
+    if key != _get_cache_key():
+        return {}
+    return sources
+
+
+def write_cache(cache_file: str, sources: Dict[str, CachedSource]) -> None:
+    """Replace the cached world sources in cache_file with sources."""
+    temp_file = f"{cache_file}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        with open(temp_file, "wb") as f:
+            pickle.dump((_get_cache_key(), sources), f, pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_file, cache_file)
+    except OSError as e:
+        logging.warning(f"Could not write world startup cache {cache_file}: {e}")
@@ -30,11 +30,19 @@ __all__ = [
     "local_folder",
     "user_folder",
     "failed_world_loads",
+    "get_cached_game",
 ]
 
 
 failed_world_loads: List[str] = []
 
+lazy_world_imports: bool = os.environ.get("LAZY_WORLD_IMPORTS", "").lower() in ("1", "true", "yes")
+"""
+Only import world folders that changed since they were last imported, taking the games, data packages and world
+versions of the others from the startup cache until their World class is first looked up.
+This is opt-in, as importing a world can have side effects, such as registering launcher components.
+"""
+
 
 @dataclasses.dataclass(order=True)
 class WorldSource:
@@ -94,17 +102,60 @@ for folder in (folder for folder in (user_folder, local_folder) if folder):
 # import all submodules to trigger AutoWorldRegister
 world_sources.sort()
 apworlds: list[WorldSource] = []
+network_data_package: DataPackage
+if lazy_world_imports:
+    from .AutoWorld import AutoWorldRegister, LazyWorldTypes, World
+    from .StartupCache import (CachedGame, CachedSource, get_cache_file, get_fingerprint, make_cached_game,
+                               read_cache, write_cache)
+
+    startup_cache_file = get_cache_file(folder for folder in (user_folder, local_folder) if folder)
+    startup_cache = read_cache(startup_cache_file)
+    world_source_fingerprints: dict[str, str] = {}
+    cached_world_sources: dict[str, CachedSource] = {}
+    cached_games: dict[str, CachedGame] = {}
+    network_data_package = {"games": {}}
+
+    def apply_cached_world_versions(cached_source: CachedSource) -> None:
+        for game, cached_game in cached_source["games"].items():
+            if AutoWorldRegister.world_types.is_loaded(game):
+                AutoWorldRegister.world_types[game].world_version = Version(*cached_game["world_version"])
+
+    def register_cached_game(game: str, world_type: type[World]) -> None:
+        world_type.world_version = Version(*cached_games[game]["world_version"])
+        if game in network_data_package["games"]:
+            # keep the data package in line with the World class, in case it is not reproducible between runs
+            data_package = world_type.get_data_package_data()
+            if data_package["checksum"] != network_data_package["games"][game]["checksum"]:
+                network_data_package["games"][game] = data_package
+
+    AutoWorldRegister.world_types = LazyWorldTypes(AutoWorldRegister.world_types)
+    AutoWorldRegister.world_types.on_register_pending = register_cached_game
+
 for world_source in world_sources:
     # load all loose files first:
     if world_source.is_zip:
         apworlds.append(world_source)
+    elif lazy_world_imports:
+        source_path = world_source.resolved_path
+        fingerprint = world_source_fingerprints[source_path] = get_fingerprint(source_path)
+        cached = startup_cache.get(source_path)
+        if cached and cached["fingerprint"] == fingerprint:
+            cached_world_sources[source_path] = cached
+            cached_games.update(cached["games"])
+            for cached_game_name in cached["games"]:
+                AutoWorldRegister.world_types.add_pending(cached_game_name, world_source.load)
+        else:
+            world_source.load()
     else:
         world_source.load()
 
 from .AutoWorld import AutoWorldRegister
 
 for world_source in world_sources:
-    if not world_source.is_zip:
+    if lazy_world_imports and world_source.resolved_path in cached_world_sources:
+        # cached world sources may have been imported by another world already
+        apply_cached_world_versions(cached_world_sources[world_source.resolved_path])
+    elif not world_source.is_zip:
         # look for manifest
         manifest = {}
         for dirpath, dirnames, filenames in os.walk(world_source.resolved_path):
@@ -205,7 +256,46 @@ if apworlds:
 del apworlds
 
 # Build the data package for each game.
-network_data_package: DataPackage = {
-    "games": {world_name: world.get_data_package_data() for world_name, world in AutoWorldRegister.world_types.items()},
-}
+if lazy_world_imports:
+    network_data_package["games"].update({world_name: world.get_data_package_data()
+                                          for world_name, world in dict.items(AutoWorldRegister.world_types)})
+    for cached in cached_world_sources.values():
+        for cached_game_name, cached_game in cached["games"].items():
+            if cached_game_name in AutoWorldRegister.world_types.pending:
+                network_data_package["games"][cached_game_name] = cached_game["data_package"]
+
+    def update_startup_cache() -> None:
+        world_sources_by_module = {f"worlds.{Path(world_source.path).stem}": world_source.resolved_path
+                                   for world_source in world_sources if not world_source.is_zip}
+        sources: dict[str, CachedSource] = {}
+        for module, source_path in world_sources_by_module.items():
+            if source_path in cached_world_sources:
+                sources[source_path] = cached_world_sources[source_path]
+            elif module in sys.modules:
+                sources[source_path] = {"fingerprint": world_source_fingerprints[source_path], "games": {}}
+        for game, world_type in dict.items(AutoWorldRegister.world_types):
+            source_path = world_sources_by_module.get(".".join(world_type.__module__.split(".", 2)[:2]))
+            if source_path in sources and source_path not in cached_world_sources:
+                sources[source_path]["games"][game] = make_cached_game(world_type, network_data_package["games"][game])
+        if sources.keys() != startup_cache.keys() or len(sources) != len(cached_world_sources):
+            write_cache(startup_cache_file, sources)
+
+    update_startup_cache()
+    del update_startup_cache
+else:
+    network_data_package = {
+        "games": {world_name: world.get_data_package_data()
+                  for world_name, world in AutoWorldRegister.world_types.items()},
+    }
+
 
+def get_cached_game(game: str) -> "CachedGame | None":
+    """
+    Startup cache entry of game, if its world has not been imported because of lazy world imports.
+    Allows reading information about a game, such as its data package, without importing its world.
+    """
+    from .AutoWorld import LazyWorldTypes
+    world_types = AutoWorldRegister.world_types
+    if lazy_world_imports and isinstance(world_types, LazyWorldTypes) and game in world_types.pending:
+        return cached_games[game]
+    return None
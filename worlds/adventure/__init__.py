@@ -98,6 +98,7 @@ class AdventureWorld(World):
     """
     game: ClassVar[str] = "Adventure"
     web: ClassVar[WebWorld] = AdventureWeb()
+    portable_output: ClassVar[bool] = True
 
     options_dataclass = AdventureOptions
     settings: ClassVar[AdventureSettings]
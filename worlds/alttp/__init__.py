@@ -132,6 +132,7 @@ class ALTTPWorld(World):
     Ganon!
     """
     game = "A Link to the Past"
+    portable_output = True
     options_dataclass = ALTTPOptions
     options: ALTTPOptions
     settings_key = "lttp_options"
@@ -627,6 +628,18 @@ class ALTTPWorld(World):
         finally:
             self.rom_name_available_event.set() # make sure threading continues and errors are collected
 
+    def get_output_results(self):
+        return getattr(self, "rom_name", None), self.multiworld.spoiler.hashes.get(self.player)
+
+    def receive_output_results(self, results):
+        if results:
+            rom_name, rom_hash = results
+            if rom_name:
+                self.rom_name = rom_name
+            if rom_hash:
+                self.multiworld.spoiler.hashes[self.player] = rom_hash
+        self.rom_name_available_event.set()
+
     @classmethod
     def stage_extend_hint_information(cls, world, hint_data: typing.Dict[int, typing.Dict[int, str]]):
         er_hint_data = {player: {} for player in world.get_game_players("A Link to the Past") if
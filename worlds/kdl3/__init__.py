@@ -62,6 +62,7 @@ class KDL3World(World):
     """
 
     game = "Kirby's Dream Land 3"
+    portable_output = True
     options_dataclass: ClassVar[Type[PerGameCommonOptions]] = KDL3Options
     options: KDL3Options
     item_name_to_id = lookup_item_to_id
@@ -333,6 +334,14 @@ class KDL3World(World):
         finally:
             self.rom_name_available_event.set()  # make sure threading continues and errors are collected
 
+    def get_output_results(self) -> bytes:
+        return self.rom_name
+
+    def receive_output_results(self, results: Optional[bytes]) -> None:
+        if results:
+            self.rom_name = results
+        self.rom_name_available_event.set()
+
     def modify_multidata(self, multidata: Dict[str, Any]) -> None:
         # wait for self.rom_name to be available.
         self.rom_name_available_event.wait()
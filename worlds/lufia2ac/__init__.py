@@ -53,6 +53,7 @@ class L2ACWorld(World):
     """
     game: ClassVar[str] = "Lufia II Ancient Cave"
     web: ClassVar[WebWorld] = L2ACWeb()
+    portable_output: ClassVar[bool] = True
 
     options_dataclass: ClassVar[Type[PerGameCommonOptions]] = L2ACOptions
     options: L2ACOptions
@@ -60,6 +60,7 @@ class MLSSWorld(World):
 
     game = "Mario & Luigi Superstar Saga"
     web = MLSSWebWorld()
+    portable_output = True
     options_dataclass = MLSSOptions
     options: MLSSOptions
     settings: typing.ClassVar[MLSSSettings]
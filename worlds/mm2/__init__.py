@@ -87,6 +87,7 @@ class MM2World(World):
     """
 
     game = "Mega Man 2"
+    portable_output = True
     settings: ClassVar[MM2Settings]
     options_dataclass = MM2Options
     options: MM2Options
@@ -277,6 +278,14 @@ class MM2World(World):
         local_wily = {int(key): value for key, value in slot_data["wily_5_weapons"].items()}
         return {"weapon_damage": local_weapon, "wily_5_weapons": local_wily}
 
+    def get_output_results(self) -> bytearray:
+        return self.rom_name
+
+    def receive_output_results(self, results: Optional[bytearray]) -> None:
+        if results:
+            self.rom_name = results
+        self.rom_name_available_event.set()
+
     def modify_multidata(self, multidata: Dict[str, Any]) -> None:
         # wait for self.rom_name to be available.
         self.rom_name_available_event.wait()
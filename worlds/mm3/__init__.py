@@ -85,6 +85,7 @@ class MM3World(World):
     """
 
     game = "Mega Man 3"
+    portable_output = True
     settings: ClassVar[MM3Settings]
     options_dataclass = MM3Options
     options: MM3Options
@@ -265,6 +266,14 @@ class MM3World(World):
         local_wily = {int(key): value for key, value in slot_data["wily_4_weapons"].items()}
         return {"weapon_damage": local_weapon, "wily_4_weapons": local_wily}
 
+    def get_output_results(self) -> bytearray:
+        return self.rom_name
+
+    def receive_output_results(self, results: bytearray | None) -> None:
+        if results:
+            self.rom_name = results
+        self.rom_name_available_event.set()
+
     def modify_multidata(self, multidata: dict[str, Any]) -> None:
         # wait for self.rom_name to be available.
         self.rom_name_available_event.wait()
@@ -62,6 +62,7 @@ class MMBN3World(World):
     options: MMBN3Options
     settings: typing.ClassVar[MMBN3Settings]
     topology_present = False
+    portable_output = True
 
 
     item_name_to_id = {name: data.code for name, data in item_table.items()}
@@ -139,6 +139,7 @@ class OOTWorld(World):
     to rescue the Seven Sages, and then confront Ganondorf to save Hyrule!
     """
     game: str = "Ocarina of Time"
+    portable_output = True
     options_dataclass = OoTOptions
     options: OoTOptions
     settings: typing.ClassVar[OOTSettings]
@@ -1111,6 +1112,21 @@ class OOTWorld(World):
             apz5.write()
 
 
+    def get_output_results(self):
+        # entrances are handed back by name, they can't be pickled without the rest of the multiworld
+        entrances = [(entry["entrance"].name, entry["exit"].name, entry["direction"])
+                     for (_, _, player), entry in self.multiworld.spoiler.entrances.items() if player == self.player]
+        return self.collectible_override_flags, self.collectible_flag_offsets, entrances
+
+    def receive_output_results(self, results):
+        if results:
+            self.collectible_override_flags, self.collectible_flag_offsets, entrances = results
+            for entrance, exit_, direction in entrances:
+                self.multiworld.spoiler.set_entrance(self.get_entrance(entrance), self.get_entrance(exit_),
+                                                     direction, self.player)
+        self.collectible_flags_available.set()
+
+
     # Gathers hint data for OoT. Loops over all world locations for woth, barren, and major item locations.
     @classmethod
     def stage_generate_output(cls, multiworld: MultiWorld, output_directory: str):
@@ -56,6 +56,7 @@ class SMWWorld(World):
     lost all of his abilities. Can he get them back in time to save the Princess?
     """
     game: str = "Super Mario World"
+    portable_output = True
 
     settings: typing.ClassVar[SMWSettings]
 
@@ -236,6 +237,14 @@ class SMWWorld(World):
             if os.path.exists(rompath):
                 os.unlink(rompath)
 
+    def get_output_results(self):
+        return getattr(self, "rom_name", None)
+
+    def receive_output_results(self, results):
+        if results:
+            self.rom_name = results
+        self.rom_name_available_event.set()
+
     def modify_multidata(self, multidata: dict):
         import base64
         # wait for self.rom_name to be available.
@@ -30,6 +30,7 @@ class V6World(World):
     game: str = "VVVVVV"
     topology_present = False
     web = V6Web()
+    portable_output = True
 
     item_name_to_id = item_table
     location_name_to_id = location_table